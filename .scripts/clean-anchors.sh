@@ -19,6 +19,10 @@ fi
 # 获取脚本所在目录
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
+# 先同步被重命名的锚点（标题改名后更新引用，而不是直接删除侧边栏条目）
+$PYTHON_CMD "$SCRIPT_DIR/doc-tools.py" anchor-renames --fix
+echo ""
+
 # 运行 Python 脚本
 $PYTHON_CMD "$SCRIPT_DIR/clean-anchors.py"
 
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档工具集入口
+用法: python3 .scripts/doc-tools.py <命令> [参数]，在项目根目录运行
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from doctools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
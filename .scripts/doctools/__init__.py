@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+文档工具包 - 基于持久化语料索引的文档检查与预计算工具
+
+所有子命令统一通过 .scripts/doc-tools.py（或 doc-tools.sh）调用，
+与 .scripts/ 下其他脚本一样需要在项目根目录运行。
+"""
+
+__version__ = '1.0.0'
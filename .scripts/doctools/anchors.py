@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+锚点重命名 - 对比页面修改前后的标题，识别被改名的锚点，并同步更新所有引用它的链接
+
+修改 {#old-id} 为 {#new-id} 或改写标题文字后，侧边栏和其他页面中的 #old-id 链接会静默失效
+（clean-anchors 只会把侧边栏条目删掉）。这里按以下方式识别重命名：
+
+    1. 修改前的标题来自 git ref（默认 HEAD）或上次保存的语料索引（--cached）
+    2. 按标题文字对齐前后两组标题：文字相同但锚点变化（改了显式锚点、重复标题的 -1/-2
+       后缀移位）直接视为重命名
+    3. 剩余的标题按文字相似度配对，同一位置被替换的标题有额外加分，低于阈值的视为删除/新增
+
+识别结果通过反向链接索引一次性改写 sidebar.ts、nav.ts 和所有 Markdown 链接（EditSet 原子提交）。
+
+clean-anchors 命令处理剩下的真正失效的侧边栏锚点：叶子条目删除，带子条目的条目去掉 #锚点，
+通过 SidebarEditor 只改动受影响的片段，多行条目和原有格式都保持不变。
+"""
+
+import hashlib
+import json
+import re
+from difflib import SequenceMatcher
+
+from .common import DOCS_DIR, VITEPRESS_DIR, url_to_page
+from .corpus import Corpus, load_corpus
+from .edits import EditConflict, EditSet
+from .gitref import GitError, GitObjectReader, GitTree
+from .sidebar import SidebarEditor, SidebarSyntaxError, iter_values, js_string, load_sidebar, parse_export
+
+NAV_FILE = VITEPRESS_DIR + '/nav.ts'
+
+# 文字相似度阈值；同一位置被替换的标题额外加分
+DEFAULT_THRESHOLD = 0.6
+POSITION_BONUS = 0.2
+
+
+class AnchorRename(object):
+    __slots__ = ('page', 'old', 'new', 'line', 'old_title', 'new_title', 'score')
+
+    def __init__(self, page, old, new, line, old_title, new_title, score):
+        self.page = page
+        self.old = old
+        self.new = new
+        self.line = line
+        self.old_title = old_title
+        self.new_title = new_title
+        self.score = score
+
+    def to_json(self):
+        return {'page': self.page, 'old': self.old, 'new': self.new, 'line': self.line,
+                'oldTitle': self.old_title, 'newTitle': self.new_title, 'score': round(self.score, 2)}
+
+
+def similarity(a, b):
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def match_headings(page, old, new, threshold=DEFAULT_THRESHOLD):
+    """对比同一页面修改前后的标题列表，返回 [AnchorRename]"""
+    renames = []
+    new_anchors = set(h.anchor for h in new)
+    unmatched_old = []
+    unmatched_new = []
+    slots = {}
+
+    opcodes = SequenceMatcher(None, [h.title for h in old], [h.title for h in new],
+                              autojunk=False).get_opcodes()
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            for o, n in zip(old[i1:i2], new[j1:j2]):
+                if o.anchor != n.anchor:
+                    renames.append(AnchorRename(page, o.anchor, n.anchor, n.line, o.title, n.title, 1.0))
+            continue
+        for k, o in enumerate(old[i1:i2]):
+            slots[('old', i1 + k)] = (i1, k)
+            unmatched_old.append((i1 + k, o))
+        for k, n in enumerate(new[j1:j2]):
+            slots[('new', j1 + k)] = (i1, k)
+            unmatched_new.append((j1 + k, n))
+
+    # 只为已经失效的旧锚点寻找新位置；旧锚点仍然存在时链接不会断
+    candidates = []
+    for i, o in unmatched_old:
+        if o.anchor in new_anchors:
+            continue
+        for j, n in unmatched_new:
+            sim = max(similarity(o.title, n.title), similarity(o.anchor, n.anchor))
+            score = sim
+            if slots[('old', i)] == slots[('new', j)]:
+                score += POSITION_BONUS
+            if o.level != n.level:
+                score -= POSITION_BONUS
+            if score >= threshold:
+                candidates.append((score, i, j, sim))
+    candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+    used_old = set()
+    used_new = set()
+    for score, i, j, sim in candidates:
+        if i in used_old or j in used_new:
+            continue
+        used_old.add(i)
+        used_new.add(j)
+        o, n = old[i], new[j]
+        if o.anchor != n.anchor:
+            renames.append(AnchorRename(page, o.anchor, n.anchor, n.line, o.title, n.title, sim))
+    renames.sort(key=lambda r: r.line)
+    return renames
+
+
+def _blob_id(data):
+    """与 git hash-object 相同的 blob id"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def old_headings_from_ref(root, corpus, ref, pages=None):
+    """读取 ref 中内容与工作区不同的页面的标题，返回 {页面: [Heading]}"""
+    result = {}
+    prefix = DOCS_DIR + '/'
+    with GitObjectReader(root) as git:
+        tree = GitTree(git, ref)
+        blobs = tree.files(DOCS_DIR)
+        for page in corpus:
+            if pages and page.path not in pages:
+                continue
+            oid = blobs.get(prefix + page.path)
+            if oid is None:
+                continue
+            with open(corpus.docs / page.path, 'rb') as f:
+                if _blob_id(f.read()) == oid:
+                    continue
+            data = tree.read_bytes(prefix + page.path)
+            result[page.path] = Corpus.parse_page(page.path, data).headings
+    return result
+
+
+def load_with_cached_headings(root):
+    """加载语料索引，同时返回刷新前（上次保存时）变化页面的标题"""
+    corpus = Corpus(root).load(refresh=False)
+    # 刷新后变化页面的旧记录仍引用旧索引，只为这些页面生成标题
+    before = dict(corpus.pages)
+    changed = corpus.refresh()
+    if corpus.dirty:
+        corpus.save()
+    return corpus, {path: before[path].headings for path in changed if path in before}
+
+
+def detect_renames(root='.', ref='HEAD', cached=False, pages=None, threshold=DEFAULT_THRESHOLD):
+    """识别锚点重命名，返回 (语料索引, [AnchorRename])"""
+    if cached:
+        corpus, old = load_with_cached_headings(root)
+        if pages:
+            old = {p: h for p, h in old.items() if p in pages}
+    else:
+        corpus = load_corpus(root)
+        old = old_headings_from_ref(root, corpus, ref, pages)
+    renames = []
+    for path in sorted(old):
+        renames.extend(match_headings(path, old[path], corpus.get(path).headings, threshold))
+    return corpus, renames
+
+
+def _rewrite_anchor(target, mapping):
+    path, sep, anchor = target.partition('#')
+    if sep and anchor in mapping:
+        return f'{path}#{mapping[anchor]}'
+    return target
+
+
+def plan_propagation(root, corpus, renames):
+    """计算更新所有引用所需的修改，返回 (EditSet, 更新的链接数)"""
+    by_page = {}
+    for r in renames:
+        by_page.setdefault(r.page, {})[r.old] = r.new
+    edits = EditSet(root)
+    count = 0
+
+    # 侧边栏与导航栏
+    editor = SidebarEditor(load_sidebar(root))
+    for item in editor.sidebar.walk():
+        mapping = by_page.get(item.page)
+        if mapping and item.anchor in mapping:
+            editor.relink(item, _rewrite_anchor(item.link, mapping))
+            count += 1
+    editor.emit(edits)
+    try:
+        nav = parse_export(edits.text(NAV_FILE), 'nav')
+    except (OSError, SidebarSyntaxError):
+        nav = None
+    if nav is not None:
+        for _, node in iter_values(nav, 'link'):
+            if not isinstance(node.value, str) or '#' not in node.value or '://' in node.value:
+                continue
+            mapping = by_page.get(url_to_page(node.value))
+            if mapping:
+                value = _rewrite_anchor(node.value, mapping)
+                if value != node.value:
+                    edits.replace(NAV_FILE, node.start, node.end, js_string(value, node.quote or '"'))
+                    count += 1
+
+    # 正文链接：同一行中相同的链接只处理一次，行内所有出现的位置一起替换
+    backlinks = corpus.backlinks()
+    seen = set()
+    for page, mapping in by_page.items():
+        for source, link, anchor in backlinks.get(page, ()):
+            if anchor not in mapping or (source, link.line, link.target) in seen:
+                continue
+            seen.add((source, link.line, link.target))
+            file = f'{DOCS_DIR}/{source}'
+            new_target = _rewrite_anchor(link.target, mapping)
+            start, end = edits.line_span(file, link.line)
+            line_text = edits.text(file)[start:end]
+            pattern = re.compile(r'\]\(\s*<?' + re.escape(link.target) + r'(?=[\s>)])')
+            for m in pattern.finditer(line_text):
+                target_start = start + m.end() - len(link.target)
+                edits.replace(file, target_start, target_start + len(link.target), new_target)
+                count += 1
+    return edits, count
+
+
+def cmd_anchor_renames(args):
+    """识别并同步锚点重命名"""
+    source = '上次保存的索引' if args.cached else args.ref
+    if not args.json:
+        print(f"=== 锚点重命名检测（对比 {source}）===\n")
+    pages = None
+    if args.pages:
+        pages = set(p[len(DOCS_DIR) + 1:] if p.startswith(DOCS_DIR + '/') else p for p in args.pages)
+    try:
+        corpus, renames = detect_renames(args.root, args.ref, args.cached, pages, args.threshold)
+    except GitError as e:
+        print(f"❌ 错误: 无法读取 {args.ref}: {e}")
+        return 2
+
+    if args.json:
+        print(json.dumps([r.to_json() for r in renames], ensure_ascii=False, indent=2))
+        return 0
+    if not renames:
+        print("✅ 没有发现被重命名的锚点")
+        return 0
+
+    for r in renames:
+        print(f"  {DOCS_DIR}/{r.page}:{r.line}  #{r.old} → #{r.new}")
+        if r.old_title != r.new_title:
+            print(f"      「{r.old_title}」→「{r.new_title}」（相似度 {r.score:.2f}）")
+
+    try:
+        edits, count = plan_propagation(args.root, corpus, renames)
+        plan = edits.apply(dry_run=True)
+    except (OSError, EditConflict, SidebarSyntaxError) as e:
+        print(f"\n❌ 错误: {e}")
+        return 1
+
+    print()
+    if not count:
+        print(f"✅ 识别到 {len(renames)} 个重命名，没有需要更新的引用")
+        return 0
+    for target in sorted(plan):
+        print(f"  ✏️  {target}（{len(edits.edits.get(target, ()))} 处引用）")
+    if not args.fix:
+        print(f"\n⚠️  {count} 处引用仍指向旧锚点（运行 anchor-renames --fix 同步更新）")
+        return 1
+    edits.apply()
+    print(f"\n✅ 已更新 {count} 处引用，涉及 {len(plan)} 个文件")
+    return 0
+
+
+def plan_clean(corpus, sidebar):
+    """侧边栏中指向不存在的页面或锚点的条目：返回 (SidebarEditor, 删除的条目, 去掉锚点的条目)"""
+    editor = SidebarEditor(sidebar)
+    removed = []
+    stripped = []
+    for item in sidebar.walk():
+        anchor, page = item.anchor, item.page
+        if anchor is None or page is None:
+            continue
+        if corpus.has_anchor(page, anchor):
+            continue
+        if item.items:
+            editor.relink(item, item.link.split('#', 1)[0])
+            stripped.append(item)
+        else:
+            editor.remove(item)
+            removed.append(item)
+    return editor, removed, stripped
+
+
+def cmd_clean_anchors(args):
+    """清理 sidebar.ts 中无效的锚点"""
+    print("=== 清理 sidebar.ts 中无效的锚点 ===\n")
+    print("[步骤 1/2] 检查锚点有效性...\n")
+    try:
+        sidebar = load_sidebar(args.root)
+    except (OSError, SidebarSyntaxError) as e:
+        print(f"❌ 错误: 无法解析 sidebar.ts: {e}")
+        return 1
+    editor, removed, stripped = plan_clean(load_corpus(args.root), sidebar)
+    total = sum(1 for item in sidebar.walk() if item.anchor is not None and item.page is not None)
+    print(f"🔍 发现 {total} 个锚点配置，其中 {len(removed) + len(stripped)} 个无效\n")
+
+    print("[步骤 2/2] 清理无效锚点...\n")
+    if not editor:
+        print("✅ 所有锚点配置都有效，无需清理")
+        return 0
+    for item in removed:
+        print(f"🗑️  删除子节点: {item.link}（sidebar.ts:{sidebar.line_of(item.node.start)}）")
+    for item in stripped:
+        print(f"🔧 修改父节点: 移除锚点 {item.anchor}（sidebar.ts:{sidebar.line_of(item.node.start)}）")
+
+    if args.dry_run:
+        print("\n💡 预览模式，未写入任何文件（去掉 --dry-run 以应用修改）")
+        return 0
+    edits = EditSet(args.root)
+    editor.emit(edits)
+    try:
+        edits.apply()
+    except EditConflict as e:
+        print(f"\n❌ 错误: {e}")
+        return 1
+    print(f"\n✅ 已清理 {len(removed)} 个无效子节点，修改 {len(stripped)} 个父节点")
+    print("\n💡 提示:")
+    print("   - 标题改名导致的失效请先运行 anchor-renames --fix 同步链接")
+    print("   - 如果需要子导航，请在 Markdown 文件中添加显式锚点 {#锚点}")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('anchor-renames', help='识别被重命名的标题锚点，同步更新侧边栏与所有链接')
+    p.add_argument('pages', nargs='*', help='只检查指定页面（默认所有有改动的页面）')
+    p.add_argument('--ref', default='HEAD', help='与指定 git ref 中的标题对比（默认 HEAD）')
+    p.add_argument('--cached', action='store_true', help='与上次保存的语料索引对比，而不是 git')
+    p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                   help=f'标题相似度阈值（默认 {DEFAULT_THRESHOLD}）')
+    p.add_argument('--fix', action='store_true', help='更新所有引用旧锚点的链接')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出识别结果')
+    p.set_defaults(func=cmd_anchor_renames)
+
+    p = subparsers.add_parser('clean-anchors', help='删除 sidebar.ts 中指向不存在锚点的条目（保留原有格式）')
+    p.add_argument('--dry-run', action='store_true', help='只显示将要进行的修改')
+    p.set_defaults(func=cmd_clean_anchors)
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+RAG 切分导出 - 把文档语料流式导出为 JSONL 文本块，供向量化 / 检索增强流水线使用
+
+切分规则：
+    - 块不跨越标题边界：每个标题下的内容单独切分，只有标题没有正文的小节不产生块
+    - 小节内按段落（空行分隔）和代码块打包，单块不超过 --max-tokens（token 数见 text.estimate_tokens）
+    - 代码块永远不会被拆开，超出预算的代码块单独成块
+    - 超出预算的段落按行拆分；front matter 不导出
+
+每行一个块：
+
+    {"id": "ai/chapter-04.md#什么是rag:0", "file": "docs/ai/chapter-04.md",
+     "url": "/ai/chapter-04#什么是rag", "module": "ai",
+     "headings": ["RAG检索增强", "什么是RAG？"], "lines": [12, 30], "tokens": 230,
+     "hash": "…", "text": "## 什么是RAG？\\n\\n…"}
+
+--incremental 只输出内容哈希与上次导出不同的块，另对消失的块输出 {"id": …, "deleted": true}，
+重新向量化时只需处理这些记录。内容未变化的页面不会被读取。导出完整结束后才更新
+.cache/doctools/chunks-state.json，中途失败的导出下次会重新输出。
+"""
+
+import json
+import sys
+
+from .common import DOCS_DIR, cache_path, content_hash, load_json, open_atomic, page_url, save_json
+from .corpus import load_corpus
+from .text import estimate_tokens, strip_inline
+
+CHUNK_VERSION = 2
+DEFAULT_MAX_TOKENS = 512
+STATE_FILE = 'chunks-state.json'
+
+
+def iter_blocks(lines, start, end, fences):
+    """把 [start, end) 行（从 1 开始）分成不可再分的块，产生 (起始行, 结束行, 是否为代码块)
+
+    fences 为 {起始行: 结束行}；段落之间的空行不属于任何块。
+    """
+    n = start
+    para = None
+    while n < end:
+        close = fences.get(n)
+        if close is not None:
+            if para is not None:
+                yield para, n - 1, False
+                para = None
+            close = min(close, end - 1)
+            yield n, close, True
+            n = close + 1
+            continue
+        if lines[n - 1].strip():
+            if para is None:
+                para = n
+        elif para is not None:
+            yield para, n - 1, False
+            para = None
+        n += 1
+    if para is not None:
+        yield para, end - 1, False
+
+
+def pack_blocks(lines, blocks, max_tokens):
+    """按预算把块合并为块组，产生 (起始行, 结束行)；超预算的段落按行拆分，代码块保持完整
+
+    合并时按合并后整段文本（包括块之间的空行）估算 token，而不是累加各块的估算值，
+    保证输出的块不超过预算。
+    """
+    def tokens(a, b):
+        return estimate_tokens('\n'.join(lines[a - 1:b]))
+
+    current = None
+    for a, b, is_fence in blocks:
+        if tokens(a, b) > max_tokens and not is_fence and b > a:
+            # 段落本身超出预算：逐行打包
+            if current is not None:
+                yield current
+                current = None
+            for row in range(a, b + 1):
+                if current is not None and tokens(current[0], row) > max_tokens:
+                    yield current
+                    current = None
+                current = (current[0], row) if current else (row, row)
+            continue
+        if current is not None and tokens(current[0], b) > max_tokens:
+            yield current
+            current = None
+        current = (current[0], b) if current else (a, b)
+    if current is not None:
+        yield current
+
+
+def iter_sections(page, lines):
+    """按标题切分页面，产生 (锚点, 标题路径, 起始行, 结束行)；第一个标题之前的内容锚点为空"""
+    body_start = page.frontmatter[1] + 1 if page.frontmatter else 1
+    total = len(lines) + 1
+    headings = page.headings
+    first = headings[0].line if headings else total
+    yield '', [strip_inline(page.title)] if page.title else [], body_start, first
+    stack = []
+    for i, h in enumerate(headings):
+        while stack and stack[-1].level >= h.level:
+            stack.pop()
+        stack.append(h)
+        end = headings[i + 1].line if i + 1 < len(headings) else total
+        yield h.anchor, [strip_inline(x.title) for x in stack], h.line, end
+
+
+def iter_page_chunks(page, text, max_tokens=DEFAULT_MAX_TOKENS):
+    """切分单个页面，逐个产生块记录"""
+    lines = text.split('\n')
+    fences = {f.line: f.end for f in page.fences}
+    url = page_url(page.path)
+    for anchor, headings, start, end in iter_sections(page, lines):
+        blocks = list(iter_blocks(lines, start, end, fences))
+        # 只有标题行的小节没有可检索的内容
+        if not blocks or (anchor and len(blocks) == 1 and blocks[0][:2] == (start, start)):
+            continue
+        for k, (a, b) in enumerate(pack_blocks(lines, blocks, max_tokens)):
+            body = '\n'.join(lines[a - 1:b])
+            yield {
+                'id': f'{page.path}#{anchor}:{k}',
+                'file': f'{DOCS_DIR}/{page.path}',
+                'url': url + ('#' + anchor if anchor else ''),
+                'module': page.module,
+                'headings': headings,
+                'lines': [a, b],
+                'tokens': estimate_tokens(body),
+                'hash': content_hash('\n'.join(headings) + '\n\n' + body),
+                'text': body,
+            }
+
+
+def export_chunks(corpus, state, max_tokens=DEFAULT_MAX_TOKENS, incremental=False):
+    """遍历语料产生导出记录，并把本次导出的状态写入 state（就地更新）
+
+    state 为上次导出的状态（{} 表示没有）；incremental 为 True 时只产生变化的块与删除标记。
+    """
+    signature = f'v{CHUNK_VERSION}/t{max_tokens}'
+    previous = state.get('pages', {})
+    # 切分参数变化后页面需要重新切分，但块哈希仍可比较：内容相同的块不会重复输出
+    reuse = state.get('sig') == signature
+    pages = {}
+    for page in corpus:
+        old = previous.get(page.path)
+        if incremental and reuse and old and old[0] == page.hash:
+            pages[page.path] = old
+            continue
+        known = old[1] if old else {}
+        chunks = {}
+        for chunk in iter_page_chunks(page, corpus.read_text(page.path), max_tokens):
+            chunks[chunk['id']] = chunk['hash']
+            if not incremental or known.get(chunk['id']) != chunk['hash']:
+                yield chunk
+        if incremental:
+            for chunk_id in known:
+                if chunk_id not in chunks:
+                    yield {'id': chunk_id, 'deleted': True}
+        pages[page.path] = [page.hash, chunks]
+    if incremental:
+        for path, (_, known) in previous.items():
+            if path not in pages:
+                for chunk_id in known:
+                    yield {'id': chunk_id, 'deleted': True}
+    state.clear()
+    state.update({'sig': signature, 'pages': pages})
+
+
+def cmd_export_chunks(args):
+    """导出 RAG 文本块"""
+    corpus = load_corpus(args.root)
+    state_file = cache_path(args.root, STATE_FILE)
+    state = load_json(state_file, {})
+    incremental = args.incremental and bool(state)
+    records = export_chunks(corpus, state, args.max_tokens, incremental)
+
+    written = deleted = tokens = 0
+
+    def write(out):
+        nonlocal written, deleted, tokens
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            if record.get('deleted'):
+                deleted += 1
+            else:
+                written += 1
+                tokens += record['tokens']
+
+    if args.out:
+        with open_atomic(args.out) as out:
+            write(out)
+        report = sys.stdout
+    else:
+        write(sys.stdout)
+        sys.stdout.flush()
+        report = sys.stderr
+    save_json(state_file, state)
+
+    total = sum(len(chunks) for _, chunks in state['pages'].values())
+    mode = '增量' if incremental else '全量'
+    print(f"✅ {mode}导出 {written} 个块（约 {tokens} tokens），删除 {deleted} 个；"
+          f"语料共 {total} 个块，{len(corpus)} 个页面", file=report)
+    if args.incremental and not incremental:
+        print("💡 没有上次导出的记录，已全量导出", file=report)
+    if args.out:
+        print(f"📄 {args.out}", file=report)
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('export-chunks', help='按标题流式导出 RAG 文本块（JSONL），支持增量')
+    p.add_argument('--max-tokens', type=int, default=DEFAULT_MAX_TOKENS,
+                   help=f'单块 token 预算（默认 {DEFAULT_MAX_TOKENS}，代码块不拆分）')
+    p.add_argument('--incremental', action='store_true', help='只输出与上次导出相比变化的块和删除标记')
+    p.add_argument('--out', help='输出文件（默认输出到标准输出）')
+    p.set_defaults(func=cmd_export_chunks)
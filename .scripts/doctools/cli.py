@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+命令行入口 - 汇总所有子命令
+"""
+
+import argparse
+
+from . import (anchors, chunks, compact, deploy, distreport, extlinks, fences, lastupdated, lsp, manifest, precache,
+               precompress, query, questionbank, related, renumber, rules, search, sectiondiff, sidebartrim,
+               snippets, terms)
+from .common import setup_utf8_stdio
+
+# 每个模块提供 register(subparsers)，通过 set_defaults(func=...) 绑定处理函数
+COMMANDS = [
+    search,
+    fences,
+    rules,
+    renumber,
+    compact,
+    query,
+    manifest,
+    lastupdated,
+    terms,
+    anchors,
+    lsp,
+    chunks,
+    related,
+    sidebartrim,
+    extlinks,
+    sectiondiff,
+    snippets,
+    deploy,
+    distreport,
+    precompress,
+    questionbank,
+    precache,
+]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='doc-tools',
+        description='文档工具集：基于持久化语料索引的检查、修复与预计算',
+    )
+    parser.add_argument('--root', default='.', help='项目根目录（默认当前目录）')
+    subparsers = parser.add_subparsers(dest='command', metavar='<命令>')
+    for module in COMMANDS:
+        module.register(subparsers)
+    return parser
+
+
+def main(argv=None):
+    setup_utf8_stdio()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 1
+    return args.func(args)
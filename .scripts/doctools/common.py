@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+公共工具：路径约定、编码设置、哈希与 JSON 缓存读写
+"""
+
+import io
+import os
+import sys
+import json
+import mmap
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+DOCS_DIR = 'docs'
+VITEPRESS_DIR = 'docs/.vitepress'
+SIDEBAR_FILE = 'docs/.vitepress/sidebar.ts'
+PUBLIC_DIR = 'docs/public'
+DIST_DIR = 'docs/.vitepress/dist'
+CACHE_DIR = '.cache/doctools'
+
+# 临时文件默认权限为 0600，替换前按当前 umask 恢复为常规文件权限
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def setup_utf8_stdio():
+    """设置标准输出为 UTF-8 编码（Windows 兼容）"""
+    if sys.platform == 'win32':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+
+def content_hash(data):
+    """计算内容哈希（bytes 或 str），返回十六进制字符串"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+@contextmanager
+def map_file(path):
+    """只读映射文件，产生可直接用于 hashlib / re 的缓冲区（空文件为 b''）
+
+    映射的页面由操作系统按需换入，不会像 read() 那样复制一份完整内容到进程内存。
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+def cache_path(root, name):
+    """返回缓存目录下的文件路径"""
+    return Path(root) / CACHE_DIR / name
+
+
+def load_json(path, default=None):
+    """读取 JSON 文件，不存在或损坏时返回默认值"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data, compact=True):
+    """原子写入 JSON 文件（先写临时文件再替换）"""
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    return write_text_atomic(path, text)
+
+
+def write_text_atomic(path, text):
+    """原子写入文本文件，返回写入的字节数"""
+    data = text.encode('utf-8')
+    write_bytes_atomic(path, data)
+    return len(data)
+
+
+def write_bytes_atomic(path, data):
+    """原子写入二进制文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix='.' + path.name + '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, str(path))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+@contextmanager
+def open_atomic(path):
+    """以流式方式原子写入文本文件：写入临时文件，正常结束后才替换目标文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix='.' + path.name + '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            yield f
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, str(path))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def page_url(rel_path):
+    """将 docs/ 下的相对路径转换为站点链接，如 ai/chapter-01.md -> /ai/chapter-01"""
+    url = '/' + rel_path
+    if url.endswith('index.md'):
+        return url[:-len('index.md')]
+    if url.endswith('.md'):
+        return url[:-3]
+    return url
+
+
+def url_to_page(url):
+    """将站点链接转换为 docs/ 下的相对路径，如 /ai/ -> ai/index.md"""
+    path = url.split('#', 1)[0].split('?', 1)[0].lstrip('/')
+    if path == '' or path.endswith('/'):
+        return path + 'index.md'
+    if path.endswith('.html'):
+        path = path[:-5]
+    if not path.endswith('.md'):
+        path += '.md'
+    return path
+
+
+def module_of(rel_path):
+    """返回页面所属模块（docs/ 下的一级目录），根目录页面归入 'root'"""
+    parts = rel_path.split('/', 1)
+    return parts[0] if len(parts) > 1 else 'root'
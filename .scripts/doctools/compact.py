@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+紧凑索引 - 用列式数组和字符串池保存标题与链接，适用于超大规模文档树
+
+每条标题只占用固定宽度的数组元素（页面/级别/行号/标题/锚点），字符串统一存放在
+UTF-8 字符串池中（相同字符串只存一次），不再为每条记录创建 Python 对象。
+语料索引（corpus.py）直接以这种形式保存到 .cache/doctools/corpus.idx，加载时按列
+整块读入数组，页面的标题与链接只在访问时才生成 Heading / Link：
+
+    index = load_corpus().index
+    index.has_anchor('ai/chapter-01.md', 'rag')       # 哈希 + 二分查找
+    for h in index.headings('ai/chapter-01.md'): ...  # 按需生成 Heading
+    index.nbytes()                                     # 实际占用字节数
+
+占用主要来自字符串本身：本仓库每条记录约 75 字节；百万条各不相同的标题实测常驻约 70~140 MB
+（取决于标题长度），构建时用于去重的字典使峰值达到常驻的 3~4 倍（约 300~550 MB），
+从 corpus.idx 加载则没有这部分开销。页面内锚点与全局锚点查找都是二分查找（百万级约数微秒），
+按标题文本查找需要逐个解码不同的标题（百万级约 1 秒）。
+安装 NumPy 时可通过 column() 零拷贝地取得 ndarray 视图做批量计算。
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+Heading = namedtuple('Heading', 'level line title anchor')
+Link = namedtuple('Link', 'line text target')
+
+COLUMNS_VERSION = 2
+
+# 文件头：魔数、版本、字节序、语料标记（页面路径与内容哈希的摘要）
+_HEADER = struct.Struct('<4sH?40s')
+_ARRAY = struct.Struct('<cBQ')
+_MAGIC = b'DTIX'
+
+
+def _write_array(f, col):
+    f.write(_ARRAY.pack(col.typecode.encode('ascii'), col.itemsize, len(col)))
+    col.tofile(f)
+
+
+def _read_array(f):
+    typecode, itemsize, count = _ARRAY.unpack(f.read(_ARRAY.size))
+    col = array(typecode.decode('ascii'))
+    if col.itemsize != itemsize:
+        raise ValueError('数组元素宽度不一致')
+    col.fromfile(f, count)
+    return col
+
+
+class StringPool(object):
+    """字符串池：所有字符串拼接为一个 UTF-8 缓冲区，按编号访问
+
+    构建阶段用字典去重；freeze() 后释放字典，改用开放寻址哈希表（每个槽 4 字节）查找。
+    哈希表使用 CRC32 而不是随进程变化的 hash()，可以随索引一起保存。
+    """
+
+    __slots__ = ('data', 'offsets', '_ids', '_table')
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('I', [0])
+        self._ids = {}
+        self._table = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode('utf-8')
+
+    def _bytes(self, i):
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]])
+
+    def add(self, text):
+        """加入字符串并返回编号（已存在时返回原编号）"""
+        if self._ids is None:
+            raise ValueError('字符串池已冻结')
+        i = self._ids.get(text)
+        if i is None:
+            i = len(self)
+            self.data += text.encode('utf-8')
+            self.offsets.append(len(self.data))
+            self._ids[text] = i
+        return i
+
+    def freeze(self):
+        """释放构建用的字典，之后只读"""
+        size = 8
+        while size < len(self) * 2:
+            size <<= 1
+        mask = size - 1
+        table = array('i', [-1]) * size
+        for i in range(len(self)):
+            slot = zlib.crc32(self._bytes(i)) & mask
+            while table[slot] != -1:
+                slot = (slot + 1) & mask
+            table[slot] = i
+        self._table = table
+        self._ids = None
+
+    def find(self, text):
+        """查找字符串编号，不存在时返回 -1"""
+        if self._ids is not None:
+            return self._ids.get(text, -1)
+        key = text.encode('utf-8')
+        table = self._table
+        mask = len(table) - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            i = table[slot]
+            if i == -1 or self._bytes(i) == key:
+                return i
+            slot = (slot + 1) & mask
+
+    def nbytes(self):
+        total = len(self.data) + self.offsets.itemsize * len(self.offsets)
+        if self._table is not None:
+            total += self._table.itemsize * len(self._table)
+        return total
+
+    def write(self, f):
+        """写入已冻结的字符串池"""
+        _write_array(f, array('B', self.data))
+        _write_array(f, self.offsets)
+        _write_array(f, self._table)
+
+    @classmethod
+    def read(cls, f):
+        pool = cls()
+        pool.data = bytearray(_read_array(f))
+        pool.offsets = _read_array(f)
+        pool._table = _read_array(f)
+        pool._ids = None
+        return pool
+
+
+class CompactIndex(object):
+    """列式语料索引：按页面连续存放标题与链接（CSR 布局）
+
+    页面编号即页面在 paths 中的编号；第 page 个页面的标题位于
+    heading_start[page]:heading_start[page + 1]，链接同理。
+    """
+
+    __slots__ = ('paths', 'strings',
+                 'heading_start', 'h_level', 'h_line', 'h_title', 'h_anchor',
+                 'link_start', 'l_line', 'l_text', 'l_target', '_anchor_keys', '_anchor_rows',
+                 '_anchor_global')
+
+    # 保存到磁盘的数组列（字符串池单独写入）
+    _COLUMNS = ('heading_start', 'h_level', 'h_line', 'h_title', 'h_anchor',
+                'link_start', 'l_line', 'l_text', 'l_target', '_anchor_keys', '_anchor_rows',
+                '_anchor_global')
+
+    def __init__(self):
+        self.paths = StringPool()
+        self.strings = StringPool()
+        self.heading_start = array('I', [0])
+        self.h_level = array('B')
+        self.h_line = array('I')
+        self.h_title = array('I')
+        self.h_anchor = array('I')
+        self.link_start = array('I', [0])
+        self.l_line = array('I')
+        self.l_text = array('I')
+        self.l_target = array('I')
+        self._anchor_keys = None
+        self._anchor_rows = None
+        self._anchor_global = None
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add_page(self, path, headings, links):
+        """追加一个页面（页面只能按顺序追加一次）"""
+        page = self.paths.add(path)
+        if page != len(self.heading_start) - 1:
+            raise ValueError(f'页面重复: {path}')
+        add = self.strings.add
+        for h in headings:
+            self.h_level.append(h.level)
+            self.h_line.append(h.line)
+            self.h_title.append(add(h.title))
+            self.h_anchor.append(add(h.anchor))
+        for l in links:
+            self.l_line.append(l.line)
+            self.l_text.append(add(l.text))
+            self.l_target.append(add(l.target))
+        self.heading_start.append(len(self.h_level))
+        self.link_start.append(len(self.l_line))
+        return page
+
+    def copy_page(self, src, page, path):
+        """从另一个（已冻结的）索引复制页面记录，不生成中间的 Heading / Link"""
+        new = self.paths.add(path)
+        if new != len(self.heading_start) - 1:
+            raise ValueError(f'页面重复: {path}')
+        add = self.strings.add
+        s = src.strings
+        for i in range(src.heading_start[page], src.heading_start[page + 1]):
+            self.h_level.append(src.h_level[i])
+            self.h_line.append(src.h_line[i])
+            self.h_title.append(add(s[src.h_title[i]]))
+            self.h_anchor.append(add(s[src.h_anchor[i]]))
+        for i in range(src.link_start[page], src.link_start[page + 1]):
+            self.l_line.append(src.l_line[i])
+            self.l_text.append(add(s[src.l_text[i]]))
+            self.l_target.append(add(s[src.l_target[i]]))
+        self.heading_start.append(len(self.h_level))
+        self.link_start.append(len(self.l_line))
+        return new
+
+    def freeze(self):
+        """构建完成：冻结字符串池，生成用于二分查找的有序键
+
+        _anchor_keys / _anchor_rows：按 (页面, 锚点) 排序的键及对应的标题下标，查页面内的锚点；
+        _anchor_global：按 (锚点, 标题下标) 排序的键，查定义了某个锚点的所有页面。
+        """
+        keys = array('Q')
+        rows = array('I')
+        starts = self.heading_start
+        anchors = self.h_anchor
+        # 页面的标题下标连续且页面编号递增，只需在每个页面内部排序
+        for page in range(len(self)):
+            for i in sorted(range(starts[page], starts[page + 1]), key=anchors.__getitem__):
+                keys.append(page << 32 | anchors[i])
+                rows.append(i)
+        self._anchor_keys = keys
+        self._anchor_rows = rows
+        self._anchor_global = array('Q', sorted(sid << 32 | i for i, sid in enumerate(anchors)))
+        self.paths.freeze()
+        self.strings.freeze()
+        return self
+
+    # ---------- 持久化 ----------
+
+    def write(self, f, stamp):
+        """写入已冻结的索引；stamp 用于校验索引与页面元数据是否来自同一次保存"""
+        f.write(_HEADER.pack(_MAGIC, COLUMNS_VERSION, sys.byteorder == 'little', stamp.encode('ascii')))
+        self.paths.write(f)
+        self.strings.write(f)
+        for name in self._COLUMNS:
+            _write_array(f, getattr(self, name))
+
+    @classmethod
+    def read(cls, f, stamp):
+        """读取索引：数组按列整块读入；文件损坏、版本或 stamp 不一致时返回 None"""
+        try:
+            magic, version, little, saved = _HEADER.unpack(f.read(_HEADER.size))
+            if (magic != _MAGIC or version != COLUMNS_VERSION or little != (sys.byteorder == 'little')
+                    or saved != stamp.encode('ascii')):
+                return None
+            index = cls()
+            index.paths = StringPool.read(f)
+            index.strings = StringPool.read(f)
+            for name in cls._COLUMNS:
+                setattr(index, name, _read_array(f))
+        except (EOFError, ValueError, struct.error):
+            return None
+        return index
+
+    # ---------- 按页面编号访问 ----------
+
+    def heading(self, row):
+        s = self.strings
+        return Heading(self.h_level[row], self.h_line[row], s[self.h_title[row]], s[self.h_anchor[row]])
+
+    def link(self, row):
+        s = self.strings
+        return Link(self.l_line[row], s[self.l_text[row]], s[self.l_target[row]])
+
+    def heading_rows(self, page):
+        return range(self.heading_start[page], self.heading_start[page + 1])
+
+    def link_rows(self, page):
+        return range(self.link_start[page], self.link_start[page + 1])
+
+    def page_of(self, row):
+        """标题下标所属的页面编号"""
+        return bisect_right(self.heading_start, row) - 1
+
+    def page_headings(self, page):
+        return [self.heading(i) for i in self.heading_rows(page)]
+
+    def page_links(self, page):
+        return [self.link(i) for i in self.link_rows(page)]
+
+    def page_anchors(self, page):
+        s = self.strings
+        return [s[self.h_anchor[i]] for i in self.heading_rows(page)]
+
+    def anchor_row(self, page, anchor):
+        """页面中锚点所在的标题下标（哈希定位字符串 + 二分查找有序键），不存在时返回 -1"""
+        sid = self.strings.find(anchor)
+        if sid < 0:
+            return -1
+        key = page << 32 | sid
+        keys = self._anchor_keys
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            return self._anchor_rows[pos]
+        return -1
+
+    # ---------- 全局查找 ----------
+
+    def anchor_rows(self, anchor):
+        """定义了该锚点的所有标题下标（按页面、行号排序），二分查找 _anchor_global"""
+        sid = self.strings.find(anchor)
+        if sid < 0:
+            return []
+        keys = self._anchor_global
+        lo = bisect_left(keys, sid << 32)
+        hi = bisect_left(keys, (sid + 1) << 32, lo)
+        return [keys[i] & 0xFFFFFFFF for i in range(lo, hi)]
+
+    def title_rows(self, match):
+        """标题文本满足 match(title) 的所有标题下标；每个不同的标题只解码、判断一次"""
+        s = self.strings
+        hits = set(sid for sid in set(self.h_title) if match(s[sid]))
+        return [i for i, sid in enumerate(self.h_title) if sid in hits]
+
+    # ---------- 按页面路径访问 ----------
+
+    def page_id(self, path):
+        return self.paths.find(path)
+
+    def headings(self, path):
+        """按需生成页面的 Heading 记录"""
+        page = self.page_id(path)
+        if page < 0:
+            return
+        for i in self.heading_rows(page):
+            yield self.heading(i)
+
+    def links(self, path):
+        page = self.page_id(path)
+        if page < 0:
+            return
+        for i in self.link_rows(page):
+            yield self.link(i)
+
+    def has_anchor(self, path, anchor):
+        """页面中是否存在该锚点"""
+        page = self.page_id(path)
+        return page >= 0 and self.anchor_row(page, anchor) >= 0
+
+    def column(self, name):
+        """返回列数据；安装 NumPy 时为零拷贝的 ndarray 视图"""
+        col = getattr(self, name)
+        if numpy is None:
+            return col
+        return numpy.frombuffer(col, dtype=col.typecode)
+
+    def nbytes(self):
+        """索引实际占用的字节数（数组与字符串池）"""
+        total = self.paths.nbytes() + self.strings.nbytes()
+        for name in self._COLUMNS:
+            col = getattr(self, name)
+            total += col.itemsize * len(col)
+        return total
+
+    def stats(self):
+        return {
+            'pages': len(self),
+            'headings': len(self.h_level),
+            'links': len(self.l_line),
+            'strings': len(self.strings),
+            'bytes': self.nbytes(),
+        }
+
+
+def object_nbytes(corpus):
+    """估算以 Python 对象（namedtuple + str）保存标题与链接时的内存占用"""
+    seen = set()
+    total = 0
+    for page in corpus:
+        for records in (page.headings, page.links):
+            total += sys.getsizeof(records)
+            for record in records:
+                total += sys.getsizeof(record)
+                for field in record:
+                    if id(field) not in seen:
+                        seen.add(id(field))
+                        total += sys.getsizeof(field)
+    return total
+
+
+def cmd_index_stats(args):
+    """输出紧凑索引的规模与内存占用"""
+    # corpus 依赖本模块保存索引，在这里导入以避免循环导入
+    from .corpus import INDEX_COLUMNS_FILE, load_corpus
+    from .common import cache_path
+
+    corpus = load_corpus(args.root)
+    stats = corpus.index.stats()
+    objects = object_nbytes(corpus)
+    records = max(stats['headings'] + stats['links'], 1)
+
+    print("=== 语料索引内存占用 ===\n")
+    print(f"📄 页面: {stats['pages']}")
+    print(f"🔖 标题: {stats['headings']}")
+    print(f"🔗 链接: {stats['links']}")
+    print(f"🔤 去重后字符串: {stats['strings']}\n")
+    print(f"对象形式: {objects / 1024:.1f} KB（每条记录 {objects / records:.0f} 字节）")
+    print(f"紧凑形式: {stats['bytes'] / 1024:.1f} KB（每条记录 {stats['bytes'] / records:.0f} 字节）")
+    path = cache_path(args.root, INDEX_COLUMNS_FILE)
+    if path.exists():
+        print(f"索引文件: {path.stat().st_size / 1024:.1f} KB（{path.name}）")
+    if numpy is None:
+        print("\n💡 未安装 NumPy，列数据以 array 形式提供（pip install numpy 可获得 ndarray 视图）")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('index-stats', help='统计紧凑语料索引的规模与内存占用')
+    p.set_defaults(func=cmd_index_stats)
@@ -0,0 +1,511 @@
+# -*- coding: utf-8 -*-
+"""
+语料索引 - 扫描 docs/ 下所有 Markdown 页面，提取标题、锚点、链接与代码块
+
+索引持久化到 .cache/doctools/：corpus.json 保存页面元数据，标题与链接以列式数组和
+字符串池（compact.CompactIndex）保存在 corpus.idx 中，加载时按列整块读入，不为每条记录
+创建对象；page.headings / page.links 只在访问时才生成。按文件大小/修改时间/内容哈希增量更新：
+未变化的页面直接复用上次的解析结果，只有变化的页面才会重新读取和解析。
+
+重新解析时文件通过 mmap 映射，哈希与扫描都直接作用于映射缓冲区（markdown.scan_buffer），
+只有标题行和链接行会被解码，不再整体读入、解码并按行切分，大页面的峰值内存基本不变。
+"""
+
+import io
+import os
+import posixpath
+import re
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+from .common import (DOCS_DIR, cache_path, content_hash, load_json, map_file, save_json, module_of, url_to_page,
+                     write_bytes_atomic)
+from .compact import CompactIndex, Heading, Link
+from .gitref import GitObjectReader, GitTree
+from .markdown import scan_buffer, tokenize
+
+INDEX_VERSION = 2
+INDEX_FILE = 'corpus.json'
+INDEX_COLUMNS_FILE = 'corpus.idx'
+
+Fence = namedtuple('Fence', 'line end lang indent')
+
+# 排除 VitePress 配置目录和 srcExclude 中的 README.md
+_EXCLUDED_DIRS = {'.vitepress', 'node_modules', 'public', 'snippets'}
+
+_EXTERNAL = re.compile(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)')
+
+
+class Page(object):
+    """单个页面的索引记录
+
+    刚解析的页面自带标题与链接列表；并入紧凑索引后（attach）只保留页面编号，
+    标题与链接从索引的列中按需生成。
+    """
+
+    __slots__ = ('path', 'size', 'mtime', 'hash', 'title', 'fences', 'frontmatter',
+                 '_headings', '_links', '_index', '_id')
+
+    def __init__(self, path, size=0, mtime=0, hash='', title='',
+                 headings=None, links=None, fences=None, frontmatter=None):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.hash = hash
+        self.title = title
+        self._headings = headings or []
+        self._links = links or []
+        self.fences = fences or []
+        self.frontmatter = frontmatter
+        self._index = None
+        self._id = -1
+
+    def attach(self, index, page_id):
+        """改为引用紧凑索引中的记录，释放解析得到的对象列表"""
+        self._index, self._id = index, page_id
+        self._headings = self._links = None
+
+    @property
+    def module(self):
+        return module_of(self.path)
+
+    @property
+    def headings(self):
+        if self._index is None:
+            return self._headings
+        return self._index.page_headings(self._id)
+
+    @property
+    def links(self):
+        if self._index is None:
+            return self._links
+        return self._index.page_links(self._id)
+
+    def anchors(self):
+        """返回页面内所有标题锚点"""
+        if self._index is None:
+            return [h.anchor for h in self._headings]
+        return self._index.page_anchors(self._id)
+
+    def heading(self, anchor):
+        """锚点对应的标题，不存在时返回 None"""
+        if self._index is None:
+            return next((h for h in self._headings if h.anchor == anchor), None)
+        row = self._index.anchor_row(self._id, anchor)
+        return self._index.heading(row) if row >= 0 else None
+
+    def has_anchor(self, anchor):
+        if self._index is None:
+            return any(h.anchor == anchor for h in self._headings)
+        return self._index.anchor_row(self._id, anchor) >= 0
+
+    def link_lines(self):
+        """包含链接的行号"""
+        if self._index is None:
+            return set(l.line for l in self._links)
+        index = self._index
+        return set(index.l_line[i] for i in index.link_rows(self._id))
+
+    def link_targets(self):
+        """页面中所有链接的地址"""
+        if self._index is None:
+            return [l.target for l in self._links]
+        index = self._index
+        s = index.strings
+        return [s[index.l_target[i]] for i in index.link_rows(self._id)]
+
+    def to_json(self):
+        return [self.size, self.mtime, self.hash, self.title,
+                [list(f) for f in self.fences],
+                list(self.frontmatter) if self.frontmatter else None]
+
+    @classmethod
+    def from_json(cls, path, data):
+        size, mtime, hash, title, fences, frontmatter = data
+        return cls(path, size, mtime, hash, title,
+                   fences=[Fence(*f) for f in fences],
+                   frontmatter=tuple(frontmatter) if frontmatter else None)
+
+
+def scan_markdown(text):
+    """解析 Markdown 文本，返回 (标题, 链接, 代码块, front matter 行范围)
+
+    行号从 1 开始；代码块内的标题和链接会被忽略。
+    """
+    return collect_records(tokenize(text.split('\n')))
+
+
+def scan_markdown_buffer(buf):
+    """与 scan_markdown 相同，但直接扫描 bytes / mmap 缓冲区，只解码需要的行"""
+    return collect_records(scan_buffer(buf))
+
+
+def collect_records(tokens):
+    """从事件流中收集索引记录"""
+    headings = []
+    links = []
+    fences = []
+    frontmatter = None
+    for tok in tokens:
+        kind = tok.kind
+        if kind == 'heading':
+            headings.append(Heading(tok.level, tok.line, tok.text, tok.target))
+        elif kind == 'link':
+            links.append(Link(tok.line, tok.text, tok.target))
+        elif kind == 'fence_close':
+            fences.append(Fence(tok.end, tok.line, tok.info, tok.level))
+        elif kind == 'frontmatter':
+            frontmatter = (tok.line, tok.end)
+    return headings, links, fences, frontmatter
+
+
+def resolve_link(from_path, target):
+    """解析页面中的链接，返回 (docs 相对路径, 锚点)
+
+    站外链接返回 (None, None)；纯锚点链接指向当前页面。
+    """
+    if _EXTERNAL.match(target):
+        return None, None
+    path, _, anchor = target.partition('#')
+    anchor = anchor or None
+    if not path:
+        return from_path, anchor
+    path = path.split('?', 1)[0]
+    if not path.startswith('/'):
+        joined = posixpath.normpath(posixpath.join(posixpath.dirname(from_path), path))
+        path = '/' + ('' if joined == '.' else joined)
+        if target.split('#', 1)[0].endswith('/'):
+            path += '/'
+    return url_to_page(path), anchor
+
+
+def is_page_file(rel_path):
+    """docs/ 下的相对路径是否为参与构建的页面"""
+    parts = rel_path.split('/')
+    if not parts[-1].endswith('.md') or parts[-1] == 'README.md':
+        return False
+    return not any(d in _EXCLUDED_DIRS or d.startswith('.') for d in parts[:-1])
+
+
+def iter_page_files(root):
+    """遍历 docs/ 下所有参与构建的 Markdown 文件，返回相对 docs/ 的路径（已排序）"""
+    docs = Path(root) / DOCS_DIR
+    result = []
+    for dirpath, dirnames, filenames in os.walk(docs):
+        dirnames[:] = [d for d in dirnames if d not in _EXCLUDED_DIRS and not d.startswith('.')]
+        for name in filenames:
+            if name.endswith('.md') and name != 'README.md':
+                full = os.path.join(dirpath, name)
+                result.append(os.path.relpath(full, docs).replace(os.sep, '/'))
+    result.sort()
+    return result
+
+
+class Corpus(object):
+    """持久化的语料索引"""
+
+    # 工作区索引为 None，RefCorpus 为对应的 git ref
+    ref = None
+
+    def __init__(self, root='.'):
+        self.root = Path(root)
+        self.docs = self.root / DOCS_DIR
+        self.pages = {}
+        self.index = None
+        self.changed = set()
+        self.removed = set()
+        self.dirty = False
+
+    def __iter__(self):
+        return iter(self.pages[p] for p in sorted(self.pages))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __contains__(self, path):
+        return path in self.pages
+
+    def get(self, path):
+        return self.pages.get(path)
+
+    def modules(self):
+        """按模块分组返回页面路径"""
+        groups = {}
+        for path in sorted(self.pages):
+            groups.setdefault(module_of(path), []).append(path)
+        return groups
+
+    def _loose(self):
+        """尚未并入当前紧凑索引的页面（如编辑器中修改后重新解析的页面）"""
+        return [page for page in self if page._index is None or page._index is not self.index]
+
+    def _indexed(self, path, page_id):
+        """索引中的页面记录是否仍是该页面的当前内容"""
+        page = self.pages.get(path)
+        return page is not None and page._index is self.index and page._id == page_id
+
+    def has_anchor(self, path, anchor):
+        page = self.pages.get(path)
+        return page is not None and page.has_anchor(anchor)
+
+    def find_anchor(self, anchor, path=None):
+        """定义了该锚点的标题：[(页面, Heading)]，按页面、行号排序"""
+        result = []
+        index = self.index
+        if index is not None:
+            for row in index.anchor_rows(anchor):
+                page_id = index.page_of(row)
+                page = index.paths[page_id]
+                if (path is None or page == path) and self._indexed(page, page_id):
+                    result.append((page, index.heading(row)))
+        for page in self._loose():
+            if path is None or page.path == path:
+                result.extend((page.path, h) for h in page.headings if h.anchor == anchor)
+        result.sort(key=lambda r: (r[0], r[1].line))
+        return result
+
+    def find_headings(self, match, module=None, level=None):
+        """标题文本满足 match(title) 的标题：[(页面, Heading)]，按页面、行号排序"""
+        result = []
+        index = self.index
+        if index is not None:
+            for row in index.title_rows(match):
+                if level is not None and index.h_level[row] != level:
+                    continue
+                page_id = index.page_of(row)
+                page = index.paths[page_id]
+                if (not module or module_of(page) == module) and self._indexed(page, page_id):
+                    result.append((page, index.heading(row)))
+        for page in self._loose():
+            if module and page.module != module:
+                continue
+            result.extend((page.path, h) for h in page.headings
+                          if match(h.title) and (level is None or h.level == level))
+        result.sort(key=lambda r: (r[0], r[1].line))
+        return result
+
+    def _resolved_links(self):
+        """遍历所有链接：产生 (来源页面, 链接, 目标页面, 锚点)，链接为索引中的下标或 Link
+
+        索引中的链接地址按 (来源目录, 地址) 只解码、解析一次。
+        """
+        index = self.index
+        if index is not None:
+            s = index.strings
+            resolved = {}
+            for page_id in range(len(index)):
+                path = index.paths[page_id]
+                if not self._indexed(path, page_id):
+                    continue
+                base = posixpath.dirname(path)
+                for row in index.link_rows(page_id):
+                    sid = index.l_target[row]
+                    hit = resolved.get((base, sid))
+                    if hit is None:
+                        target = s[sid]
+                        hit = resolve_link(path, target)
+                        # 纯锚点链接指向来源页面本身，不能按目录复用
+                        if target.split('#', 1)[0]:
+                            resolved[(base, sid)] = hit
+                    yield path, row, hit[0], hit[1]
+        for page in self._loose():
+            for link in page.links:
+                target, anchor = resolve_link(page.path, link.target)
+                yield page.path, link, target, anchor
+
+    def _link(self, link):
+        return self.index.link(link) if isinstance(link, int) else link
+
+    def links_to(self, path, anchor=None):
+        """链接到该页面（或该页面某个锚点）的位置：[(来源页面, Link, 锚点)]"""
+        result = []
+        for source, link, target, link_anchor in self._resolved_links():
+            if target == path and (anchor is None or link_anchor == anchor):
+                result.append((source, self._link(link), link_anchor))
+        result.sort(key=lambda r: (r[0], r[1].line))
+        return result
+
+    def backlinks(self):
+        """链接反向索引：{目标页面: [(来源页面, Link, 锚点)]}"""
+        result = {}
+        for source, link, target, anchor in self._resolved_links():
+            if target is not None:
+                result.setdefault(target, []).append((source, self._link(link), anchor))
+        return result
+
+    def read_text(self, path):
+        """读取页面原文"""
+        with open(self.docs / path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def read_file(self, path):
+        """读取项目根目录下的其他文件（如 sidebar.ts）"""
+        with open(self.root / path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def stamp(self):
+        """页面路径与内容哈希的摘要，用于确认 corpus.idx 与 corpus.json 来自同一次保存"""
+        return content_hash(''.join(f'{p}\0{self.pages[p].hash}\n' for p in sorted(self.pages)))
+
+    def build_index(self):
+        """把所有页面的标题与链接重新写入紧凑索引；已在索引中的页面直接按列复制"""
+        index = CompactIndex()
+        paths = sorted(self.pages)
+        for path in paths:
+            page = self.pages[path]
+            if page._index is not None:
+                index.copy_page(page._index, page._id, path)
+            else:
+                index.add_page(path, page._headings, page._links)
+        index.freeze()
+        for page_id, path in enumerate(paths):
+            self.pages[path].attach(index, page_id)
+        self.index = index
+        return index
+
+    def load(self, refresh=True):
+        """加载持久化索引；refresh 为 True 时同步磁盘上的变化
+
+        corpus.idx 缺失或与 corpus.json 不一致时丢弃整个缓存，全部重新解析。
+        """
+        data = load_json(cache_path(self.root, INDEX_FILE))
+        if data and data.get('version') == INDEX_VERSION:
+            for path, record in data['pages'].items():
+                self.pages[path] = Page.from_json(path, record)
+            index = None
+            try:
+                with open(cache_path(self.root, INDEX_COLUMNS_FILE), 'rb') as f:
+                    index = CompactIndex.read(f, self.stamp())
+            except OSError:
+                pass
+            if index is not None and len(index) == len(self.pages):
+                for page_id, path in enumerate(sorted(self.pages)):
+                    self.pages[path].attach(index, page_id)
+                self.index = index
+            else:
+                self.pages = {}
+        if refresh:
+            self.refresh()
+        return self
+
+    def refresh(self):
+        """增量更新：按大小和修改时间判断是否需要重新读取，再按内容哈希判断是否需要重新解析"""
+        current = iter_page_files(self.root)
+        current_set = set(current)
+        self.removed = set(p for p in self.pages if p not in current_set)
+        for path in self.removed:
+            del self.pages[path]
+
+        self.changed = set()
+        self.dirty = bool(self.removed)
+        for path in current:
+            st = os.stat(self.docs / path)
+            old = self.pages.get(path)
+            if old is not None and old.size == st.st_size and old.mtime == st.st_mtime_ns:
+                continue
+            with map_file(self.docs / path) as data:
+                digest = content_hash(data)
+                self.dirty = True
+                if old is not None and old.hash == digest:
+                    old.size, old.mtime = st.st_size, st.st_mtime_ns
+                    continue
+                self.pages[path] = self.parse_page(path, data, st.st_size, st.st_mtime_ns, digest)
+            self.changed.add(path)
+        if self.changed or self.removed or self.index is None:
+            self.build_index()
+        return self.changed
+
+    @staticmethod
+    def parse_page(path, data, size=0, mtime=0, digest=None):
+        """解析单个页面内容（bytes 或 mmap）"""
+        headings, links, fences, frontmatter = scan_markdown_buffer(data)
+        title = ''
+        for h in headings:
+            if h.level == 1:
+                title = h.title
+                break
+        return Page(path, size, mtime, digest or content_hash(data), title,
+                    headings, links, fences, frontmatter)
+
+    def save(self):
+        """保存索引：先写 corpus.idx 再写 corpus.json，两者通过 stamp 互相校验"""
+        if self.index is None or self._loose() or len(self.index) != len(self.pages):
+            self.build_index()
+        buf = io.BytesIO()
+        self.index.write(buf, self.stamp())
+        write_bytes_atomic(cache_path(self.root, INDEX_COLUMNS_FILE), buf.getvalue())
+        save_json(cache_path(self.root, INDEX_FILE), {
+            'version': INDEX_VERSION,
+            'pages': {p: self.pages[p].to_json() for p in sorted(self.pages)},
+        })
+
+
+class RefCorpus(Corpus):
+    """某个 git ref 的语料索引：直接从 git 对象读取，不落盘、不影响工作区索引"""
+
+    def __init__(self, root, tree):
+        super().__init__(root)
+        self.tree = tree
+        self.ref = tree.ref
+        self._texts = {}
+
+    def load(self, refresh=True, base=None):
+        """读取 ref 中的所有页面；内容与 base（通常为工作区索引）相同的页面直接复用解析结果"""
+        known = {page.hash: page for page in base} if base is not None else {}
+        prefix = DOCS_DIR + '/'
+        for path in sorted(self.tree.files(DOCS_DIR)):
+            rel = path[len(prefix):]
+            if not is_page_file(rel):
+                continue
+            data = self.tree.read_bytes(path)
+            digest = content_hash(data)
+            self._texts[rel] = data.decode('utf-8', errors='replace')
+            old = known.get(digest)
+            if old is not None:
+                page = Page(rel, len(data), 0, digest, old.title,
+                            old._headings, old._links, old.fences, old.frontmatter)
+                if old._index is not None:
+                    page.attach(old._index, old._id)
+                self.pages[rel] = page
+            else:
+                self.pages[rel] = self.parse_page(rel, data, len(data), 0, digest)
+            self.changed.add(rel)
+        self.build_index()
+        return self
+
+    def refresh(self):
+        return set()
+
+    def read_text(self, path):
+        return self._texts[path]
+
+    def read_file(self, path):
+        return self.tree.read_text(path)
+
+    def save(self):
+        pass
+
+
+def load_ref_corpus(root, tree):
+    """加载 git ref 的语料索引（tree 为 gitref.GitTree）"""
+    # 按内容哈希复用，工作区索引是否最新不影响正确性，因此不需要刷新
+    return RefCorpus(root, tree).load(base=load_corpus(root, refresh=False, save=False))
+
+
+def load_corpus(root='.', refresh=True, save=True):
+    """加载并增量刷新语料索引，刷新后自动保存"""
+    corpus = Corpus(root).load(refresh=refresh)
+    if save and corpus.dirty:
+        corpus.save()
+    return corpus
+
+
+@contextmanager
+def open_corpus(root='.', ref=None):
+    """ref 为空时加载工作区索引，否则通过 git cat-file 读取该 ref 的文件树（不需要 checkout）"""
+    if ref is None:
+        yield load_corpus(root)
+        return
+    with GitObjectReader(root) as git:
+        yield load_ref_corpus(root, GitTree(git, ref))
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+增量部署清单 - 对比构建产物与上次部署的清单，输出新增 / 变化 / 删除的文件列表
+
+    bash .scripts/doc-tools.sh deploy-manifest --out .cache/deploy     # 计算差异，写出文件列表
+    rsync -a --files-from=.cache/deploy/upload.txt docs/.vitepress/dist/ host:/srv/site/
+    bash .scripts/doc-tools.sh deploy-manifest --save                  # 上传成功后更新清单
+
+清单为紧凑 JSON（默认 .cache/doctools/deploy-manifest.json）：
+
+    {"v": 1, "files": {"index.html": [大小, 修改时间(ns), 哈希], ...}}
+
+只有大小或修改时间与清单不同的文件才会被读取，哈希在线程池中并行计算（hashlib 在计算时
+释放 GIL）。文件名已包含内容哈希的构建资源（assets/*.<8 位哈希>.js 等）路径不变即内容不变，
+CI 中每次构建修改时间都会变化，这类文件同样不需要读取。
+
+--out 目录下写出 added.txt、changed.txt、removed.txt 与 upload.txt（新增 + 变化），
+每行一个相对于 dist 的路径，可直接用于 rsync --files-from 或对象存储的批量上传 / 删除。
+
+部署到 GitHub Pages（gh-pages 分支）时 git 本身只推送变化的对象，不需要这一步。
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import CACHE_DIR, DIST_DIR, cache_path, content_hash, load_json, map_file, save_json, write_text_atomic
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = 'deploy-manifest.json'
+
+# VitePress / Vite 输出的带内容哈希的资源文件名，如 assets/app.DXq9Ofe7.js、assets/ai_index.md.DXq9Ofe7.lean.js
+_HASHED_ASSET = re.compile(r'^assets/(?:.+/)?[^/]+\.[A-Za-z0-9_-]{8}(?:\.lean)?\.[a-z0-9]+$')
+
+
+def is_hashed_asset(rel):
+    """文件名是否带内容哈希（路径不变即内容不变）"""
+    return bool(_HASHED_ASSET.match(rel))
+
+
+def iter_dist_files(dist):
+    """遍历构建目录，产生 (相对路径, os.stat_result)，路径使用 / 分隔"""
+    stack = [str(dist)]
+    while stack:
+        base = stack.pop()
+        with os.scandir(base) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    rel = os.path.relpath(entry.path, str(dist)).replace(os.sep, '/')
+                    yield rel, entry.stat()
+
+
+def _hash_file(path):
+    with map_file(path) as data:
+        return content_hash(data)
+
+
+def scan_dist(dist, previous, jobs=None, entries=None):
+    """计算构建目录的文件状态 {路径: [大小, 修改时间, 哈希]}，返回 (状态, 读取的文件数, 按文件名跳过的文件数)
+
+    previous 为上次的状态：大小与修改时间都相同、或者是大小相同的哈希资源文件时直接复用哈希。
+    entries 为 (相对路径, os.stat_result) 序列，默认遍历整个构建目录。
+    """
+    files = {}
+    pending = []
+    by_name = 0
+    for rel, st in entries if entries is not None else iter_dist_files(dist):
+        old = previous.get(rel)
+        if old is not None and old[0] == st.st_size:
+            if old[1] == st.st_mtime_ns:
+                files[rel] = old
+                continue
+            if is_hashed_asset(rel):
+                files[rel] = [st.st_size, st.st_mtime_ns, old[2]]
+                by_name += 1
+                continue
+        files[rel] = [st.st_size, st.st_mtime_ns, None]
+        pending.append(rel)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 2)) as pool:
+            for rel, digest in zip(pending, pool.map(_hash_file, [os.path.join(str(dist), p) for p in pending])):
+                files[rel][2] = digest
+    return {rel: files[rel] for rel in sorted(files)}, len(pending), by_name
+
+
+def diff_manifest(previous, current):
+    """对比两个清单，返回 (新增, 变化, 删除) 路径列表（已排序）"""
+    added = [p for p in current if p not in previous]
+    changed = [p for p in current if p in previous and previous[p][2] != current[p][2]]
+    removed = sorted(p for p in previous if p not in current)
+    return added, changed, removed
+
+
+def write_lists(out, added, changed, removed):
+    """写出文件列表，返回写入的文件路径"""
+    lists = {'added': added, 'changed': changed, 'removed': removed, 'upload': sorted(added + changed)}
+    paths = []
+    for name, items in lists.items():
+        target = os.path.join(out, f'{name}.txt')
+        write_text_atomic(target, ''.join(p + '\n' for p in items))
+        paths.append(target)
+    return paths
+
+
+def cmd_deploy_manifest(args):
+    """增量部署清单"""
+    dist = os.path.join(args.root, args.dist)
+    if not os.path.isdir(dist):
+        print(f"❌ 错误: 构建目录不存在: {args.dist}（请先运行 pnpm docs:build）")
+        return 2
+    manifest_file = args.manifest or cache_path(args.root, MANIFEST_FILE)
+    data = load_json(manifest_file, {})
+    previous = data.get('files', {}) if data.get('v') == MANIFEST_VERSION else {}
+
+    current, hashed, by_name = scan_dist(dist, previous, args.jobs)
+    added, changed, removed = diff_manifest(previous, current)
+    upload_bytes = sum(current[p][0] for p in added + changed)
+    total_bytes = sum(entry[0] for entry in current.values())
+
+    if args.out:
+        write_lists(os.path.join(args.root, args.out), added, changed, removed)
+    if args.save:
+        save_json(manifest_file, {'v': MANIFEST_VERSION, 'files': current})
+
+    if args.json:
+        print(json.dumps({'added': added, 'changed': changed, 'removed': removed,
+                          'uploadBytes': upload_bytes, 'totalBytes': total_bytes}, ensure_ascii=False, indent=2))
+        return 0
+
+    print("=== 增量部署清单 ===\n")
+    print(f"🔍 {len(current)} 个文件，读取 {hashed} 个（按文件名哈希跳过 {by_name} 个，其余大小与修改时间未变）")
+    if not previous:
+        print("💡 没有上次部署的清单，所有文件视为新增")
+    print(f"\n  ➕ 新增 {len(added)} 个")
+    print(f"  ✏️  变化 {len(changed)} 个")
+    print(f"  🗑️  删除 {len(removed)} 个")
+    share = upload_bytes / total_bytes * 100 if total_bytes else 0
+    print(f"\n📤 需要上传 {upload_bytes:,} / {total_bytes:,} 字节（{share:.1f}%）")
+    if args.out:
+        print(f"📁 {args.out}/{{added,changed,removed,upload}}.txt")
+    if args.save:
+        print(f"💾 已更新清单: {os.path.relpath(str(manifest_file), args.root)}")
+    else:
+        print("\n💡 部署成功后运行 deploy-manifest --save 更新清单")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('deploy-manifest', help='并行哈希构建产物，与上次部署的清单对比，输出增量上传 / 删除列表')
+    p.add_argument('--dist', default=DIST_DIR, help=f'构建目录（默认 {DIST_DIR}）')
+    p.add_argument('--manifest', help=f'清单文件（默认 {CACHE_DIR}/{MANIFEST_FILE}）')
+    p.add_argument('--out', help='写出 added / changed / removed / upload.txt 的目录')
+    p.add_argument('--save', action='store_true', help='把本次的文件状态保存为新的清单（部署成功后使用）')
+    p.add_argument('--jobs', type=int, help='哈希线程数（默认 CPU 核数的 2 倍）')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出差异')
+    p.set_defaults(func=cmd_deploy_manifest)
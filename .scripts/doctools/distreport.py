@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+构建产物分析 - 统计 dist/ 中每个页面的 HTML / JS 体积，找出最重的页面和共享 chunk，并与基线对比
+
+VitePress 1.x 的构建产物与源文件的对应关系：
+
+    ai/chapter-04.html                      docs/ai/chapter-04.md 的 HTML
+    assets/ai_chapter-04.md.<哈希>.js       页面组件（客户端路由切换时加载）
+    assets/ai_chapter-04.md.<哈希>.lean.js  首次加载时使用的精简版本
+    assets/chunks/*.js                      框架、主题等共享 chunk
+    assets/chunks/@localSearchIndex*.js     本地搜索索引；search/*.json 为 search-index 生成的分片
+
+页面的首次加载体积 = HTML + HTML 中引用的脚本、modulepreload 与样式表。每个 HTML 都内联了
+__VP_HASH_MAP__ 与 __VP_SITE_DATA__（含完整侧边栏），页面越多、侧边栏越大，这部分重复越多，单独统计。
+
+基线（默认 docs/.vitepress/dist-baseline.json）记录各分类与各模块的总字节数，--check 时
+任一项比基线增长超过阈值即返回 1，--update-baseline 以本次结果更新基线。
+"""
+
+import gzip
+import json
+import os
+import posixpath
+import re
+
+from .common import DIST_DIR, VITEPRESS_DIR, load_json, module_of, page_url, save_json
+from .corpus import load_corpus
+from .deploy import iter_dist_files
+
+BASELINE_VERSION = 1
+BASELINE_FILE = VITEPRESS_DIR + '/dist-baseline.json'
+DEFAULT_TOP = 10
+DEFAULT_THRESHOLD = 5.0
+
+CATEGORIES = [
+    ('html', 'HTML'),
+    ('page-js', '页面 JS'),
+    ('shared-js', '共享 JS'),
+    ('css', 'CSS'),
+    ('search', '搜索索引'),
+    ('other', '其他资源'),
+]
+
+_PAGE_CHUNK = re.compile(r'^assets/(.+\.md)\.[A-Za-z0-9_-]{8}(\.lean)?\.js$')
+_SEARCH_FILE = re.compile(r'^(?:assets/chunks/@localSearchIndex[^/]*\.js|search/[^/]+\.json)$')
+_ASSET_REF = re.compile(
+    r'<(?:script[^>]*?\ssrc|link[^>]*?\srel="(?:modulepreload|preload stylesheet|stylesheet)"[^>]*?\shref)="([^"]+)"')
+_INLINE_DATA = re.compile(r'window\.(__VP_HASH_MAP__|__VP_SITE_DATA__)\s*=\s*JSON\.parse\(("(?:[^"\\]|\\.)*")\)')
+_BASE = re.compile(r'''^\s*base:\s*["']([^"']+)["']''', re.M)
+
+
+def categorize(rel):
+    if rel.endswith('.html'):
+        return 'html'
+    if _SEARCH_FILE.match(rel):
+        return 'search'
+    if _PAGE_CHUNK.match(rel):
+        return 'page-js'
+    if rel.endswith(('.js', '.mjs')):
+        return 'shared-js'
+    if rel.endswith('.css'):
+        return 'css'
+    return 'other'
+
+
+def site_base(root):
+    """读取 config.ts 中的 base（如 /simonProjectGuide/），没有时为 /"""
+    try:
+        with open(os.path.join(root, VITEPRESS_DIR, 'config.ts'), 'r', encoding='utf-8') as f:
+            match = _BASE.search(f.read())
+    except OSError:
+        match = None
+    return match.group(1) if match else '/'
+
+
+class PageWeight(object):
+    """单个页面的体积构成"""
+
+    __slots__ = ('source', 'file', 'html', 'inline', 'own_js', 'chunks', 'refs')
+
+    def __init__(self, source, file, html, inline):
+        self.source = source
+        self.file = file
+        self.html = html
+        self.inline = inline
+        self.own_js = 0
+        self.chunks = []
+        self.refs = []
+
+    def first_load(self, sizes):
+        return self.html + sum(sizes.get(r, 0) for r in self.refs)
+
+
+class DistReport(object):
+    """构建产物分析结果"""
+
+    def __init__(self, sizes, pages, unmatched, gzipped):
+        self.sizes = sizes
+        self.pages = pages
+        self.unmatched = unmatched
+        self.gzipped = gzipped
+
+    def totals(self):
+        """{分类: [文件数, 字节]}"""
+        result = {key: [0, 0] for key, _ in CATEGORIES}
+        for rel, size in self.sizes.items():
+            entry = result[categorize(rel)]
+            entry[0] += 1
+            entry[1] += size
+        return result
+
+    def modules(self):
+        """{模块: 页面 HTML 与页面 JS 的字节数}"""
+        result = {}
+        for weight in self.pages.values():
+            module = module_of(weight.source)
+            result[module] = result.get(module, 0) + weight.html + weight.own_js
+        return dict(sorted(result.items()))
+
+    def chunk_usage(self):
+        """共享资源被多少个页面的 HTML 引用：{路径: 页面数}"""
+        usage = {}
+        for weight in self.pages.values():
+            for ref in weight.refs:
+                if not _PAGE_CHUNK.match(ref):
+                    usage[ref] = usage.get(ref, 0) + 1
+        return usage
+
+    def to_baseline(self):
+        return {'v': BASELINE_VERSION, 'gzip': self.gzipped,
+                'totals': {k: v[1] for k, v in self.totals().items()}, 'modules': self.modules()}
+
+
+def _gzip_size(path):
+    with open(path, 'rb') as f:
+        return len(gzip.compress(f.read(), compresslevel=6))
+
+
+def _resolve_ref(href, html_rel, base):
+    """把 HTML 中的资源链接解析为 dist 内的相对路径；站外链接返回 None"""
+    href = href.split('#', 1)[0].split('?', 1)[0]
+    if not href or re.match(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)', href):
+        return None
+    if href.startswith('/'):
+        if base != '/' and href.startswith(base):
+            href = href[len(base):]
+        return href.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(html_rel), href))
+
+
+def analyze_dist(root='.', dist=None, use_gzip=False):
+    """分析构建目录，返回 DistReport"""
+    dist = os.path.join(root, dist or DIST_DIR)
+    base = site_base(root)
+    corpus = load_corpus(root)
+    html_pages = {page_url(p.path).lstrip('/') + ('index.html' if p.path.endswith('index.md') else '.html'): p.path
+                  for p in corpus}
+    chunk_pages = {p.path.replace('/', '_'): p.path for p in corpus}
+
+    sizes = {}
+    for rel, st in iter_dist_files(dist):
+        sizes[rel] = _gzip_size(os.path.join(dist, rel)) if use_gzip else st.st_size
+
+    pages = {}
+    unmatched = []
+    for rel in sorted(sizes):
+        if not rel.endswith('.html'):
+            continue
+        source = html_pages.get(rel)
+        if source is None:
+            unmatched.append(rel)
+            continue
+        with open(os.path.join(dist, rel), 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        inline = {name: len(value.encode('utf-8')) for name, value in _INLINE_DATA.findall(text)}
+        weight = PageWeight(source, rel, sizes[rel], inline)
+        for href in _ASSET_REF.findall(text):
+            ref = _resolve_ref(href, rel, base)
+            if ref in sizes and ref not in weight.refs:
+                weight.refs.append(ref)
+        pages[source] = weight
+
+    for rel, size in sizes.items():
+        match = _PAGE_CHUNK.match(rel)
+        if match:
+            source = chunk_pages.get(match.group(1))
+            if source in pages:
+                pages[source].own_js += size
+                pages[source].chunks.append(rel)
+    return DistReport(sizes, pages, unmatched, use_gzip)
+
+
+def compare_baseline(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """与基线对比，返回 [(名称, 基线字节, 当前字节, 增长百分比, 是否超过阈值)]"""
+    rows = []
+    current = report.to_baseline()
+    labels = dict(CATEGORIES)
+    for section, label in (('totals', lambda k: labels.get(k, k)), ('modules', lambda k: f'模块 {k}')):
+        old_values = baseline.get(section, {})
+        for key, value in current[section].items():
+            old = old_values.get(key)
+            if old is None:
+                continue
+            growth = (value - old) / old * 100 if old else (100.0 if value else 0.0)
+            rows.append((label(key), old, value, growth, growth > threshold))
+    return rows
+
+
+def _fmt(n):
+    return f'{n:,}'
+
+
+def cmd_dist_report(args):
+    """构建产物分析"""
+    dist = args.dist or DIST_DIR
+    if not os.path.isdir(os.path.join(args.root, dist)):
+        print(f"❌ 错误: 构建目录不存在: {dist}（请先运行 pnpm docs:build）")
+        return 2
+    report = analyze_dist(args.root, dist, args.gzip)
+    baseline_file = os.path.join(args.root, args.baseline or BASELINE_FILE)
+    baseline = load_json(baseline_file, {})
+    if baseline.get('v') != BASELINE_VERSION or baseline.get('gzip') != report.gzipped:
+        baseline = {}
+    rows = compare_baseline(report, baseline, args.threshold)
+    regressions = [r for r in rows if r[4]]
+
+    if args.update_baseline:
+        save_json(baseline_file, report.to_baseline(), compact=False)
+
+    sizes = report.sizes
+    ranked = sorted(report.pages.values(), key=lambda w: -w.first_load(sizes))[:args.top]
+    usage = report.chunk_usage()
+    shared = sorted((r for r in sizes if categorize(r) in ('shared-js', 'css', 'search')),
+                    key=lambda r: -sizes[r])[:args.top]
+
+    if args.json:
+        print(json.dumps({
+            'gzip': report.gzipped,
+            'totals': report.totals(),
+            'modules': report.modules(),
+            'pages': [{'source': w.source, 'html': w.html, 'inline': w.inline, 'pageJs': w.own_js,
+                       'firstLoad': w.first_load(sizes)} for w in ranked],
+            'chunks': [{'file': r, 'size': sizes[r], 'pages': usage.get(r, 0)} for r in shared],
+            'regressions': [{'name': n, 'baseline': o, 'current': c, 'growth': round(g, 2)}
+                            for n, o, c, g, _ in regressions],
+        }, ensure_ascii=False, indent=2))
+        return 1 if args.check and regressions else 0
+
+    unit = '字节（gzip）' if report.gzipped else '字节'
+    print("=== 构建产物分析 ===\n")
+    print(f"📁 {dist}：{len(sizes)} 个文件，{_fmt(sum(sizes.values()))} {unit}，"
+          f"对应 {len(report.pages)} 个页面\n")
+
+    old_totals = baseline.get('totals', {})
+    print(f"  {'分类':<10}{'文件数':>8}{'字节':>14}{'基线':>14}{'变化':>10}")
+    for key, label in CATEGORIES:
+        count, size = report.totals()[key]
+        old = old_totals.get(key)
+        change = f'{(size - old) / old * 100:+.1f}%' if old else '-'
+        print(f"  {label:<10}{count:>8}{_fmt(size):>14}{_fmt(old) if old is not None else '-':>14}{change:>10}")
+
+    print(f"\n🏋️  首次加载最重的页面（Top {len(ranked)}）\n")
+    for i, w in enumerate(ranked, 1):
+        shared_js = sum(sizes[r] for r in w.refs if categorize(r) == 'shared-js')
+        print(f"  {i:>2}. {_fmt(w.first_load(sizes)):>12}  docs/{w.source}")
+        print(f"      HTML {_fmt(w.html)}（内联数据 {_fmt(sum(w.inline.values()))}）| 页面 JS {_fmt(w.own_js)}"
+              f" | 共享 JS {_fmt(shared_js)} | 引用 {len(w.refs)} 个资源")
+
+    print(f"\n📦 最大的共享资源（Top {len(shared)}）\n")
+    for r in shared:
+        refs = usage.get(r, 0)
+        note = f'{refs} 个页面预加载' if refs else '按需加载'
+        print(f"  {_fmt(sizes[r]):>12}  {r}（{note}）")
+
+    inline_total = {}
+    for w in report.pages.values():
+        for name, size in w.inline.items():
+            inline_total[name] = inline_total.get(name, 0) + size
+    html_total = report.totals()['html'][1]
+    if inline_total and report.pages and not report.gzipped:
+        print("\n🧱 每个 HTML 重复内联的数据\n")
+        for name, size in sorted(inline_total.items()):
+            print(f"  {name}: 平均 {_fmt(size // len(report.pages))} 字节/页，共 {_fmt(size)} 字节"
+                  f"（占 HTML 的 {size / html_total * 100:.1f}%）")
+
+    if report.unmatched:
+        print(f"\n💡 {len(report.unmatched)} 个 HTML 没有对应的源文件: {', '.join(report.unmatched[:5])}"
+              f"{' ...' if len(report.unmatched) > 5 else ''}")
+
+    print()
+    if not baseline and args.check:
+        print(f"⚠️  没有可对比的基线（{args.baseline or BASELINE_FILE}），本次未检查体积增长")
+    elif not baseline:
+        print(f"💡 没有可对比的基线（运行 dist-report --update-baseline 生成 {args.baseline or BASELINE_FILE}）")
+    elif regressions:
+        print(f"⚠️  {len(regressions)} 项比基线增长超过 {args.threshold}%：")
+        for name, old, current, growth, _ in regressions:
+            print(f"  - {name}: {_fmt(old)} → {_fmt(current)}（{growth:+.1f}%）")
+    else:
+        print(f"✅ 所有分类与模块均未超过基线 {args.threshold}%")
+    if args.update_baseline:
+        print(f"💾 已更新基线: {args.baseline or BASELINE_FILE}")
+    return 1 if args.check and regressions else 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('dist-report', help='分析构建产物：每个页面的 HTML / JS 体积、最大的共享 chunk，并与基线对比')
+    p.add_argument('--dist', help=f'构建目录（默认 {DIST_DIR}）')
+    p.add_argument('--top', type=int, default=DEFAULT_TOP, help=f'排行显示的数量（默认 {DEFAULT_TOP}）')
+    p.add_argument('--gzip', action='store_true', help='按 gzip 压缩后的大小统计（基线需使用相同设置）')
+    p.add_argument('--baseline', help=f'基线文件（默认 {BASELINE_FILE}）')
+    p.add_argument('--update-baseline', action='store_true', help='以本次结果更新基线')
+    p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                   help=f'增长超过该百分比视为回退（默认 {DEFAULT_THRESHOLD}）')
+    p.add_argument('--check', action='store_true', help='有任一项超过阈值时返回 1（用于 CI）')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出')
+    p.set_defaults(func=cmd_dist_report)
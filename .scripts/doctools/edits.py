@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+批量编辑层 - 收集对多个文件的修改与重命名，一次性原子提交
+
+所有修改先在内存中计算完成，再统一写入临时文件并替换；任何一步失败都会回滚到原始内容，
+不会出现只改了一半文件的情况。每个文件无论有多少处修改都只读写一次。
+
+用法：
+    edits = EditSet(root)
+    edits.replace('docs/ai/index.md', start, end, '新文本')        # 按字符偏移替换
+    edits.replace_in_line('docs/ai/chapter-01.md', 12, 'old', 'new')  # 按行替换
+    edits.rename('docs/ai/chapter-05.md', 'docs/ai/chapter-04.md')
+    edits.create('docs/snippets/1a2b3c.py', '代码')                   # 新建文件
+    edits.apply()
+"""
+
+import os
+from pathlib import Path
+
+from .common import write_bytes_atomic
+
+
+class EditConflict(ValueError):
+    """修改区间重叠或重命名目标冲突"""
+
+
+class EditSet(object):
+    """待提交的修改集合，路径均相对于项目根目录"""
+
+    def __init__(self, root='.'):
+        self.root = Path(root)
+        self.edits = {}
+        self.line_edits = {}
+        self.renames = {}
+        self.creates = {}
+        self._texts = {}
+        self._line_starts = {}
+
+    def __bool__(self):
+        return bool(self.edits or self.line_edits or self.renames or self.creates)
+
+    def text(self, file):
+        """读取文件原始内容（同一文件只读取一次）"""
+        if file not in self._texts:
+            with open(self.root / file, 'r', encoding='utf-8', newline='') as f:
+                self._texts[file] = f.read()
+        return self._texts[file]
+
+    def preload(self, file, text):
+        """登记调用方已读取的原始内容，避免重复读取"""
+        self._texts.setdefault(file, text)
+
+    def replace(self, file, start, end, new):
+        """把原始内容中 [start, end) 替换为 new"""
+        self.edits.setdefault(file, []).append((start, end, new))
+
+    def replace_in_line(self, file, line, old, new, col=0):
+        """把第 line 行（从 1 开始）中从 col 起第一次出现的 old 替换为 new"""
+        self.line_edits.setdefault(file, []).append((line, col, old, new))
+
+    def rename(self, old, new):
+        if old != new:
+            self.renames[old] = new
+
+    def create(self, file, text):
+        """新建文件（提交时目标已存在视为冲突）"""
+        if self.creates.get(file, text) != text:
+            raise EditConflict(f'{file} 被多次创建且内容不同')
+        self.creates[file] = text
+
+    def files(self):
+        """所有受影响的已有文件（原路径）"""
+        return sorted(set(self.edits) | set(self.line_edits) | set(self.renames))
+
+    def line_span(self, file, line):
+        """第 line 行（从 1 开始）在原始内容中的 [起始, 结束) 偏移，不含换行符"""
+        text = self.text(file)
+        starts = self._line_starts.get(file)
+        if starts is None:
+            starts = [0]
+            pos = text.find('\n')
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = text.find('\n', pos + 1)
+            self._line_starts[file] = starts
+        if line < 1 or line > len(starts):
+            raise EditConflict(f'{file}:{line} 行号越界')
+        end = starts[line] - 1 if line < len(starts) else len(text)
+        return starts[line - 1], end
+
+    def _resolve_line_edits(self, file):
+        text = self.text(file)
+        spans = []
+        for line, col, old, new in self.line_edits.get(file, ()):
+            line_start, line_end = self.line_span(file, line)
+            idx = text.find(old, line_start + col, line_end)
+            if idx == -1:
+                raise EditConflict(f"{file}:{line} 未找到 '{old}'")
+            spans.append((idx, idx + len(old), new))
+        return spans
+
+    def render(self, file):
+        """计算单个文件修改后的内容"""
+        spans = list(self.edits.get(file, ())) + self._resolve_line_edits(file)
+        text = self.text(file)
+        if not spans:
+            return text
+        spans = sorted(set(spans), key=lambda s: (s[0], s[1]))
+        out = []
+        pos = 0
+        for start, end, new in spans:
+            if start < pos:
+                raise EditConflict(f'{file}: 修改区间重叠（偏移 {start}）')
+            out.append(text[pos:start])
+            out.append(new)
+            pos = end
+        out.append(text[pos:])
+        return ''.join(out)
+
+    def plan(self):
+        """计算所有修改结果，返回 {目标路径: (原路径, 新内容或 None)}
+
+        新内容为 None 表示仅重命名；新建的文件原路径为 None。
+        """
+        result = {}
+        for file in self.files():
+            target = self.renames.get(file, file)
+            if target in result:
+                raise EditConflict(f'多个文件被重命名为 {target}')
+            changed = file in self.edits or file in self.line_edits
+            result[target] = (file, self.render(file) if changed else None)
+        for file, text in sorted(self.creates.items()):
+            if file in result:
+                raise EditConflict(f'新建的文件与其他修改冲突: {file}')
+            result[file] = (None, text)
+
+        moving = set(self.renames)
+        for target, (source, _) in result.items():
+            if target != source and (self.root / target).exists() and target not in moving:
+                kind = '新建' if source is None else '重命名'
+                raise EditConflict(f'{kind}目标已存在: {target}')
+        return result
+
+    def apply(self, dry_run=False):
+        """原子提交所有修改，返回计划；dry_run 时只计算不写入"""
+        plan = self.plan()
+        if dry_run:
+            return plan
+
+        originals = {}
+        for target, (source, _) in plan.items():
+            if source is None:
+                continue
+            with open(self.root / source, 'rb') as f:
+                originals[source] = f.read()
+
+        created = []
+        try:
+            # 先写所有目标文件（临时文件 + 替换），再删除被重命名的源文件
+            for target, (source, new_text) in plan.items():
+                data = new_text.encode('utf-8') if new_text is not None else originals[source]
+                if not (self.root / target).exists():
+                    created.append(target)
+                write_bytes_atomic(self.root / target, data)
+            targets = set(plan)
+            for source in self.renames:
+                if source not in targets:
+                    os.unlink(self.root / source)
+        except BaseException:
+            for source, data in originals.items():
+                write_bytes_atomic(self.root / source, data)
+            for target in created:
+                if target not in originals and (self.root / target).exists():
+                    os.unlink(self.root / target)
+            raise
+        return plan
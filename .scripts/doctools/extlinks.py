@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""
+站外链接检查 - 从语料索引收集所有 http(s) 链接，去重后用 asyncio 并发检查，结果带有效期缓存
+
+只依赖标准库：HTTP/1.1 客户端基于 asyncio.open_connection（https 使用 ssl 默认上下文），
+同一主机的空闲连接放回连接池复用（keep-alive），不再为每个链接重新握手。
+
+    - 总并发数与单主机并发数分别限制（--concurrency / --per-host），不会压垮同一个站点
+    - 先发 HEAD，返回 4xx/5xx 时再用 GET 确认（不少站点不支持 HEAD）；跟随最多 MAX_REDIRECTS 次跳转
+    - 429 / 502 / 503 / 504、超时和连接错误按指数退避重试，遵守 Retry-After；
+      某个主机返回 429 后，该主机的其他请求也会一起等待
+    - 结果缓存在 .cache/doctools/external-links.json：正常的结果 --ttl 小时内不再检查，
+      失败的结果 FAILED_TTL_HOURS 小时后重新检查；--refresh 忽略缓存
+
+LinkChecker 可以单独使用（例如对本地 http.server 做测试）：
+
+    results = LinkChecker(per_host=2, timeout=5).run(['http://127.0.0.1:8000/a'])
+"""
+
+import asyncio
+import json
+import socket
+import ssl
+import time
+from urllib.parse import quote, urljoin, urlsplit
+
+from . import __version__
+from .common import DOCS_DIR, cache_path, load_json, save_json
+from .corpus import load_corpus
+
+STATE_FILE = 'external-links.json'
+CACHE_VERSION = 1
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = 15
+DEFAULT_RETRIES = 3
+DEFAULT_TTL_HOURS = 168
+FAILED_TTL_HOURS = 24
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+MAX_REDIRECTS = 5
+IDLE_PER_HOST = 4
+
+RETRY_STATUS = {429, 502, 503, 504}
+REDIRECT_STATUS = {301, 302, 303, 307, 308}
+USER_AGENT = f'Mozilla/5.0 (compatible; doc-tools-linkcheck/{__version__})'
+
+# 路径中保留原样的字符（其余字符按 UTF-8 百分号编码）
+_SAFE = "/%:@!$&'()*+,;=~-._"
+
+
+class LinkResult(object):
+    """单个链接的检查结果：status 为最终 HTTP 状态码，网络错误时为 None 并记录 error"""
+
+    __slots__ = ('url', 'status', 'error', 'final', 'checked')
+
+    def __init__(self, url, status=None, error=None, final=None, checked=0.0):
+        self.url = url
+        self.status = status
+        self.error = error
+        self.final = final
+        self.checked = checked
+
+    @property
+    def ok(self):
+        return self.status is not None and self.status < 400
+
+    @property
+    def restricted(self):
+        """401 / 403：通常是站点拒绝爬虫，不视为失效"""
+        return self.status in (401, 403)
+
+    @property
+    def broken(self):
+        return not self.ok and not self.restricted
+
+    def describe(self):
+        if self.error:
+            return self.error
+        text = f'HTTP {self.status}'
+        if self.final and self.final != self.url:
+            text += f' → {self.final}'
+        return text
+
+    def to_json(self):
+        return [self.status, self.error, self.final, round(self.checked)]
+
+    @classmethod
+    def from_json(cls, url, data):
+        status, error, final, checked = data
+        return cls(url, status, error, final, checked)
+
+
+class HTTPError(Exception):
+    pass
+
+
+class _Connection(object):
+    __slots__ = ('reader', 'writer')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool(object):
+    """按 (协议, 主机, 端口) 保存空闲的 keep-alive 连接"""
+
+    def __init__(self, timeout, idle_per_host=IDLE_PER_HOST):
+        self.timeout = timeout
+        self.idle_per_host = idle_per_host
+        self.idle = {}
+        self.ssl_context = ssl.create_default_context()
+
+    async def acquire(self, key, fresh=False):
+        """返回 (连接, 是否为复用的连接)；fresh 为 True 时总是新建连接"""
+        idle = None if fresh else self.idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof():
+                return conn, True
+            conn.close()
+        scheme, host, port = key
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self.ssl_context if scheme == 'https' else None,
+                                    server_hostname=host if scheme == 'https' else None),
+            self.timeout)
+        return _Connection(reader, writer), False
+
+    def release(self, key, conn):
+        idle = self.idle.setdefault(key, [])
+        if len(idle) < self.idle_per_host:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    def close(self):
+        for idle in self.idle.values():
+            for conn in idle:
+                conn.close()
+        self.idle.clear()
+
+
+def _request_target(parts):
+    path = quote(parts.path or '/', safe=_SAFE)
+    if parts.query:
+        path += '?' + quote(parts.query, safe=_SAFE + '?')
+    return path
+
+
+class LinkChecker(object):
+    """并发检查一组 URL"""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=BACKOFF_BASE):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self.reused = 0
+
+    def run(self, urls, progress=None):
+        """检查 urls，返回 {url: LinkResult}；progress(完成数, 总数, 结果) 在每个链接完成后调用"""
+        return asyncio.run(self.check_all(list(urls), progress))
+
+    async def check_all(self, urls, progress=None):
+        self.pool = ConnectionPool(self.timeout)
+        self.limit = asyncio.Semaphore(self.concurrency)
+        self.hosts = {}
+        self.cooldown = {}
+        results = {}
+        done = 0
+
+        async def one(url):
+            nonlocal done
+            result = await self.check(url)
+            results[url] = result
+            done += 1
+            if progress:
+                progress(done, len(urls), result)
+
+        try:
+            await asyncio.gather(*(one(url) for url in urls))
+        finally:
+            self.pool.close()
+        return results
+
+    async def check(self, url):
+        """检查单个 URL：先 HEAD，失败时用 GET 确认"""
+        result = await self._follow(url, 'HEAD')
+        if result.status is not None and not result.ok:
+            result = await self._follow(url, 'GET')
+        result.checked = time.time()
+        return result
+
+    async def _follow(self, url, method):
+        current = url
+        for _ in range(MAX_REDIRECTS + 1):
+            try:
+                status, location = await self._with_retries(current, method)
+            except HTTPError as e:
+                return LinkResult(url, error=str(e), final=current if current != url else None)
+            if status in REDIRECT_STATUS and location:
+                current = urljoin(current, location)
+                continue
+            return LinkResult(url, status, final=current if current != url else None)
+        return LinkResult(url, error=f'跳转超过 {MAX_REDIRECTS} 次', final=current)
+
+    async def _with_retries(self, url, method):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise HTTPError(f'无效的链接: {url}')
+        host = parts.hostname
+        semaphore = self.hosts.get(host)
+        if semaphore is None:
+            semaphore = self.hosts[host] = asyncio.Semaphore(self.per_host)
+        error = None
+        for attempt in range(self.retries + 1):
+            wait = self.cooldown.get(host, 0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            # 先取主机信号量再取全局信号量：排在繁忙主机后面的请求不占用全局并发，其他主机不会被饿死
+            async with semaphore, self.limit:
+                try:
+                    status, headers = await self._request(parts, method)
+                except socket.gaierror as e:
+                    # 域名无法解析，重试没有意义
+                    raise HTTPError(f'域名解析失败: {e.strerror or e}')
+                except (OSError, asyncio.TimeoutError, HTTPError, ssl.SSLError) as e:
+                    error = _describe_error(e)
+                    status, headers = None, {}
+            if status is not None and status not in RETRY_STATUS:
+                return status, headers.get('location')
+            if attempt == self.retries:
+                break
+            delay = min(self.backoff * (2 ** attempt), BACKOFF_MAX)
+            retry_after = headers.get('retry-after', '')
+            if retry_after.isdigit():
+                delay = min(max(delay, float(retry_after)), BACKOFF_MAX)
+            if status == 429:
+                self.cooldown[host] = time.monotonic() + delay
+            await asyncio.sleep(delay)
+        if status is not None:
+            return status, headers.get('location')
+        raise HTTPError(error)
+
+    async def _request(self, parts, method, fresh=False):
+        """发送一个请求，返回 (状态码, {小写头部: 值})；复用的连接失效时换新连接重试一次"""
+        scheme = parts.scheme
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        host_header = parts.hostname.encode('idna').decode('ascii')
+        if parts.port:
+            host_header += f':{parts.port}'
+        request = (f'{method} {_request_target(parts)} HTTP/1.1\r\n'
+                   f'Host: {host_header}\r\n'
+                   f'User-Agent: {USER_AGENT}\r\n'
+                   'Accept: */*\r\n'
+                   f'Connection: {"keep-alive" if method == "HEAD" else "close"}\r\n\r\n').encode('ascii')
+
+        conn, reused = await self.pool.acquire(key, fresh)
+        self.requests += 1
+        self.reused += reused
+        try:
+            conn.writer.write(request)
+            await asyncio.wait_for(conn.writer.drain(), self.timeout)
+            status, headers = await asyncio.wait_for(_read_head(conn.reader), self.timeout)
+        except (OSError, asyncio.IncompleteReadError, HTTPError) as e:
+            conn.close()
+            if reused:
+                return await self._request(parts, method, fresh=True)
+            if isinstance(e, asyncio.IncompleteReadError):
+                raise HTTPError('连接被关闭')
+            raise
+        except BaseException:
+            conn.close()
+            raise
+        keep = (method == 'HEAD' or status in (204, 304)) and headers.get('connection', '').lower() != 'close'
+        if keep:
+            self.pool.release(key, conn)
+        else:
+            conn.close()
+        return status, headers
+
+
+async def _read_head(reader):
+    """读取状态行与头部（不读取正文）"""
+    line = await reader.readline()
+    if not line:
+        raise HTTPError('连接被关闭')
+    parts = line.decode('latin-1').split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+        raise HTTPError(f'无法解析响应: {line[:60]!r}')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    status = int(parts[1])
+    if 100 <= status < 200:
+        # 跳过 1xx 临时响应
+        return await _read_head(reader)
+    return status, headers
+
+
+def _describe_error(e):
+    if isinstance(e, asyncio.TimeoutError):
+        return '超时'
+    if isinstance(e, ssl.SSLError):
+        return f'TLS 错误: {e.reason or e}'
+    if isinstance(e, OSError) and e.strerror:
+        return f'连接失败: {e.strerror}'
+    return str(e) or e.__class__.__name__
+
+
+# ========== 语料与缓存 ==========
+
+def collect_links(corpus):
+    """收集站外链接（去掉 #片段后去重），返回 {url: [(页面, 行号)]}"""
+    links = {}
+    for page in corpus:
+        for link in page.links:
+            target = link.target
+            if target.startswith(('http://', 'https://')):
+                links.setdefault(target.split('#', 1)[0], []).append((page.path, link.line))
+    return links
+
+
+def load_cache(root):
+    data = load_json(cache_path(root, STATE_FILE), {})
+    if data.get('v') != CACHE_VERSION:
+        return {}
+    return {url: LinkResult.from_json(url, entry) for url, entry in data.get('links', {}).items()}
+
+
+def save_cache(root, results):
+    save_json(cache_path(root, STATE_FILE), {
+        'v': CACHE_VERSION,
+        'links': {url: results[url].to_json() for url in sorted(results)},
+    })
+
+
+def is_fresh(result, ttl_hours, now):
+    hours = ttl_hours if not result.broken else min(ttl_hours, FAILED_TTL_HOURS)
+    return now - result.checked < hours * 3600
+
+
+def cmd_check_links(args):
+    """检查站外链接"""
+    print("=== 站外链接检查 ===\n")
+    links = collect_links(load_corpus(args.root))
+    if args.host:
+        links = {u: refs for u, refs in links.items() if urlsplit(u).hostname == args.host}
+    cache = {} if args.refresh else load_cache(args.root)
+    now = time.time()
+    pending = [u for u in sorted(links) if u not in cache or not is_fresh(cache[u], args.ttl, now)]
+    print(f"共 {len(links)} 个站外链接，缓存有效 {len(links) - len(pending)} 个，需要检查 {len(pending)} 个")
+
+    checker = LinkChecker(args.concurrency, args.per_host, args.timeout, args.retries)
+
+    def progress(done, total, result):
+        if not args.json and (done % 20 == 0 or done == total):
+            print(f"  ... {done}/{total}", flush=True)
+
+    results = dict(load_cache(args.root)) if args.refresh else dict(cache)
+    started = time.perf_counter()
+    try:
+        if pending:
+            results.update(checker.run(pending, progress))
+    finally:
+        # 中途中断时也保留已完成的结果
+        save_cache(args.root, results)
+    elapsed = time.perf_counter() - started
+
+    current = {u: results[u] for u in links if u in results}
+    broken = [r for r in current.values() if r.broken]
+    restricted = [r for r in current.values() if r.restricted]
+    if args.json:
+        print(json.dumps([{'url': r.url, 'status': r.status, 'error': r.error, 'final': r.final,
+                           'refs': [{'file': f'{DOCS_DIR}/{p}', 'line': l} for p, l in links[r.url]]}
+                          for r in broken], ensure_ascii=False, indent=2))
+        return 1 if broken else 0
+
+    if pending:
+        print(f"\n⏱️  {elapsed:.1f} 秒，{checker.requests} 个请求（复用连接 {checker.reused} 次）")
+    for r in sorted(broken, key=lambda r: r.url):
+        print(f"\n❌ {r.url}  {r.describe()}")
+        for page, line in links[r.url][:args.refs]:
+            print(f"    {DOCS_DIR}/{page}:{line}")
+        if len(links[r.url]) > args.refs:
+            print(f"    ...（另有 {len(links[r.url]) - args.refs} 处）")
+    if restricted:
+        print(f"\n⚠️  {len(restricted)} 个链接拒绝访问（401/403，通常是站点屏蔽了爬虫，不计为失效）")
+
+    print("\n" + "=" * 40)
+    if broken:
+        print(f"❌ {len(broken)} 个链接失效，{len(current) - len(broken)} 个正常")
+        return 1
+    print(f"✅ 所有 {len(current)} 个站外链接均可访问")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('check-links', help='并发检查所有站外链接（带有效期缓存）')
+    p.add_argument('--ttl', type=float, default=DEFAULT_TTL_HOURS,
+                   help=f'正常结果的缓存有效期（小时，默认 {DEFAULT_TTL_HOURS}）')
+    p.add_argument('--refresh', action='store_true', help='忽略缓存，重新检查所有链接')
+    p.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                   help=f'总并发数（默认 {DEFAULT_CONCURRENCY}）')
+    p.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                   help=f'单个主机的并发数（默认 {DEFAULT_PER_HOST}）')
+    p.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help=f'单次请求超时（秒，默认 {DEFAULT_TIMEOUT}）')
+    p.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help=f'最多重试次数（默认 {DEFAULT_RETRIES}）')
+    p.add_argument('--host', help='只检查指定主机的链接')
+    p.add_argument('--refs', type=int, default=3, help='每个失效链接最多列出的引用位置（默认 3）')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出失效链接')
+    p.set_defaults(func=cmd_check_links)
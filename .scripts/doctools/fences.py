@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+代码块提取与语法校验
+
+从语料索引中提取所有围栏代码块（语言、文件、行号），使用本地的轻量解析器校验：
+    json        json.loads
+    python      ast.parse
+    yaml        yaml.safe_load_all（未安装 PyYAML 时跳过）
+    mermaid     图表类型声明 + 括号配对
+    js/ts/java  括号配对（忽略字符串与注释）
+
+校验在进程池中并行执行；结果按代码块内容哈希缓存到 .cache/doctools/fences.json，
+未变化的代码块不会被重复校验。
+"""
+
+import ast
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .common import cache_path, content_hash, load_json, save_json
+from .corpus import load_corpus, open_corpus
+from .gitref import GitError
+
+try:
+    import yaml
+except ImportError:  # PyYAML 为可选依赖
+    yaml = None
+
+VALIDATOR_VERSION = 2
+CACHE_FILE = 'fences.json'
+
+# 少于该数量时直接在当前进程校验，避免进程池启动开销
+POOL_THRESHOLD = 64
+
+LANG_ALIASES = {
+    'json': 'json',
+    'py': 'python', 'python': 'python', 'python3': 'python',
+    'yaml': 'yaml', 'yml': 'yaml',
+    'mermaid': 'mermaid',
+    'js': 'js', 'javascript': 'js', 'jsx': 'js', 'mjs': 'js',
+    'ts': 'js', 'typescript': 'js', 'tsx': 'js',
+    'java': 'java',
+}
+
+MERMAID_TYPES = (
+    'graph', 'flowchart', 'sequenceDiagram', 'classDiagram', 'stateDiagram',
+    'stateDiagram-v2', 'erDiagram', 'journey', 'gantt', 'pie', 'quadrantChart',
+    'requirementDiagram', 'gitGraph', 'C4Context', 'C4Container', 'C4Component',
+    'C4Dynamic', 'C4Deployment', 'mindmap', 'timeline', 'sankey-beta',
+    'xychart-beta', 'block-beta', 'packet-beta', 'architecture-beta', 'kanban',
+)
+
+_PAIRS = {')': '(', ']': '[', '}': '{'}
+
+
+class Snippet(object):
+    """单个代码块"""
+
+    __slots__ = ('path', 'line', 'lang', 'body', 'hash')
+
+    def __init__(self, path, line, lang, body):
+        self.path = path
+        self.line = line
+        self.lang = lang
+        self.body = body
+        self.hash = content_hash(f'{lang}\0{body}')
+
+
+def extract_snippets(corpus, langs=None):
+    """从语料索引提取代码块；langs 为空时提取所有语言"""
+    snippets = []
+    for page in corpus:
+        if not page.fences:
+            continue
+        lines = None
+        for fence in page.fences:
+            if langs and fence.lang not in langs:
+                continue
+            if lines is None:
+                lines = corpus.read_text(page.path).split('\n')
+            body = lines[fence.line:fence.end - 1]
+            if fence.indent:
+                body = [l[fence.indent:] if l[:fence.indent].isspace() else l.lstrip()
+                        for l in body]
+            snippets.append(Snippet(page.path, fence.line, fence.lang, '\n'.join(body)))
+    return snippets
+
+
+def check_json(body):
+    # 文档中常用整行 // 注释标注文件名，校验前替换为空行（保持行号不变）
+    lines = ['' if l.lstrip().startswith('//') else l for l in body.split('\n')]
+    try:
+        json.loads('\n'.join(lines))
+    except ValueError as e:
+        return getattr(e, 'lineno', 1), str(e)
+    return None
+
+
+def check_python(body):
+    try:
+        ast.parse(body)
+    except SyntaxError as e:
+        return e.lineno or 1, e.msg
+    return None
+
+
+def check_yaml(body):
+    try:
+        for _ in yaml.safe_load_all(body):
+            pass
+    except yaml.YAMLError as e:
+        mark = getattr(e, 'problem_mark', None)
+        line = mark.line + 1 if mark is not None else 1
+        problem = getattr(e, 'problem', None) or str(e).split('\n', 1)[0]
+        return line, problem
+    return None
+
+
+def check_brackets(body, line_comment='//', block_comments=True, quotes='"\'`'):
+    """括号配对检查，跳过字符串与注释"""
+    stack = []
+    line = 1
+    i = 0
+    n = len(body)
+    while i < n:
+        c = body[i]
+        if c == '\n':
+            line += 1
+        elif line_comment and body.startswith(line_comment, i):
+            j = body.find('\n', i)
+            i = n if j == -1 else j
+            continue
+        elif block_comments and body.startswith('/*', i):
+            j = body.find('*/', i + 2)
+            end = n if j == -1 else j + 2
+            line += body.count('\n', i, end)
+            i = end
+            continue
+        elif c == '"' and body.startswith('"""', i):
+            # Java 文本块 / Kotlin 原始字符串
+            j = body.find('"""', i + 3)
+            end = n if j == -1 else j + 3
+            line += body.count('\n', i, end)
+            i = end
+            continue
+        elif c in quotes:
+            j = i + 1
+            while j < n and body[j] != c:
+                if body[j] == '\\':
+                    j += 1
+                elif body[j] == '\n' and c != '`':
+                    break
+                j += 1
+            line += body.count('\n', i, min(j, n))
+            i = j + 1
+            continue
+        elif c in '([{':
+            stack.append((c, line))
+        elif c in ')]}':
+            if not stack or stack[-1][0] != _PAIRS[c]:
+                return line, f"多余或不匹配的 '{c}'"
+            stack.pop()
+        i += 1
+    if stack:
+        c, opened = stack[-1]
+        return opened, f"'{c}' 未闭合"
+    return None
+
+
+def check_mermaid(body):
+    for number, raw in enumerate(body.split('\n'), 1):
+        text = raw.strip()
+        if not text or text.startswith('%%'):
+            continue
+        keyword = text.split()[0].rstrip(':;')
+        if keyword not in MERMAID_TYPES:
+            return number, f"未知的图表类型 '{keyword}'"
+        break
+    else:
+        return 1, '空的 mermaid 图表'
+    return check_brackets(body, line_comment='%%', block_comments=False, quotes='"')
+
+
+def validate(lang, body):
+    """校验单个代码块，返回 (状态, 行号偏移, 信息)；状态为 ok / error / skipped"""
+    kind = LANG_ALIASES.get(lang)
+    if kind == 'json':
+        result = check_json(body)
+    elif kind == 'python':
+        result = check_python(body)
+    elif kind == 'yaml':
+        if yaml is None:
+            return 'skipped', 0, '未安装 PyYAML'
+        result = check_yaml(body)
+    elif kind == 'mermaid':
+        result = check_mermaid(body)
+    elif kind in ('js', 'java'):
+        result = check_brackets(body)
+    else:
+        return 'skipped', 0, ''
+    if result is None:
+        return 'ok', 0, ''
+    return 'error', result[0], result[1]
+
+
+def _validate_batch(batch):
+    """进程池任务：校验一批 (哈希, 语言, 内容)"""
+    return [(h, validate(lang, body)) for h, lang, body in batch]
+
+
+def validate_snippets(snippets, cache, jobs=None):
+    """校验代码块并把结果写入 cache，命中缓存的跳过；返回本次实际校验数量"""
+    pending = {}
+    for s in snippets:
+        if s.hash not in cache and s.hash not in pending and s.lang in LANG_ALIASES:
+            pending[s.hash] = (s.hash, s.lang, s.body)
+    work = list(pending.values())
+
+    results = {}
+    if len(work) < POOL_THRESHOLD or jobs == 1:
+        results.update(_validate_batch(work))
+    else:
+        jobs = jobs or os.cpu_count() or 1
+        size = max(16, len(work) // (jobs * 4))
+        batches = [work[i:i + size] for i in range(0, len(work), size)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for batch_result in pool.map(_validate_batch, batches):
+                results.update(batch_result)
+
+    for h, result in results.items():
+        cache[h] = list(result)
+    return len(work)
+
+
+def check_fences(root='.', langs=None, jobs=None, use_cache=True, corpus=None):
+    """提取并校验代码块，返回 (代码块列表, 结果映射, 实际校验数)"""
+    corpus = corpus or load_corpus(root)
+    snippets = extract_snippets(corpus, langs)
+    cache_file = cache_path(corpus.root, CACHE_FILE)
+    data = load_json(cache_file, {}) if use_cache else {}
+    cache = data.get('results', {}) if data.get('version') == VALIDATOR_VERSION else {}
+    validated = validate_snippets(snippets, cache, jobs)
+    if not langs and corpus.ref is None:
+        # 只保留工作区中仍然存在的代码块，避免缓存无限增长
+        live = {s.hash for s in snippets}
+        cache = {h: r for h, r in cache.items() if h in live}
+    # 因缺少依赖而跳过的结果不写入缓存，安装 PyYAML 后无需 --no-cache 即可校验
+    save_json(cache_file, {'version': VALIDATOR_VERSION,
+                           'results': {h: r for h, r in cache.items() if r[0] != 'skipped'}})
+    return snippets, cache, validated
+
+
+def cmd_check_fences(args):
+    """校验代码块语法"""
+    langs = None
+    if args.lang:
+        langs = {l for l, kind in LANG_ALIASES.items() if kind in args.lang or l in args.lang}
+
+    if not args.json:
+        print(f"=== 检查代码块语法{f' [{args.ref}]' if args.ref else ''} ===\n")
+    try:
+        with open_corpus(args.root, args.ref) as corpus:
+            snippets, results, validated = check_fences(
+                args.root, langs, args.jobs, not args.no_cache, corpus)
+    except GitError as e:
+        print(f"❌ 错误: 无法读取 {args.ref}: {e}")
+        return 2
+
+    errors = []
+    stats = {}
+    skipped = 0
+    for s in snippets:
+        result = results.get(s.hash)
+        if result is None:
+            continue
+        status, offset, message = result
+        if status == 'skipped':
+            skipped += 1
+            continue
+        kind = LANG_ALIASES[s.lang]
+        stats.setdefault(kind, [0, 0])[0] += 1
+        if status == 'error':
+            stats[kind][1] += 1
+            errors.append((s, s.line + offset, message))
+
+    if args.json:
+        print(json.dumps([
+            {'file': f'docs/{s.path}', 'line': line, 'lang': s.lang, 'message': msg}
+            for s, line, msg in errors
+        ], ensure_ascii=False, indent=2))
+        return 1 if errors else 0
+
+    print(f"🔍 共 {len(snippets)} 个代码块，本次校验 {validated} 个（其余命中缓存）\n")
+    for s, line, message in errors:
+        print(f"❌ docs/{s.path}:{line} [{s.lang}] {message}")
+    if errors:
+        print()
+
+    print("=" * 40)
+    print("          检查报告")
+    print("=" * 40 + "\n")
+    for kind in sorted(stats):
+        total, bad = stats[kind]
+        flag = '✅' if bad == 0 else '⚠️ '
+        print(f"{flag} {kind}: {total} 个代码块, {bad} 个错误")
+    if skipped:
+        print(f"\n💡 未安装 PyYAML，{skipped} 个 yaml 代码块已跳过（pip install pyyaml）")
+
+    return 1 if errors else 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('check-fences', help='并行校验代码块语法（按内容哈希缓存结果）')
+    p.add_argument('--lang', nargs='+', help='只校验指定语言，如 json python yaml mermaid')
+    p.add_argument('--jobs', type=int, help='进程数（默认 CPU 核数）')
+    p.add_argument('--no-cache', action='store_true', help='忽略已缓存的校验结果')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出错误列表')
+    p.add_argument('--ref', help='校验指定 git ref（如 dev、origin/dev）而不是工作区，无需 checkout')
+    p.set_defaults(func=cmd_check_fences)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Git 对象读取 - 通过一个常驻的 git cat-file --batch 进程直接读取任意 ref 的文件树
+
+不需要 checkout，也不会改动工作区：
+    with GitObjectReader(root) as git:
+        tree = GitTree(git, 'origin/dev')
+        for path in tree.files('docs'):
+            text = tree.read_text(path)
+
+所有读取共用同一个进程（请求写入 stdin，按对象头中的长度读取 stdout），
+整棵 docs/ 树只需一次进程启动。树对象直接解析二进制格式，不依赖 ls-tree。
+"""
+
+import subprocess
+
+
+class GitError(RuntimeError):
+    """git 命令失败或对象不存在"""
+
+
+class GitObjectReader(object):
+    """git cat-file --batch 的封装"""
+
+    def __init__(self, root='.'):
+        self.root = root
+        try:
+            self.proc = subprocess.Popen(
+                ['git', 'cat-file', '--batch'], cwd=str(root),
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            raise GitError(f'无法启动 git: {e}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+        self.proc.stdout.close()
+        self.proc.stderr.close()
+
+    def read(self, spec):
+        """读取对象，返回 (对象 id, 类型, 内容 bytes)；spec 可以是 sha、ref、ref:path 或 ref^{tree}"""
+        if '\n' in spec:
+            raise GitError(f'非法的对象名: {spec!r}')
+        stdin, stdout = self.proc.stdin, self.proc.stdout
+        try:
+            stdin.write(spec.encode('utf-8') + b'\n')
+            stdin.flush()
+        except OSError:
+            raise GitError(self.proc.stderr.read().decode('utf-8', 'replace').strip() or 'git cat-file 已退出')
+        header = stdout.readline().decode('utf-8', 'replace').rstrip('\n')
+        if not header:
+            raise GitError(self.proc.stderr.read().decode('utf-8', 'replace').strip() or 'git cat-file 已退出')
+        if header.endswith((' missing', ' ambiguous')):
+            raise GitError(f'对象不存在: {spec}')
+        oid, kind, size = header.split(' ')
+        data = stdout.read(int(size))
+        stdout.read(1)
+        return oid, kind, data
+
+    def resolve(self, ref):
+        """把 ref 解析为提交 id"""
+        oid, kind, _ = self.read(f'{ref}^{{commit}}')
+        return oid
+
+    def tree_entries(self, spec):
+        """解析树对象，返回 [(mode, 名称, 对象 id)]"""
+        oid, kind, data = self.read(spec)
+        if kind != 'tree':
+            raise GitError(f'{spec} 不是目录')
+        width = len(oid) // 2
+        entries = []
+        pos = 0
+        n = len(data)
+        while pos < n:
+            space = data.index(b' ', pos)
+            nul = data.index(b'\0', space)
+            mode = data[pos:space].decode('ascii')
+            name = data[space + 1:nul].decode('utf-8', 'surrogateescape')
+            entries.append((mode, name, data[nul + 1:nul + 1 + width].hex()))
+            pos = nul + 1 + width
+        return entries
+
+
+class GitTree(object):
+    """某个提交的只读文件树，路径相对于仓库根目录"""
+
+    def __init__(self, reader, ref):
+        self.reader = reader
+        self.ref = ref
+        self.commit = reader.resolve(ref)
+        self._blobs = None
+
+    def files(self, prefix=''):
+        """递归列出 prefix 目录下的所有文件，返回 {路径: blob id}（只读取树对象）"""
+        if self._blobs is None:
+            self._blobs = {}
+        prefix = prefix.strip('/')
+        result = {}
+        stack = [(prefix, f'{self.commit}:{prefix}' if prefix else f'{self.commit}^{{tree}}')]
+        while stack:
+            base, spec = stack.pop()
+            try:
+                entries = self.reader.tree_entries(spec)
+            except GitError:
+                continue
+            for mode, name, oid in entries:
+                path = f'{base}/{name}' if base else name
+                if mode == '40000':
+                    stack.append((path, oid))
+                elif mode != '160000':
+                    result[path] = oid
+        self._blobs.update(result)
+        return result
+
+    def diff(self, other, prefix=''):
+        """对比 prefix 目录下与另一个 GitTree 不同的文件，返回 {路径: (本树 blob id, other 的 blob id)}
+
+        只存在于一侧的文件另一侧为 None。两侧 id 相同的子树直接跳过，只读取发生变化的目录。
+        """
+        prefix = prefix.strip('/')
+        result = {}
+        stack = [(prefix, self._spec(prefix), other._spec(prefix))]
+        while stack:
+            base, a, b = stack.pop()
+            left = self._entries(a)
+            right = other._entries(b)
+            for name in set(left) | set(right):
+                path = f'{base}/{name}' if base else name
+                ma, oa = left.get(name, (None, None))
+                mb, ob = right.get(name, (None, None))
+                if oa == ob and ma == mb:
+                    continue
+                if ma == '40000' or mb == '40000':
+                    stack.append((path, oa if ma == '40000' else None, ob if mb == '40000' else None))
+                    # 同名的文件与目录互相替换
+                    oa = oa if ma not in (None, '40000') else None
+                    ob = ob if mb not in (None, '40000') else None
+                    if oa is None and ob is None:
+                        continue
+                result[path] = (oa, ob)
+        return result
+
+    def _spec(self, prefix):
+        return f'{self.commit}:{prefix}' if prefix else f'{self.commit}^{{tree}}'
+
+    def _entries(self, spec):
+        """{名称: (mode, 对象 id)}；spec 为 None 或不存在时为空（不含子模块）"""
+        if spec is None:
+            return {}
+        try:
+            entries = self.reader.tree_entries(spec)
+        except GitError:
+            return {}
+        return {name: (mode, oid) for mode, name, oid in entries if mode != '160000'}
+
+    def read_bytes(self, path):
+        oid = (self._blobs or {}).get(path)
+        _, kind, data = self.reader.read(oid or f'{self.commit}:{path}')
+        if kind != 'blob':
+            raise GitError(f'{self.ref}:{path} 不是文件')
+        return data
+
+    def read_text(self, path):
+        return self.read_bytes(path).decode('utf-8', errors='replace')
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+最后更新时间 - 一次 git log 遍历生成 页面 → 最后修改时间 的映射，供 config.ts 的 transformPageData 使用
+
+VitePress 默认对每个页面单独执行一次 git log，页面越多构建越慢。这里只执行一次：
+
+    git log -M --name-status -- docs
+
+从新到旧遍历提交，记录每个文件第一次出现（即最近一次修改）的作者时间。
+重命名会被跟踪：纯重命名（相似度 100%）不算内容修改，时间沿用重命名前的历史；
+改名同时修改了内容则以该提交为准。
+
+结果写入 .cache/doctools/last-updated.json，并记录已处理到的提交；再次运行时只遍历
+新增的提交（上次记录的提交不是当前 HEAD 的祖先时自动全量重建）。
+"""
+
+import subprocess
+
+from .common import DOCS_DIR, cache_path, load_json, save_json
+
+STATE_VERSION = 1
+STATE_FILE = 'last-updated.json'
+
+
+class GitLogError(RuntimeError):
+    pass
+
+
+def _git(root, *args):
+    try:
+        proc = subprocess.run(['git', '-c', 'core.quotepath=off'] + list(args), cwd=str(root),
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitLogError(f'无法启动 git: {e}')
+    if proc.returncode != 0:
+        raise GitLogError(proc.stderr.decode('utf-8', 'replace').strip())
+    return proc.stdout.decode('utf-8', 'replace')
+
+
+def iter_commits(root, revision='HEAD'):
+    """解析 git log 输出，按从新到旧产生 (提交, 作者时间, [(状态, 路径...)])"""
+    output = _git(root, 'log', '--format=%x01%H %at', '-M', '--name-status', revision, '--', DOCS_DIR)
+    commit = None
+    for line in output.split('\n'):
+        if line.startswith('\x01'):
+            if commit is not None:
+                yield commit
+            sha, ts = line[1:].split(' ')
+            commit = (sha, int(ts), [])
+        elif line and commit is not None:
+            commit[2].append(tuple(line.split('\t')))
+    if commit is not None:
+        yield commit
+
+
+def walk_log(commits):
+    """从新到旧遍历提交，返回 ({当前路径: 时间}, {历史路径: 当前路径})"""
+    times = {}
+    aliases = {}
+
+    def resolve(path):
+        return aliases.get(path, path)
+
+    def touch(path, ts):
+        if ts > times.get(path, 0):
+            times[path] = ts
+
+    for _, ts, changes in commits:
+        for change in changes:
+            status = change[0]
+            if status[0] in 'RC' and len(change) == 3:
+                old, new = change[1], change[2]
+                current = resolve(new)
+                if status[1:] != '100':
+                    touch(current, ts)
+                if status[0] == 'R':
+                    # 比这次重命名更早的提交中，旧路径指的就是现在的 current
+                    aliases[old] = current
+            elif status[0] != 'D' and len(change) == 2:
+                touch(resolve(change[1]), ts)
+    return times, aliases
+
+
+def current_files(root):
+    """HEAD 中 docs/ 下的所有文件"""
+    output = _git(root, 'ls-tree', '-r', '--name-only', 'HEAD', '--', DOCS_DIR)
+    return set(line for line in output.split('\n') if line)
+
+
+def _is_ancestor(root, ancestor):
+    try:
+        _git(root, 'merge-base', '--is-ancestor', ancestor, 'HEAD')
+        return True
+    except GitLogError:
+        return False
+
+
+def build_last_updated(root='.', full=False):
+    """增量更新映射，返回 (映射 {docs 相对路径: 秒级时间戳}, 新处理的提交数, 是否全量)"""
+    state_file = cache_path(root, STATE_FILE)
+    state = load_json(state_file, {})
+    head = _git(root, 'rev-parse', 'HEAD').strip()
+    previous = state.get('head') if state.get('version') == STATE_VERSION and not full else None
+    if previous == head:
+        return state['pages'], 0, False
+    if previous and not _is_ancestor(root, previous):
+        previous = None
+
+    commits = list(iter_commits(root, f'{previous}..HEAD' if previous else 'HEAD'))
+    times, aliases = walk_log(commits)
+    prefix = DOCS_DIR + '/'
+    if previous:
+        for rel, ts in state['pages'].items():
+            path = aliases.get(prefix + rel, prefix + rel)
+            if path not in times:
+                times[path] = ts
+
+    live = current_files(root)
+    pages = {path[len(prefix):]: ts for path, ts in sorted(times.items())
+             if path in live and path.endswith('.md')}
+    save_json(state_file, {'version': STATE_VERSION, 'head': head, 'pages': pages})
+    return pages, len(commits), previous is None
+
+
+def cmd_last_updated(args):
+    """生成最后更新时间映射"""
+    print("=== 生成页面最后更新时间 ===\n")
+    try:
+        pages, processed, full = build_last_updated(args.root, args.full)
+    except GitLogError as e:
+        print(f"❌ 错误: {e}")
+        return 1
+    mode = '全量' if full else '增量'
+    print(f"✅ {len(pages)} 个页面，{mode}处理 {processed} 个提交")
+    print(f"📄 {cache_path(args.root, STATE_FILE)}")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('last-updated', help='一次 git log 遍历生成页面最后更新时间（供 config.ts 使用）')
+    p.add_argument('--full', action='store_true', help='忽略上次处理位置，全量重建')
+    p.set_defaults(func=cmd_last_updated)
@@ -0,0 +1,610 @@
+# -*- coding: utf-8 -*-
+"""
+语言服务器 - 通过 stdio 提供锚点/页面补全、跳转到定义和实时失效链接诊断（LSP 协议子集）
+
+作者凭记忆书写侧边栏链接和 [文字](./page#anchor)，写错的锚点要等 check-anchors 才能发现。
+服务器常驻内存，启动时加载语料索引和侧边栏模型，之后只对变化的文档增量重建：
+
+    textDocument/didOpen、didChange   重新解析该文档（增量同步），更新内存中的索引并发布诊断
+    textDocument/didClose             恢复为磁盘内容
+    workspace/didChangeWatchedFiles   磁盘上的页面变化时增量刷新语料索引
+    textDocument/completion           链接地址中补全页面，# 之后补全锚点（Markdown 与 sidebar.ts）
+    textDocument/definition           从链接跳转到目标页面的标题
+
+页面的标题变化后，链接到该页面的已打开文档会重新诊断。未保存的修改只保存在内存中，
+不会写入 .cache/doctools/corpus.json。
+
+编辑器配置示例（命令均在项目根目录运行）：
+
+    VS Code（通用 LSP 客户端插件）:
+        "command": "python3", "args": [".scripts/doc-tools.py", "lsp"],
+        "languages": ["markdown", "typescript"]
+
+    Neovim:
+        vim.lsp.start({ name = 'doc-tools', cmd = { 'python3', '.scripts/doc-tools.py', 'lsp' },
+                        root_dir = vim.fn.getcwd() })
+"""
+
+import json
+import posixpath
+import re
+import sys
+import time
+from bisect import bisect_right
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from . import __version__
+from .common import DOCS_DIR, SIDEBAR_FILE, map_file, page_url
+from .corpus import Corpus, is_page_file, load_corpus, resolve_link
+from .markdown import link_matches
+from .sidebar import JSValue, SidebarSyntaxError, parse_sidebar
+
+# 单次请求耗时超过该值时在 stderr 中记录
+BUDGET_MS = 50
+
+# 站内链接中这些扩展名之外的地址视为静态资源，不检查
+_PAGE_EXTENSIONS = ('', '.md', '.html')
+
+# 光标前的链接地址：Markdown 的 ](xxx，sidebar.ts 的 link: "xxx
+_MD_TARGET = re.compile(r'\]\(\s*<?([^)\s>]*)$')
+_TS_TARGET = re.compile(r'\blink\s*:\s*["\']([^"\']*)$')
+
+# LSP 常量
+SYNC_INCREMENTAL = 2
+SEVERITY_ERROR = 1
+KIND_FILE = 17
+KIND_REFERENCE = 18
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+
+# ========== 位置换算 ==========
+
+def _utf16_len(text):
+    return len(text.encode('utf-16-le')) // 2
+
+
+def to_utf16(line, index):
+    """字符下标 → LSP 列号（UTF-16 编码单元）"""
+    if line.isascii():
+        return index
+    return _utf16_len(line[:index])
+
+
+def from_utf16(line, col):
+    """LSP 列号 → 字符下标"""
+    if line.isascii():
+        return min(col, len(line))
+    units = 0
+    for i, ch in enumerate(line):
+        if units >= col:
+            return i
+        units += 2 if ord(ch) > 0xFFFF else 1
+    return len(line)
+
+
+class Document(object):
+    """已打开的文档：path 为项目相对路径，kind 为 markdown / sidebar / None"""
+
+    __slots__ = ('uri', 'path', 'page', 'kind', 'text', 'version', '_lines', '_starts')
+
+    def __init__(self, uri, path, text, version=0):
+        self.uri = uri
+        self.path = path
+        self.page = None
+        self.kind = None
+        if path == SIDEBAR_FILE:
+            self.kind = 'sidebar'
+        elif path.startswith(DOCS_DIR + '/') and is_page_file(path[len(DOCS_DIR) + 1:]):
+            self.kind = 'markdown'
+            self.page = path[len(DOCS_DIR) + 1:]
+        self.version = version
+        self.set_text(text)
+
+    def set_text(self, text):
+        self.text = text
+        self._lines = None
+        self._starts = None
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = self.text.split('\n')
+        return self._lines
+
+    @property
+    def starts(self):
+        """每行起始字符偏移"""
+        if self._starts is None:
+            starts = [0]
+            for line in self.lines[:-1]:
+                starts.append(starts[-1] + len(line) + 1)
+            self._starts = starts
+        return self._starts
+
+    def offset_at(self, position):
+        """LSP Position → 文本中的字符偏移"""
+        lines = self.lines
+        row = position['line']
+        if row >= len(lines):
+            return len(self.text)
+        return self.starts[row] + from_utf16(lines[row], position['character'])
+
+    def position_at(self, offset):
+        """字符偏移 → LSP Position"""
+        row = bisect_right(self.starts, offset) - 1
+        line = self.lines[row]
+        return {'line': row, 'character': to_utf16(line, offset - self.starts[row])}
+
+    def apply_change(self, change):
+        """应用 didChange 中的一项修改（带 range 为增量修改，否则为全文替换）"""
+        if 'range' not in change:
+            self.set_text(change['text'])
+            return
+        start = self.offset_at(change['range']['start'])
+        end = self.offset_at(change['range']['end'])
+        self.set_text(self.text[:start] + change['text'] + self.text[end:])
+
+
+def _range(row, start, end, line):
+    return {'start': {'line': row, 'character': to_utf16(line, start)},
+            'end': {'line': row, 'character': to_utf16(line, end)}}
+
+
+def _diagnostic(rng, message, severity=SEVERITY_ERROR):
+    return {'range': rng, 'severity': severity, 'source': 'doc-tools', 'message': message}
+
+
+# ========== 工作区状态 ==========
+
+class Workspace(object):
+    """常驻内存的语料索引、侧边栏模型与已打开文档"""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self.corpus = load_corpus(self.root)
+        self.documents = {}
+        self.sidebar = None
+        self.sidebar_error = None
+        self.reload_sidebar()
+
+    # ---------- 路径 ----------
+
+    def path_of(self, uri):
+        """file:// URI → 项目相对路径（不在项目内时返回 None）"""
+        parsed = urlparse(uri)
+        if parsed.scheme != 'file':
+            return None
+        path = unquote(parsed.path)
+        if re.match(r'^/[A-Za-z]:', path):
+            path = path[1:]  # Windows: file:///C:/...
+        try:
+            return Path(path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    def uri_of(self, rel_path):
+        return (self.root / rel_path).as_uri()
+
+    # ---------- 索引维护 ----------
+
+    def reload_sidebar(self, text=None):
+        if text is None:
+            doc = self._open_sidebar()
+            if doc is not None:
+                text = doc.text
+            else:
+                try:
+                    text = (self.root / SIDEBAR_FILE).read_text(encoding='utf-8')
+                except OSError as e:
+                    self.sidebar, self.sidebar_error = None, e
+                    return
+        try:
+            self.sidebar = parse_sidebar(text, SIDEBAR_FILE)
+            self.sidebar_error = None
+        except SidebarSyntaxError as e:
+            # 保留上一次成功解析的模型，补全仍然可用
+            self.sidebar_error = e
+
+    def _open_sidebar(self):
+        for doc in self.documents.values():
+            if doc.kind == 'sidebar':
+                return doc
+        return None
+
+    def _anchor_key(self, page):
+        record = self.corpus.get(page)
+        return tuple(record.anchors()) if record is not None else None
+
+    def index_document(self, doc):
+        """用文档的当前内容更新内存索引，返回受影响的页面（标题或页面集合发生了变化）"""
+        if doc.kind == 'sidebar':
+            self.reload_sidebar(doc.text)
+            return None
+        if doc.kind != 'markdown':
+            return None
+        before = self._anchor_key(doc.page)
+        self.corpus.pages[doc.page] = Corpus.parse_page(doc.page, doc.text.encode('utf-8'))
+        return doc.page if self._anchor_key(doc.page) != before else None
+
+    def restore_page(self, page):
+        """文档关闭后恢复为磁盘内容，返回页面的标题是否发生了变化"""
+        before = self._anchor_key(page)
+        full = self.root / DOCS_DIR / page
+        try:
+            st = full.stat()
+            with map_file(full) as data:
+                self.corpus.pages[page] = Corpus.parse_page(page, data, st.st_size, st.st_mtime_ns)
+        except OSError:
+            self.corpus.pages.pop(page, None)
+        return self._anchor_key(page) != before
+
+    def refresh(self):
+        """同步磁盘上的变化（已打开的文档以编辑器中的内容为准），返回是否有页面变化"""
+        changed = self.corpus.refresh()
+        for doc in self.documents.values():
+            if doc.kind == 'markdown':
+                self.index_document(doc)
+        if self._open_sidebar() is None:
+            self.reload_sidebar()
+        return bool(changed or self.corpus.removed)
+
+    # ---------- 链接检查 ----------
+
+    def check_target(self, from_page, target):
+        """检查站内链接，返回错误信息；站外链接、静态资源和有效链接返回 None"""
+        page, anchor = resolve_link(from_page, target)
+        if page is None:
+            return None
+        path = target.split('#', 1)[0].split('?', 1)[0]
+        if posixpath.splitext(path.rstrip('/'))[1] not in _PAGE_EXTENSIONS:
+            return None
+        record = self.corpus.get(page)
+        if record is None:
+            return f'页面不存在: {DOCS_DIR}/{page}'
+        if anchor is not None and not record.has_anchor(anchor):
+            return f"锚点 '{anchor}' 在 {DOCS_DIR}/{page} 中未定义"
+        return None
+
+    def diagnostics(self, doc):
+        if doc.kind == 'markdown':
+            return self._markdown_diagnostics(doc)
+        if doc.kind == 'sidebar':
+            return self._sidebar_diagnostics(doc)
+        return []
+
+    def _markdown_diagnostics(self, doc):
+        record = self.corpus.get(doc.page)
+        if record is None:
+            return []
+        result = []
+        lines = doc.lines
+        for row, start, end, target in _link_targets(lines, record.link_lines()):
+            message = self.check_target(doc.page, target)
+            if message:
+                result.append(_diagnostic(_range(row, start, end, lines[row]), message))
+        return result
+
+    def _sidebar_diagnostics(self, doc):
+        if self.sidebar_error is not None:
+            row = getattr(self.sidebar_error, 'line', 1) - 1
+            return [_diagnostic(_range(row, 0, len(doc.lines[row]), doc.lines[row]),
+                                f'无法解析 sidebar.ts: {self.sidebar_error}')]
+        if self.sidebar is None:
+            return []
+        result = []
+        for item in self.sidebar.walk():
+            node = item.node.get('link')
+            if not isinstance(node, JSValue) or not isinstance(node.value, str):
+                continue
+            message = self.check_target('', node.value)
+            if message:
+                result.append(_diagnostic({'start': doc.position_at(node.start + 1),
+                                           'end': doc.position_at(node.end - 1)},
+                                          f'{node.value}: {message}'))
+        return result
+
+    # ---------- 补全与跳转 ----------
+
+    def reading_order(self):
+        """页面在侧边栏中的阅读顺序，用于补全排序"""
+        order = {}
+        if self.sidebar is not None:
+            for item in self.sidebar.links():
+                page = item.page
+                if page is not None and page not in order:
+                    order[page] = len(order)
+        return order
+
+    def complete(self, doc, position):
+        row = position['line']
+        if row >= len(doc.lines):
+            return []
+        line = doc.lines[row]
+        col = from_utf16(line, position['character'])
+        pattern = _MD_TARGET if doc.kind == 'markdown' else _TS_TARGET
+        match = pattern.search(line[:col])
+        if not match:
+            return []
+        typed = match.group(1)
+        from_page = doc.page or ''
+        if '#' in typed:
+            path = typed.split('#', 1)[0]
+            page = resolve_link(from_page, path)[0] if path else doc.page
+            start = col - len(typed) + len(path) + 1
+            return self._complete_anchors(page, _range(row, start, col, line))
+        return self._complete_pages(doc, typed, _range(row, col - len(typed), col, line))
+
+    def _complete_anchors(self, page, rng):
+        record = self.corpus.get(page) if page else None
+        if record is None:
+            return []
+        return [{'label': h.anchor, 'kind': KIND_REFERENCE,
+                 'detail': f"{'#' * h.level} {h.title}",
+                 'sortText': f'{i:05d}', 'textEdit': {'range': rng, 'newText': h.anchor}}
+                for i, h in enumerate(record.headings)]
+
+    def _complete_pages(self, doc, typed, rng):
+        order = self.reading_order()
+        relative = doc.kind == 'markdown' and not typed.startswith('/')
+        base = posixpath.dirname(doc.page) if relative else ''
+        items = []
+        for record in self.corpus:
+            url = page_url(record.path)
+            if relative:
+                link = posixpath.relpath(url.strip('/') or '.', base or '.')
+                link = './' if link == '.' else link if link.startswith('..') else './' + link
+                if url.endswith('/') and not link.endswith('/'):
+                    link += '/'
+            else:
+                link = url
+            rank = order.get(record.path, len(order))
+            items.append({'label': link, 'kind': KIND_FILE, 'detail': record.title,
+                          'sortText': f'{rank:05d}{link}', 'textEdit': {'range': rng, 'newText': link}})
+        return items
+
+    def definition(self, doc, position):
+        row = position['line']
+        if row >= len(doc.lines):
+            return None
+        line = doc.lines[row]
+        col = from_utf16(line, position['character'])
+        target = None
+        if doc.kind == 'markdown':
+            for _, start, end, value in _link_targets(doc.lines, {row + 1}):
+                if start <= col <= end:
+                    target = value
+                    break
+        elif doc.kind == 'sidebar' and self.sidebar is not None:
+            offset = doc.offset_at(position)
+            for item in self.sidebar.walk():
+                node = item.node.get('link')
+                if isinstance(node, JSValue) and node.start <= offset < node.end:
+                    target = node.value
+                    break
+        if not isinstance(target, str):
+            return None
+        page, anchor = resolve_link(doc.page or '', target)
+        record = self.corpus.get(page) if page else None
+        if record is None:
+            return None
+        heading = record.heading(anchor) if anchor is not None else None
+        pos = {'line': heading.line - 1 if heading else 0, 'character': 0}
+        return {'uri': self.uri_of(f'{DOCS_DIR}/{page}'), 'range': {'start': pos, 'end': pos}}
+
+
+def _link_targets(lines, numbers):
+    """在给定行号（从 1 开始）中定位链接地址，产生 (行下标, 起始列, 结束列, 地址)"""
+    for number in sorted(numbers):
+        if number > len(lines):
+            continue
+        line = lines[number - 1]
+        for match in link_matches(line):
+            yield number - 1, match.start(3), match.end(3), match.group(3)
+
+
+# ========== 协议 ==========
+
+def read_message(stream):
+    """读取一条 Content-Length 分帧的 JSON-RPC 消息，输入结束时返回 None"""
+    length = None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            if length is None:
+                continue
+            break
+        name, _, value = header.decode('ascii', 'replace').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value.strip())
+    return json.loads(stream.read(length).decode('utf-8'))
+
+
+def write_message(stream, message):
+    body = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    stream.write(f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii') + body)
+    stream.flush()
+
+
+class LanguageServer(object):
+    """按方法名分发请求与通知：请求 foo/bar 由 on_foo_bar 处理"""
+
+    def __init__(self, root, reader, writer, log=None):
+        self.root = root
+        self.reader = reader
+        self.writer = writer
+        self.log = log
+        self.workspace = None
+        self.shutdown = False
+
+    def serve(self):
+        """主循环，返回退出码（收到 shutdown 后的 exit 为 0）"""
+        while True:
+            message = read_message(self.reader)
+            if message is None:
+                return 0 if self.shutdown else 1
+            method = message.get('method')
+            if method == 'exit':
+                return 0 if self.shutdown else 1
+            if method is None:
+                continue  # 客户端对服务器请求的响应
+            self.handle(message)
+
+    def handle(self, message):
+        method = message['method']
+        msg_id = message.get('id')
+        handler = getattr(self, 'on_' + method.replace('$/', '').replace('/', '_'), None)
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                if msg_id is not None:
+                    self.send({'id': msg_id, 'error': {'code': METHOD_NOT_FOUND,
+                                                       'message': f'不支持的方法: {method}'}})
+                return
+            result = handler(message.get('params') or {})
+            if msg_id is not None:
+                self.send({'id': msg_id, 'result': result})
+        except Exception as e:  # 单个请求出错不影响服务器继续运行
+            self.trace(f'{method} 失败: {e!r}')
+            if msg_id is not None:
+                self.send({'id': msg_id, 'error': {'code': INTERNAL_ERROR, 'message': str(e)}})
+        elapsed = (time.perf_counter() - started) * 1000
+        if self.log or elapsed > BUDGET_MS:
+            self.trace(f'{method} {elapsed:.1f} ms')
+
+    def send(self, message):
+        message['jsonrpc'] = '2.0'
+        write_message(self.writer, message)
+
+    def notify(self, method, params):
+        self.send({'method': method, 'params': params})
+
+    def trace(self, text):
+        print(f'[doc-tools lsp] {text}', file=sys.stderr, flush=True)
+
+    def publish(self, doc):
+        self.notify('textDocument/publishDiagnostics',
+                    {'uri': doc.uri, 'version': doc.version,
+                     'diagnostics': self.workspace.diagnostics(doc)})
+
+    def publish_dependents(self, page, skip=None):
+        """页面标题变化后，重新诊断链接到该页面的已打开文档"""
+        for doc in self.workspace.documents.values():
+            if doc is skip:
+                continue
+            if doc.kind == 'sidebar':
+                self.publish(doc)
+            elif doc.kind == 'markdown' and page is not None:
+                record = self.workspace.corpus.get(doc.page)
+                if record and any(resolve_link(doc.page, t)[0] == page for t in record.link_targets()):
+                    self.publish(doc)
+
+    # ---------- 生命周期 ----------
+
+    def on_initialize(self, params):
+        root = self.root
+        if params.get('rootUri'):
+            parsed = urlparse(params['rootUri'])
+            if parsed.scheme == 'file':
+                root = unquote(parsed.path)
+        self.workspace = Workspace(root)
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': SYNC_INCREMENTAL, 'save': True},
+                'completionProvider': {'triggerCharacters': ['(', '/', '#', '"', "'", '.']},
+                'definitionProvider': True,
+            },
+            'serverInfo': {'name': 'doc-tools', 'version': __version__},
+        }
+
+    def on_initialized(self, params):
+        self.trace(f'已加载 {len(self.workspace.corpus)} 个页面')
+
+    def on_shutdown(self, params):
+        self.shutdown = True
+        return None
+
+    def on_cancelRequest(self, params):
+        pass  # 请求都是同步处理的，收到取消时已经处理完毕
+
+    # ---------- 文档同步 ----------
+
+    def _document(self, params):
+        return self.workspace.documents.get(params['textDocument']['uri'])
+
+    def on_textDocument_didOpen(self, params):
+        item = params['textDocument']
+        path = self.workspace.path_of(item['uri'])
+        if path is None:
+            return
+        doc = Document(item['uri'], path, item['text'], item.get('version', 0))
+        if doc.kind is None:
+            return
+        self.workspace.documents[doc.uri] = doc
+        self._reindex(doc)
+
+    def on_textDocument_didChange(self, params):
+        doc = self._document(params)
+        if doc is None:
+            return
+        for change in params['contentChanges']:
+            doc.apply_change(change)
+        doc.version = params['textDocument'].get('version', doc.version)
+        self._reindex(doc)
+
+    def _reindex(self, doc):
+        changed = self.workspace.index_document(doc)
+        self.publish(doc)
+        if doc.kind == 'sidebar':
+            return
+        if changed is not None:
+            self.publish_dependents(changed, skip=doc)
+
+    def on_textDocument_didSave(self, params):
+        pass  # 内容已通过 didChange 同步
+
+    def on_textDocument_didClose(self, params):
+        doc = self.workspace.documents.pop(params['textDocument']['uri'], None)
+        if doc is None:
+            return
+        if doc.kind == 'markdown':
+            if self.workspace.restore_page(doc.page):
+                self.publish_dependents(doc.page)
+        else:
+            self.workspace.reload_sidebar()
+        self.notify('textDocument/publishDiagnostics', {'uri': doc.uri, 'diagnostics': []})
+
+    def on_workspace_didChangeWatchedFiles(self, params):
+        if self.workspace.refresh():
+            for doc in self.workspace.documents.values():
+                self.publish(doc)
+
+    # ---------- 语言功能 ----------
+
+    def on_textDocument_completion(self, params):
+        doc = self._document(params)
+        if doc is None:
+            return []
+        return self.workspace.complete(doc, params['position'])
+
+    def on_textDocument_definition(self, params):
+        doc = self._document(params)
+        if doc is None:
+            return None
+        return self.workspace.definition(doc, params['position'])
+
+
+def cmd_lsp(args):
+    """在 stdio 上运行语言服务器"""
+    server = LanguageServer(args.root, sys.stdin.buffer, sys.stdout.buffer, log=args.log)
+    return server.serve()
+
+
+def register(subparsers):
+    p = subparsers.add_parser('lsp', help='在 stdio 上运行语言服务器（锚点/页面补全、跳转、失效链接诊断）')
+    p.add_argument('--log', action='store_true', help='在 stderr 中记录每个请求的耗时')
+    p.set_defaults(func=cmd_lsp)
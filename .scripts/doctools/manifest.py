@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+章节清单 - 根据侧边栏顺序和语料索引生成每个模块的章节元数据（阅读顺序、上一章/下一章、预计阅读时间）
+
+输出 docs/.vitepress/data/chapters/<模块>.json，config.ts 在构建时读取：页脚的上一章/下一章
+和 ChapterGuide 的预计时间都来自清单，作者不再需要手写 prevChapter / nextChapter / estimatedTime。
+
+阅读时间按中文字数与英文词数分别估算（见 text.count_reading_units），代码块按行计。
+页面阅读量按内容哈希缓存，只有变化的页面才重新统计；内容未变的清单文件不会被重写。
+"""
+
+import json
+from pathlib import Path
+
+from .common import SIDEBAR_FILE, VITEPRESS_DIR, cache_path, load_json, page_url, save_json, write_text_atomic
+from .corpus import load_corpus, open_corpus
+from .gitref import GitError
+from .sidebar import SidebarSyntaxError, parse_sidebar
+from .text import count_reading_units, strip_inline
+
+MANIFEST_VERSION = 1
+MANIFEST_DIR = VITEPRESS_DIR + '/data/chapters'
+STATE_FILE = 'chapters-state.json'
+
+# 技术文档阅读速度：中文字/分钟、英文词/分钟、代码行/分钟
+CJK_PER_MINUTE = 300
+WORDS_PER_MINUTE = 200
+CODE_LINES_PER_MINUTE = 30
+
+
+def page_units(page, text):
+    """统计页面阅读量，返回 [CJK 字数, 拉丁词数, 代码行数]"""
+    lines = text.split('\n')
+    skip = set()
+    code = 0
+    for fence in page.fences:
+        skip.update(range(fence.line - 1, fence.end))
+        code += max(fence.end - fence.line - 1, 0)
+    if page.frontmatter:
+        skip.update(range(page.frontmatter[0] - 1, page.frontmatter[1]))
+    prose = '\n'.join(strip_inline(l) for i, l in enumerate(lines) if i not in skip)
+    cjk, words = count_reading_units(prose)
+    return [cjk, words, code]
+
+
+def reading_minutes(units):
+    cjk, words, code = units
+    minutes = cjk / CJK_PER_MINUTE + words / WORDS_PER_MINUTE + code / CODE_LINES_PER_MINUTE
+    return max(1, int(round(minutes)))
+
+
+def format_minutes(minutes):
+    """格式化为 ChapterGuide 使用的 estimatedTime 文本"""
+    if minutes < 60:
+        return f'{minutes} 分钟'
+    hours = round(minutes / 30) / 2
+    return f'{hours:g} 小时'
+
+
+def _ref(entry):
+    return {'title': entry['title'], 'link': entry['link']} if entry else None
+
+
+def build_module(sidebar, prefix, corpus, units):
+    """按侧边栏阅读顺序生成一个模块的章节列表"""
+    chapters = []
+    seen = set()
+    for item in sidebar.links(prefix):
+        page = item.page
+        if item.anchor or page in seen or page not in corpus:
+            continue
+        seen.add(page)
+        top = item
+        while top.parent is not None:
+            top = top.parent
+        minutes = reading_minutes(units[page])
+        chapters.append({
+            'link': page_url(page),
+            'title': item.text,
+            'heading': corpus.get(page).title,
+            'chapter': item.chapter,
+            'group': top.text if top is not item else None,
+            'minutes': minutes,
+            'estimatedTime': format_minutes(minutes),
+        })
+    for i, entry in enumerate(chapters):
+        entry['prev'] = _ref(chapters[i - 1] if i > 0 else None)
+        entry['next'] = _ref(chapters[i + 1] if i + 1 < len(chapters) else None)
+    return chapters
+
+
+def render_manifest(module, chapters):
+    """紧凑 JSON，每章一行，便于在提交中查看差异"""
+    def dump(value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    rows = ',\n'.join(dump(c) for c in chapters)
+    return f'{{"v":{MANIFEST_VERSION},"module":{dump(module)},"chapters":[\n{rows}\n]}}\n'
+
+
+def _read_current(corpus, rel):
+    """读取已有的清单文件（git ref 语料从 git 对象读取），不存在时返回 None"""
+    try:
+        return corpus.read_file(rel)
+    except (OSError, GitError):
+        return None
+
+
+def build_manifests(root='.', out_dir=None, check=False, corpus=None, sidebar=None):
+    """生成所有模块的章节清单，返回 {模块: 状态}；状态为 written / unchanged / stale
+
+    corpus 为 git ref 的语料时，侧边栏与已有清单同样从该 ref 读取，只做检查；
+    检查模式下不更新阅读量缓存。
+    """
+    corpus = corpus or load_corpus(root)
+    sidebar = sidebar or parse_sidebar(corpus.read_file(SIDEBAR_FILE), SIDEBAR_FILE)
+    check = check or corpus.ref is not None
+    out_dir = out_dir or MANIFEST_DIR
+
+    state_file = cache_path(root, STATE_FILE)
+    state = load_json(state_file, {})
+    cached = state.get('pages', {}) if state.get('version') == MANIFEST_VERSION else {}
+    units = {}
+    for page in corpus:
+        entry = cached.get(page.path)
+        if entry and entry[0] == page.hash:
+            units[page.path] = entry[1]
+        else:
+            units[page.path] = page_units(page, corpus.read_text(page.path))
+    if not check:
+        save_json(state_file, {'version': MANIFEST_VERSION,
+                               'pages': {p: [corpus.get(p).hash, u] for p, u in units.items()}})
+
+    report = {}
+    for prefix in sidebar.modules:
+        module = prefix.strip('/') or 'root'
+        chapters = build_module(sidebar, prefix, corpus, units)
+        if not chapters:
+            continue
+        text = render_manifest(module, chapters)
+        rel = f'{out_dir}/{module}.json'
+        current = _read_current(corpus, rel)
+        if current == text:
+            report[module] = ('unchanged', len(chapters))
+        elif check:
+            report[module] = ('stale', len(chapters))
+        else:
+            write_text_atomic(Path(root) / rel, text)
+            report[module] = ('written', len(chapters))
+    return report
+
+
+def cmd_chapter_manifest(args):
+    """生成章节清单"""
+    print(f"=== 生成章节清单{f' [{args.ref}]' if args.ref else ''} ===\n")
+    try:
+        with open_corpus(args.root, args.ref) as corpus:
+            report = build_manifests(args.root, args.out, args.check, corpus)
+    except GitError as e:
+        print(f"❌ 错误: 无法读取 {args.ref}: {e}")
+        return 2
+    except (OSError, SidebarSyntaxError) as e:
+        print(f"❌ 错误: 无法解析 sidebar.ts: {e}")
+        return 2
+
+    icons = {'written': '✏️ ', 'unchanged': '✅', 'stale': '❌'}
+    labels = {'written': '已更新', 'unchanged': '无变化', 'stale': '已过期'}
+    for module, (status, count) in sorted(report.items()):
+        print(f"{icons[status]} {module}: {count} 章 {labels[status]}")
+
+    stale = [m for m, (status, _) in report.items() if status == 'stale']
+    if stale:
+        print("\n💡 章节清单与侧边栏不一致，请运行: bash .scripts/doc-tools.sh chapter-manifest")
+        return 1
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('chapter-manifest', help='根据侧边栏生成章节清单（上一章/下一章、阅读时间）')
+    p.add_argument('--out', help=f'输出目录（默认 {MANIFEST_DIR}）')
+    p.add_argument('--check', action='store_true', help='只检查清单是否最新，不写入')
+    p.add_argument('--ref', help='检查指定 git ref（如 dev、origin/dev）中的清单而不是工作区（隐含 --check）')
+    p.set_defaults(func=cmd_chapter_manifest)
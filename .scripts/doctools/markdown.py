@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown 词法扫描 - 单次遍历生成事件流
+
+事件类型：
+    frontmatter   文件开头的 YAML front matter（line ~ end）
+    heading       标题（level、text=标题文本、target=锚点、info=显式锚点）
+    fence_open    代码块开始（info=语言、level=缩进、target=围栏标记）
+    fence_close   代码块结束（end=开始行，info=语言；文件末尾未闭合时同样产生）
+    link          链接（text=链接文字、target=链接地址、col=列号），不含图片
+    table         表格（line ~ end）
+    text          代码块与 front matter 之外的每一行（含标题行与表格行）
+
+行号均从 1 开始；代码块内的内容不会产生 heading / link / table / text 事件。
+语料索引与规则引擎都基于同一个扫描器，保证解析结果一致。
+
+scan_buffer 是面向语料索引的字节级版本：直接在 mmap 缓冲区上用字节正则定位候选行，
+按候选行的起始偏移表换算行号，只把候选行和 front matter 解码为 str，
+产生的 frontmatter / heading / link / fence_open / fence_close 事件与 tokenize 完全一致。
+"""
+
+import re
+from array import array
+
+from .slug import AnchorAllocator, split_heading
+
+_HEADING = re.compile(r'^(#{1,6})[ \t]+(.*?)[ \t]*$')
+_FENCE_OPEN = re.compile(r'^([ \t]*)(`{3,}|~{3,})[ \t]*([^\s`{]*)')
+_LINK = re.compile(r'(!?)\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+_INLINE_CODE = re.compile(r'`+[^`]*`+')
+_TABLE_DELIM = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+
+# 字节级候选行：代码块围栏、标题、链接（与上面的 str 正则前缀一致）
+_FENCE_HEAD_B = re.compile(rb'[ \t]*(?:`{3}|~{3})')
+_FENCE_LINE_B = re.compile(rb'\n[ \t]*(?:`{3}|~{3})')
+_HEADING_LINE_B = re.compile(rb'\n#')
+_FENCE, _HEADING_FLAG, _LINK_FLAG = 1, 2, 4
+
+
+class Token(object):
+    """扫描事件"""
+
+    __slots__ = ('kind', 'line', 'end', 'level', 'text', 'target', 'info', 'col')
+
+    def __init__(self, kind, line, end=None, level=0, text='', target=None, info='', col=0):
+        self.kind = kind
+        self.line = line
+        self.end = line if end is None else end
+        self.level = level
+        self.text = text
+        self.target = target
+        self.info = info
+        self.col = col
+
+    def __repr__(self):
+        return f'Token({self.kind!r}, line={self.line}, text={self.text!r})'
+
+
+def blank_inline_code(line):
+    """用等长空白替换行内代码，保持列位置不变"""
+    if '`' not in line:
+        return line
+    return _INLINE_CODE.sub(lambda m: ' ' * len(m.group(0)), line)
+
+
+def link_matches(line):
+    """行内的链接（不含图片与行内代码中的内容），group(2) 为链接文字，group(3) 为链接地址"""
+    for match in _LINK.finditer(blank_inline_code(line)):
+        if not match.group(1):
+            yield match
+
+
+def tokenize(lines):
+    """扫描已按行切分的 Markdown 文本，逐个产生 Token"""
+    allocator = AnchorAllocator()
+    n = len(lines)
+    start = 0
+    if lines and lines[0].rstrip() == '---':
+        for i in range(1, n):
+            if lines[i].rstrip() in ('---', '...'):
+                yield Token('frontmatter', 1, i + 1, text='\n'.join(lines[1:i]))
+                start = i + 1
+                break
+
+    fence = None
+    table_start = None
+    for i in range(start, n):
+        line = lines[i]
+        number = i + 1
+
+        if fence is not None:
+            stripped = line.strip()
+            marker = fence.target
+            if stripped.startswith(marker) and stripped == marker[0] * len(stripped):
+                yield Token('fence_close', number, fence.line, info=fence.info, level=fence.level)
+                fence = None
+            continue
+
+        is_table_row = '|' in line and line.lstrip().startswith('|')
+        if table_start is not None and not is_table_row:
+            yield Token('table', table_start, number - 1)
+            table_start = None
+
+        match = _FENCE_OPEN.match(line) if ('`' in line or '~' in line) else None
+        if match:
+            fence = Token('fence_open', number, level=len(match.group(1)),
+                          info=match.group(3).lower(), target=match.group(2))
+            yield fence
+            continue
+
+        yield Token('text', number, text=line)
+
+        if line.startswith('#'):
+            match = _HEADING.match(line)
+            if match:
+                title, explicit = split_heading(match.group(2))
+                anchor = allocator.allocate(title, explicit)
+                yield Token('heading', number, level=len(match.group(1)), text=title,
+                            target=anchor, info=explicit or '')
+
+        if table_start is None and is_table_row and i + 1 < n and _TABLE_DELIM.match(lines[i + 1]):
+            table_start = number
+
+        if '](' in line:
+            for match in link_matches(line):
+                yield Token('link', number, text=match.group(2), target=match.group(3),
+                            col=match.start())
+
+    if table_start is not None:
+        yield Token('table', table_start, n)
+    if fence is not None:
+        # 未闭合的代码块延伸到文件末尾
+        yield Token('fence_close', n, fence.line, info=fence.info, level=fence.level)
+
+
+def _candidate_lines(buf, offset):
+    """从 offset（某行起始）开始找出所有候选行，返回 {行起始偏移: 标记}"""
+    candidates = {}
+    if offset == 0:
+        # 首行前面没有换行符，单独判断
+        if buf[:1] == b'#':
+            candidates[0] = _HEADING_FLAG
+        elif _FENCE_HEAD_B.match(buf):
+            candidates[0] = _FENCE
+    search_from = max(offset - 1, 0)
+    for m in _FENCE_LINE_B.finditer(buf, search_from):
+        start = m.start() + 1
+        candidates[start] = candidates.get(start, 0) | _FENCE
+    for m in _HEADING_LINE_B.finditer(buf, search_from):
+        start = m.start() + 1
+        candidates[start] = candidates.get(start, 0) | _HEADING_FLAG
+    pos = buf.find(b'](', offset)
+    while pos != -1:
+        start = buf.rfind(b'\n', 0, pos) + 1
+        candidates[start] = candidates.get(start, 0) | _LINK_FLAG
+        end = buf.find(b'\n', pos)
+        if end == -1:
+            break
+        pos = buf.find(b'](', end)
+    return candidates
+
+
+def scan_buffer(buf):
+    """在 bytes / mmap 缓冲区上扫描，产生 frontmatter、heading、link 与代码块事件
+
+    字节正则先找出所有候选行（围栏、标题、链接），按偏移排序后得到候选行的起始偏移表；
+    行号由相邻候选行之间的换行数累加（mmap 没有 count，只切出两行之间的片段计数），
+    其余行不会被解码。
+    """
+    size = len(buf)
+
+    def line_end(start):
+        end = buf.find(b'\n', start)
+        return size if end == -1 else end
+
+    def decode(start):
+        return buf[start:line_end(start)].decode('utf-8', errors='replace')
+
+    offset = 0
+    number = 1
+    if buf[:line_end(0)].rstrip() == b'---':
+        start = line_end(0) + 1
+        line = 2
+        while start <= size:
+            end = line_end(start)
+            if buf[start:end].rstrip() in (b'---', b'...'):
+                body = buf[line_end(0) + 1:start - 1] if line > 2 else b''
+                yield Token('frontmatter', 1, line, text=body.decode('utf-8', errors='replace'))
+                offset, number = end + 1, line + 1
+                break
+            start = end + 1
+            line += 1
+    if offset > size:
+        return
+
+    candidates = _candidate_lines(buf, offset)
+    starts = array('I', sorted(candidates))
+    allocator = AnchorAllocator()
+    fence = None
+    prev = offset
+    for start in starts:
+        number += buf[prev:start].count(b'\n')
+        prev = start
+        flags = candidates[start]
+        if fence is not None:
+            if flags & _FENCE:
+                stripped = decode(start).strip()
+                marker = fence.target
+                if stripped.startswith(marker) and stripped == marker[0] * len(stripped):
+                    yield Token('fence_close', number, fence.line, info=fence.info, level=fence.level)
+                    fence = None
+            continue
+
+        line = decode(start)
+        if flags & _FENCE:
+            match = _FENCE_OPEN.match(line)
+            fence = Token('fence_open', number, level=len(match.group(1)),
+                          info=match.group(3).lower(), target=match.group(2))
+            yield fence
+            continue
+
+        if flags & _HEADING_FLAG:
+            match = _HEADING.match(line)
+            if match:
+                title, explicit = split_heading(match.group(2))
+                anchor = allocator.allocate(title, explicit)
+                yield Token('heading', number, level=len(match.group(1)), text=title,
+                            target=anchor, info=explicit or '')
+
+        if flags & _LINK_FLAG:
+            for match in _LINK.finditer(blank_inline_code(line)):
+                if not match.group(1):
+                    yield Token('link', number, text=match.group(2), target=match.group(3),
+                                col=match.start())
+
+    if fence is not None:
+        number += buf[prev:].count(b'\n')
+        yield Token('fence_close', number, fence.line, info=fence.info, level=fence.level)
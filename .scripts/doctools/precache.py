@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+离线预缓存清单 - 按侧边栏阅读顺序把构建产物分成可单独缓存的分组，生成 Service Worker 预缓存清单
+
+    bash .scripts/doc-tools.sh precache-manifest            # 构建后运行，写入 dist/precache/
+
+页面与资源的对应关系复用 dist-report 的分析（页面 HTML、页面 chunk 以及 HTML 中引用的脚本与样式）：
+
+    core        多个模块共用的资源（框架、主题 chunk、CSS）、首页与 404 页面，以及 assets/ 中
+                没有被任何页面 HTML 直接引用的共享资源（动态导入的组件、字体等）
+    <模块>-<n>  模块内的页面按阅读顺序依次装入分组，一组达到 --group-kb 后开始下一组；
+                只被该模块引用的资源随第一个引用它的页面进入分组
+
+读者可以只预取一个模块（如 /java/ 的所有分组加 core），而不必下载整个站点。
+本地搜索索引与其他未被页面引用的文件（sitemap、预压缩文件等）不进入预缓存。
+
+输出 dist/precache/manifest.json（分组目录）与每个分组的 <分组>.json：
+
+    {"v": 1, "id": "java-1", "entries": [{"url": "/simonProjectGuide/java/chapter-01.html", "revision": "3f2a9c1d0b"},
+                                         {"url": "/simonProjectGuide/assets/chunks/x.DXq9Ofe7.js", "revision": null}]}
+
+entries 与 Workbox 的预缓存清单格式一致：revision 为内容哈希前缀，文件名已带内容哈希的资源为 null。
+manifest.json 中每个分组的 hash 由其条目决定，内容未变的分组 hash 不变，Service Worker 可据此跳过更新。
+文件哈希复用 deploy-manifest 的增量扫描（大小与修改时间未变、或带哈希的资源文件不重新读取）。
+"""
+
+import json
+import os
+
+from .common import DIST_DIR, cache_path, content_hash, load_json, module_of, save_json
+from .corpus import load_corpus
+from .deploy import is_hashed_asset, iter_dist_files, scan_dist
+from .distreport import analyze_dist, categorize, site_base
+from .sidebar import SidebarSyntaxError, load_sidebar
+
+PRECACHE_VERSION = 1
+PRECACHE_DIR = 'precache'
+STATE_FILE = 'precache-state.json'
+CORE_GROUP = 'core'
+ROOT_MODULE = 'root'
+DEFAULT_GROUP_KB = 512
+REVISION_LENGTH = 10
+
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+class PrecacheGroup(object):
+    """一个可单独缓存的分组；pages 为分组内页面的 HTML 文件"""
+
+    __slots__ = ('id', 'module', 'pages', 'files', 'bytes')
+
+    def __init__(self, id, module):
+        self.id = id
+        self.module = module
+        self.pages = []
+        self.files = []
+        self.bytes = 0
+
+    def add(self, rel, sizes):
+        self.files.append(rel)
+        self.bytes += sizes[rel]
+
+
+def reading_order(sidebar, module, pages):
+    """模块内页面的阅读顺序：侧边栏中的页面在前，未出现在侧边栏中的按路径排在后面"""
+    ordered = []
+    prefix = sidebar.module_for(module) if sidebar else None
+    if prefix:
+        for item in sidebar.links(prefix):
+            if item.page in pages and item.page not in ordered:
+                ordered.append(item.page)
+    ordered.extend(sorted(p for p in pages if p not in ordered))
+    return ordered
+
+
+def is_core_candidate(rel):
+    """没有被页面 HTML 直接引用、但仍应随 core 缓存的文件"""
+    return rel.startswith('assets/') and categorize(rel) in ('shared-js', 'css', 'other') \
+        and not rel.endswith(COMPRESSED_SUFFIXES)
+
+
+def plan_groups(report, sidebar, group_bytes):
+    """把构建产物分为 core 与各模块的分组，返回 (core, {模块: [PrecacheGroup]}, 未纳入的文件列表)"""
+    sizes = report.sizes
+    page_modules = {source: module_of(source) for source in report.pages}
+    ref_modules = {}
+    for source, weight in report.pages.items():
+        for ref in weight.refs:
+            ref_modules.setdefault(ref, set()).add(page_modules[source])
+
+    core = PrecacheGroup(CORE_GROUP, None)
+    assigned = set()
+
+    def take(group, rel):
+        if rel not in assigned:
+            assigned.add(rel)
+            group.add(rel, sizes)
+
+    for ref in sorted(ref_modules):
+        modules = ref_modules[ref]
+        if len(modules) > 1 or ROOT_MODULE in modules:
+            take(core, ref)
+    for source in sorted(report.pages):
+        if page_modules[source] == ROOT_MODULE:
+            weight = report.pages[source]
+            core.pages.append(weight.file)
+            for rel in [weight.file] + weight.chunks + weight.refs:
+                take(core, rel)
+    for rel in report.unmatched:
+        take(core, rel)
+    referenced = set(ref_modules)
+    for rel in sorted(sizes):
+        if rel not in referenced and is_core_candidate(rel):
+            take(core, rel)
+
+    by_module = {}
+    for source, module in page_modules.items():
+        if module != ROOT_MODULE:
+            by_module.setdefault(module, set()).add(source)
+
+    modules = {}
+    for module in sorted(by_module):
+        groups = []
+        group = None
+        for source in reading_order(sidebar, module, by_module[module]):
+            weight = report.pages[source]
+            files = [rel for rel in [weight.file] + weight.chunks + weight.refs if rel not in assigned]
+            size = sum(sizes[rel] for rel in files)
+            if group is None or (group.pages and group.bytes + size > group_bytes):
+                group = PrecacheGroup(f'{module}-{len(groups) + 1}', module)
+                groups.append(group)
+            group.pages.append(weight.file)
+            for rel in files:
+                take(group, rel)
+        modules[module] = groups
+
+    excluded = sorted(rel for rel in sizes if rel not in assigned)
+    return core, modules, excluded
+
+
+def group_entries(group, base, hashes):
+    entries = []
+    for rel in sorted(group.files):
+        revision = None if is_hashed_asset(rel) else hashes[rel][:REVISION_LENGTH]
+        entries.append({'url': base + rel, 'revision': revision})
+    return entries
+
+
+def group_summary(group, base, entries):
+    return {
+        'id': group.id,
+        'file': f'{group.id}.json',
+        'hash': content_hash(json.dumps(entries, sort_keys=True))[:REVISION_LENGTH],
+        'bytes': group.bytes,
+        'files': len(entries),
+        'pages': [base + rel for rel in group.pages],
+    }
+
+
+def build_precache(root='.', dist=None, group_kb=DEFAULT_GROUP_KB, jobs=None):
+    """生成预缓存清单，返回 (manifest, 读取的文件数, 未纳入的文件列表, 文件大小)"""
+    dist_dir = os.path.join(root, dist or DIST_DIR)
+    out = os.path.join(dist_dir, PRECACHE_DIR)
+    report = analyze_dist(root, dist)
+    corpus = load_corpus(root)
+    try:
+        sidebar = load_sidebar(root)
+    except (OSError, SidebarSyntaxError):
+        sidebar = None
+    base = site_base(root)
+
+    prefix = PRECACHE_DIR + '/'
+    report.sizes = {rel: size for rel, size in report.sizes.items() if not rel.startswith(prefix)}
+    core, modules, excluded = plan_groups(report, sidebar, group_kb * 1024)
+
+    wanted = set(core.files)
+    for groups in modules.values():
+        for group in groups:
+            wanted.update(group.files)
+    state_file = cache_path(root, STATE_FILE)
+    state = load_json(state_file, {})
+    previous = state.get('files', {}) if state.get('v') == PRECACHE_VERSION else {}
+    entries = [(rel, st) for rel, st in iter_dist_files(dist_dir) if rel in wanted]
+    current, hashed, _ = scan_dist(dist_dir, previous, jobs, entries)
+    hashes = {rel: entry[2] for rel, entry in current.items()}
+    save_json(state_file, {'v': PRECACHE_VERSION, 'files': current})
+
+    written = set()
+
+    def write_group(group):
+        group_data = group_entries(group, base, hashes)
+        save_json(os.path.join(out, f'{group.id}.json'),
+                  {'v': PRECACHE_VERSION, 'id': group.id, 'entries': group_data})
+        written.add(f'{group.id}.json')
+        return group_summary(group, base, group_data)
+
+    manifest = {'v': PRECACHE_VERSION, 'base': base, 'core': write_group(core), 'modules': {}}
+    for module, groups in modules.items():
+        index = corpus.get(f'{module}/index.md')
+        manifest['modules'][module] = {
+            'title': index.title if index and index.title else module,
+            'bytes': sum(g.bytes for g in groups),
+            'groups': [write_group(g) for g in groups],
+        }
+    save_json(os.path.join(out, 'manifest.json'), manifest)
+    written.add('manifest.json')
+
+    for name in os.listdir(out):
+        if name.endswith('.json') and name not in written:
+            os.unlink(os.path.join(out, name))
+    return manifest, hashed, excluded, report.sizes
+
+
+def _kb(n):
+    return f'{n / 1024:,.1f} KB'
+
+
+def cmd_precache_manifest(args):
+    """生成离线预缓存清单"""
+    dist = args.dist or DIST_DIR
+    if not os.path.isdir(os.path.join(args.root, dist)):
+        print(f"❌ 错误: 构建目录不存在: {dist}（请先运行 pnpm docs:build）")
+        return 2
+    print("=== 生成离线预缓存清单 ===\n")
+    manifest, hashed, excluded, sizes = build_precache(args.root, dist, args.group_kb, args.jobs)
+
+    core = manifest['core']
+    total = core['bytes'] + sum(m['bytes'] for m in manifest['modules'].values())
+    print(f"🔍 {len(sizes)} 个文件，读取 {hashed} 个（其余复用上次的哈希）\n")
+    print(f"  📦 {CORE_GROUP:<14}{core['files']:>6} 个文件{_kb(core['bytes']):>14}  共享资源与首页")
+    for module, entry in manifest['modules'].items():
+        groups = entry['groups']
+        pages = sum(len(g['pages']) for g in groups)
+        print(f"  📚 {module:<14}{sum(g['files'] for g in groups):>6} 个文件{_kb(entry['bytes']):>14}"
+              f"  {pages} 页，{len(groups)} 组  {entry['title']}")
+        if args.verbose:
+            for g in groups:
+                print(f"       {g['id']:<16}{len(g['pages']):>4} 页{_kb(g['bytes']):>14}  {g['hash']}")
+
+    if manifest['modules']:
+        largest = max(manifest['modules'].items(), key=lambda item: item[1]['bytes'])
+        print(f"\n📥 全部预缓存 {_kb(total)}；单个模块最多 {_kb(core['bytes'] + largest[1]['bytes'])}"
+              f"（core + {largest[0]}）")
+    if excluded:
+        print(f"⏭️  未纳入预缓存: {len(excluded)} 个文件, {_kb(sum(sizes[rel] for rel in excluded))}"
+              f"（搜索索引、sitemap 等）")
+    print(f"📁 {dist}/{PRECACHE_DIR}/manifest.json")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('precache-manifest',
+                              help='按侧边栏阅读顺序把构建产物分组，生成可按模块预取的 Service Worker 预缓存清单')
+    p.add_argument('--dist', help=f'构建目录（默认 {DIST_DIR}）')
+    p.add_argument('--group-kb', type=int, default=DEFAULT_GROUP_KB,
+                   help=f'每个分组的目标大小，单位 KB（默认 {DEFAULT_GROUP_KB}）')
+    p.add_argument('--jobs', type=int, help='哈希线程数（默认 CPU 核数的 2 倍）')
+    p.add_argument('-v', '--verbose', action='store_true', help='列出每个模块的分组')
+    p.set_defaults(func=cmd_precache_manifest)
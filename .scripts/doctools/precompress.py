@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+预压缩 - 构建后为 dist/ 中可压缩的文件生成 .gz（安装了 brotli 模块时同时生成 .br）
+
+静态服务器（如 nginx 的 gzip_static / brotli_static）直接返回预压缩文件，不再每次请求时压缩，
+也不会把大页面和本地搜索索引原样发出。
+
+    bash .scripts/doc-tools.sh precompress
+
+压缩在进程池中并行执行。文件状态复用 deploy-manifest 的扫描逻辑（大小与修改时间未变、或带内容
+哈希的资源文件不重新读取），内容哈希与上次相同且压缩文件仍在时跳过；结果记录在
+.cache/doctools/precompress.json，跳过的文件同样计入按类型统计的压缩率。
+压缩后不比原文件小的不生成压缩文件；源文件已删除的压缩文件会被清理。
+
+GitHub Pages 会自行压缩响应，部署到 Pages 时不需要这一步。
+"""
+
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .common import DIST_DIR, cache_path, load_json, save_json, write_bytes_atomic
+from .deploy import iter_dist_files, scan_dist
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖（pip install brotli）
+    brotli = None
+
+STATE_VERSION = 1
+STATE_FILE = 'precompress.json'
+
+COMPRESSIBLE = ('.html', '.js', '.mjs', '.css', '.json', '.svg', '.xml', '.txt', '.map', '.webmanifest', '.wasm')
+SUFFIXES = ('.gz', '.br')
+DEFAULT_MIN_BYTES = 1024
+DEFAULT_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# 少于该数量时直接在当前进程压缩，避免进程池启动开销
+POOL_THRESHOLD = 16
+
+
+def compress_file(path, level=DEFAULT_LEVEL, use_brotli=True):
+    """压缩单个文件，返回 (gzip 大小, brotli 大小)；压缩后不更小的记为 None 且删除旧的压缩文件"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    st = os.stat(path)
+    outputs = [('.gz', gzip.compress(data, compresslevel=level, mtime=0))]
+    if use_brotli and brotli is not None:
+        outputs.append(('.br', brotli.compress(data, quality=BROTLI_QUALITY)))
+    sizes = {}
+    for suffix, packed in outputs:
+        target = path + suffix
+        if len(packed) >= len(data):
+            if os.path.exists(target):
+                os.unlink(target)
+            sizes[suffix] = None
+            continue
+        write_bytes_atomic(target, packed)
+        # 与源文件保持相同的修改时间，便于服务器按 Last-Modified 协商缓存
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+        sizes[suffix] = len(packed)
+    return sizes['.gz'], sizes.get('.br')
+
+
+def _compress_batch(batch):
+    """进程池任务：压缩一批 (相对路径, 绝对路径, 级别, 是否生成 brotli)"""
+    return [(rel, compress_file(path, level, use_br)) for rel, path, level, use_br in batch]
+
+
+def is_compressible(rel, size, min_bytes=DEFAULT_MIN_BYTES):
+    return rel.endswith(COMPRESSIBLE) and size >= min_bytes
+
+
+def precompress(root='.', dist=None, jobs=None, level=DEFAULT_LEVEL, min_bytes=DEFAULT_MIN_BYTES,
+                use_brotli=True, force=False):
+    """预压缩构建目录，返回 ({路径: [原大小, gzip 大小, brotli 大小]}, 本次压缩数, 清理的压缩文件数)
+
+    大小为 None 表示压缩后不更小、没有生成对应的压缩文件。
+    """
+    dist = os.path.join(root, dist or DIST_DIR)
+    use_brotli = use_brotli and brotli is not None
+    state_file = cache_path(root, STATE_FILE)
+    state = load_json(state_file, {})
+    signature = f'v{STATE_VERSION}/l{level}/b{BROTLI_QUALITY if use_brotli else 0}'
+    previous = state.get('files', {}) if state.get('sig') == signature and not force else {}
+
+    sources = []
+    removed = 0
+    for rel, st in iter_dist_files(dist):
+        if rel.endswith(SUFFIXES):
+            source = rel[:-3]
+            if not os.path.exists(os.path.join(dist, source)):
+                os.unlink(os.path.join(dist, rel))
+                removed += 1
+            continue
+        if is_compressible(rel, st.st_size, min_bytes):
+            sources.append((rel, st))
+
+    known = {rel: entry[:3] for rel, entry in previous.items()}
+    current, _, _ = scan_dist(dist, known, jobs, sources)
+
+    results = {}
+    work = []
+    for rel, (size, mtime, digest) in current.items():
+        old = previous.get(rel)
+        if old is not None and old[2] == digest and _outputs_present(dist, rel, old, use_brotli):
+            results[rel] = [size, mtime, digest] + old[3:]
+            continue
+        work.append((rel, os.path.join(dist, rel), level, use_brotli))
+
+    if len(work) < POOL_THRESHOLD or jobs == 1:
+        compressed = _compress_batch(work)
+    else:
+        jobs = jobs or os.cpu_count() or 1
+        size = max(4, len(work) // (jobs * 4))
+        batches = [work[i:i + size] for i in range(0, len(work), size)]
+        compressed = []
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for batch_result in pool.map(_compress_batch, batches):
+                compressed.extend(batch_result)
+    for rel, (gz, br) in compressed:
+        results[rel] = current[rel] + [gz, br]
+
+    save_json(state_file, {'sig': signature, 'files': {rel: results[rel] for rel in sorted(results)}})
+    return {rel: [entry[0]] + entry[3:] for rel, entry in results.items()}, len(work), removed
+
+
+def _outputs_present(dist, rel, entry, use_brotli):
+    """上次生成的压缩文件是否都还在（压缩后不更小、本就没有生成的不算缺失）"""
+    expected = [('.gz', entry[3])] + ([('.br', entry[4])] if use_brotli else [])
+    return all(size is None or os.path.exists(os.path.join(dist, rel + suffix)) for suffix, size in expected)
+
+
+def _ratio(packed, raw):
+    return f'{packed / raw * 100:.1f}%' if raw else '-'
+
+
+def cmd_precompress(args):
+    """预压缩构建产物"""
+    dist = args.dist or DIST_DIR
+    if not os.path.isdir(os.path.join(args.root, dist)):
+        print(f"❌ 错误: 构建目录不存在: {dist}（请先运行 pnpm docs:build）")
+        return 2
+    print("=== 预压缩构建产物 ===\n")
+    files, compressed, removed = precompress(args.root, dist, args.jobs, args.level, args.min_bytes,
+                                             not args.no_brotli, args.force)
+    use_brotli = brotli is not None and not args.no_brotli
+
+    stats = {}
+    for rel, (raw, gz, br) in files.items():
+        ext = os.path.splitext(rel)[1] or rel
+        entry = stats.setdefault(ext, [0, 0, 0, 0])
+        entry[0] += 1
+        entry[1] += raw
+        entry[2] += gz if gz is not None else raw
+        entry[3] += br if br is not None else raw
+
+    print(f"🔍 {len(files)} 个可压缩文件，本次压缩 {compressed} 个（其余内容未变）"
+          + (f"，清理 {removed} 个过期压缩文件" if removed else "") + "\n")
+    header = f"  {'类型':<12}{'文件数':>8}{'原始':>14}{'gzip':>14}{'比例':>8}"
+    if use_brotli:
+        header += f"{'brotli':>14}{'比例':>8}"
+    print(header)
+    totals = [0, 0, 0, 0]
+    for ext in sorted(stats, key=lambda e: -stats[e][1]):
+        count, raw, gz, br = stats[ext]
+        line = f"  {ext:<12}{count:>10}{raw:>14,}{gz:>14,}{_ratio(gz, raw):>9}"
+        if use_brotli:
+            line += f"{br:>14,}{_ratio(br, raw):>9}"
+        print(line)
+        for i, value in enumerate(stats[ext]):
+            totals[i] += value
+    count, raw, gz, br = totals
+    print(f"\n📦 共 {raw:,} 字节 → gzip {gz:,} 字节（{_ratio(gz, raw)}）"
+          + (f"，brotli {br:,} 字节（{_ratio(br, raw)}）" if use_brotli else ""))
+    if brotli is None and not args.no_brotli:
+        print("\n💡 未安装 brotli 模块，只生成 .gz（pip install brotli）")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('precompress', help='并行为构建产物生成 .gz / .br 预压缩文件（内容未变的跳过）')
+    p.add_argument('--dist', help=f'构建目录（默认 {DIST_DIR}）')
+    p.add_argument('--jobs', type=int, help='进程数（默认 CPU 核数）')
+    p.add_argument('--level', type=int, default=DEFAULT_LEVEL, help=f'gzip 压缩级别（默认 {DEFAULT_LEVEL}）')
+    p.add_argument('--min-bytes', type=int, default=DEFAULT_MIN_BYTES,
+                   help=f'小于该字节数的文件不压缩（默认 {DEFAULT_MIN_BYTES}）')
+    p.add_argument('--no-brotli', action='store_true', help='即使安装了 brotli 也只生成 .gz')
+    p.add_argument('--force', action='store_true', help='忽略上次的记录，重新压缩所有文件')
+    p.set_defaults(func=cmd_precompress)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+索引查询 - 基于持久化语料索引回答常见问题，无需 grep 全量扫描 docs/
+
+    query heading Redis              标题包含 Redis 的位置
+    query anchor rag-检索增强         锚点在哪些页面定义
+    query backlinks /ai/chapter-04   哪些页面链接到该页面（可带 #锚点 只看指向该锚点的链接）
+    query sidebar ai/chapter-04      页面在侧边栏中的位置与上一篇/下一篇
+
+页面参数可以是站点链接（/ai/chapter-04）、docs 相对路径（ai/chapter-04.md）或
+项目相对路径（docs/ai/chapter-04.md）。加 --json 输出结构化结果，便于编辑器集成。
+"""
+
+import json
+
+from .common import DOCS_DIR, page_url, url_to_page
+from .corpus import load_corpus
+from .sidebar import SidebarSyntaxError, load_sidebar
+
+
+def normalize_page(arg):
+    """把命令行中的页面参数统一为 (docs 相对路径, 锚点)"""
+    path, _, anchor = arg.partition('#')
+    if path.startswith(DOCS_DIR + '/'):
+        path = path[len(DOCS_DIR) + 1:]
+    if not path.endswith('.md'):
+        path = url_to_page('/' + path.lstrip('/'))
+    return path.lstrip('/'), anchor or None
+
+
+def find_headings(corpus, text, module=None, level=None):
+    """标题文本包含 text（不区分大小写）的标题"""
+    needle = text.lower()
+    return [{'file': f'{DOCS_DIR}/{path}', 'line': h.line, 'level': h.level,
+             'title': h.title, 'anchor': h.anchor, 'url': f'{page_url(path)}#{h.anchor}'}
+            for path, h in corpus.find_headings(lambda title: needle in title.lower(), module, level)]
+
+
+def find_anchor(corpus, anchor, page=None):
+    """定义了该锚点的标题"""
+    return [{'file': f'{DOCS_DIR}/{path}', 'line': h.line, 'level': h.level,
+             'title': h.title, 'anchor': h.anchor}
+            for path, h in corpus.find_anchor(anchor, page)]
+
+
+def find_backlinks(corpus, page, anchor=None):
+    """链接到该页面（或该页面某个锚点）的位置"""
+    return [{'file': f'{DOCS_DIR}/{source}', 'line': link.line,
+             'text': link.text, 'target': link.target, 'anchor': link_anchor}
+            for source, link, link_anchor in corpus.links_to(page, anchor)]
+
+
+def sidebar_placement(sidebar, page):
+    """页面在侧边栏中出现的位置：分组路径、条目文本以及同模块内的上一篇/下一篇"""
+    result = []
+    for prefix in sidebar.modules:
+        pages = []
+        for item in sidebar.links(prefix):
+            if item.anchor is None and item.page not in pages:
+                pages.append(item.page)
+        for item in sidebar.walk(prefix):
+            if item.page != page:
+                continue
+            trail = []
+            parent = item.parent
+            while parent is not None:
+                trail.insert(0, parent.text)
+                parent = parent.parent
+            entry = {'module': prefix, 'text': item.text, 'link': item.link, 'groups': trail,
+                     'line': sidebar.line_of(item.node.start), 'prev': None, 'next': None}
+            if item.anchor is None and page in pages:
+                i = pages.index(page)
+                entry['prev'] = pages[i - 1] if i > 0 else None
+                entry['next'] = pages[i + 1] if i + 1 < len(pages) else None
+            result.append(entry)
+    return result
+
+
+def cmd_query(args):
+    """查询语料索引"""
+    corpus = load_corpus(args.root)
+    kind = args.kind
+
+    if kind == 'heading':
+        result = find_headings(corpus, args.term, args.module, args.level)
+    elif kind == 'anchor':
+        page = normalize_page(args.page)[0] if args.page else None
+        result = find_anchor(corpus, args.term, page)
+    elif kind == 'backlinks':
+        page, anchor = normalize_page(args.term)
+        if page not in corpus:
+            print(json.dumps([]) if args.json else f"❌ 页面不存在: {DOCS_DIR}/{page}")
+            return 1
+        result = find_backlinks(corpus, page, anchor)
+    else:
+        page = normalize_page(args.term)[0]
+        try:
+            result = sidebar_placement(load_sidebar(args.root), page)
+        except (OSError, SidebarSyntaxError) as e:
+            print(f"❌ 错误: 无法解析 sidebar.ts: {e}")
+            return 2
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return 0 if result else 1
+
+    if not result:
+        print("⚠️  没有找到匹配结果")
+        return 1
+    for r in result:
+        if kind in ('heading', 'anchor'):
+            print(f"{r['file']}:{r['line']}  {'#' * r['level']} {r['title']}  {{#{r['anchor']}}}")
+        elif kind == 'backlinks':
+            print(f"{r['file']}:{r['line']}  [{r['text']}]({r['target']})")
+        else:
+            print(f"{r['module']}  {' > '.join(r['groups'] + [r['text']])}")
+            print(f"    sidebar.ts:{r['line']}  {r['link']}")
+            if r['prev'] or r['next']:
+                print(f"    ← {r['prev'] or '-'}    → {r['next'] or '-'}")
+    print(f"\n💡 共 {len(result)} 条结果")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('query', help='查询标题、锚点定义、反向链接与侧边栏位置')
+    p.add_argument('kind', choices=['heading', 'anchor', 'backlinks', 'sidebar'], help='查询类型')
+    p.add_argument('term', help='标题关键词、锚点或页面')
+    p.add_argument('--module', help='heading：只查询指定模块')
+    p.add_argument('--level', type=int, help='heading：只查询指定级别的标题')
+    p.add_argument('--page', help='anchor：只查询指定页面')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出')
+    p.set_defaults(func=cmd_query)
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+面试题库 - 从 docs/interview/ 的问答小节中提取结构化题目，按方向输出 JSON 分片供刷题组件懒加载
+
+题目识别（interview/ 下，各级 index.md 除外）：
+    - 级别 ≥ 2 的标题，以问号结尾、以 Q12: / 问题3： 编号开头、或包含「什么 / 如何 / 为什么 / 区别 / 原理」
+      等疑问词时视为问题；只有 1. / 2、这类章节编号的标题不算。答案为该标题到下一个同级或更高级标题之间的内容
+    - 独占一段的加粗问题 **Q1: 什么是 CAP 理论？** / **Q: key 的作用是什么？**，答案到下一个加粗问题或
+      下一个标题为止，开头的 **A:** 会被去掉；锚点为所在小节的标题
+    - 含有问题子标题或加粗问题的标题是分组而不是问题
+
+每道题记录：
+
+    {"id": "…", "q": "路由模式有哪些？", "level": "intermediate", "sub": "vue3",
+     "group": "Vue Router", "page": "/interview/frontend/vue3/intermediate/routing-state", "anchor": "路由模式有哪些",
+     "a": "答案摘要（纯文本，不含代码）", "code": 1, "hash": "…",
+     "also": [["advanced", "/interview/frontend/vue3/advanced/…", "锚点"]]}
+
+id 由页面、锚点（加粗问题再加上问题文本）决定（答案修改后不变，便于记录做题进度），hash 为问题与答案原文的内容哈希。
+同一方向内不同页面的问题规范化后相似度达到 DUP_THRESHOLD 时视为重复，只保留一条
+（中级优先），其余位置记入 also。
+
+输出 docs/public/quiz/<方向>.json 与 manifest.json；分片签名由其包含的页面内容哈希决定，
+只有源页面变化的方向才会重建。部署时在 docs:build 之前生成，由 InterviewQuiz 组件
+（docs/.vitepress/components/InterviewQuiz.vue，加载逻辑见 theme/quizShards.ts）按方向懒加载。
+"""
+
+import re
+from difflib import SequenceMatcher
+
+from .common import PUBLIC_DIR, cache_path, content_hash, load_json, page_url, save_json
+from .corpus import load_corpus
+from .text import strip_inline
+
+BANK_VERSION = 2
+QUIZ_DIR = PUBLIC_DIR + '/quiz'
+STATE_FILE = 'question-bank-state.json'
+INTERVIEW_PREFIX = 'interview/'
+
+LEVELS = ('intermediate', 'advanced')
+GENERAL_LEVEL = 'general'
+ANSWER_CHARS = 300
+DUP_THRESHOLD = 0.85
+
+_QUESTION = re.compile(r'(?:[?？]\s*$|^(?:Q|问题)\s*\d+\s*[:：.]'
+                       r'|什么|如何|怎么|怎样|为什么|为何|区别|原理|哪些|是否|能否|对比|\bvs\b)', re.I)
+_NUMBER_PREFIX = re.compile(r'^(?:(?:Q|问题)\s*\d+\s*[:：.]|\d+\s*[.、])\s*', re.I)
+_NORMALIZE = re.compile(r'[\s\W_]+', re.U)
+_LIST_MARKER = re.compile(r'^\s*(?:(?:[-*+]|\d+[.)])\s+|>\s*|\|\s*)')
+# 独占一段的加粗问题：**Q1: …** / **Q: …**
+_BOLD_QUESTION = re.compile(r'^\*\*Q\d*\s*[:：]\s*(.+?)\*\*\s*$')
+_ANSWER_PREFIX = re.compile(r'^A\s*[:：]\s*')
+
+
+def question_text(title):
+    """去掉行内标记与 Q1: / 问题1： / 1. 编号"""
+    return _NUMBER_PREFIX.sub('', strip_inline(title)).strip()
+
+
+def is_question(title):
+    return bool(_QUESTION.search(strip_inline(title)))
+
+
+def page_level(path):
+    """页面所属难度与子方向，如 interview/frontend/vue3/intermediate/x.md -> ('intermediate', 'vue3')"""
+    parts = path.split('/')[2:-1]
+    level = next((p for p in parts if p in LEVELS), GENERAL_LEVEL)
+    sub = next((p for p in parts if p not in LEVELS), '')
+    return level, sub
+
+
+def answer_summary(lines):
+    """答案的纯文本摘要：去掉列表 / 引用 / 表格标记与行内标记，压缩空白"""
+    parts = []
+    size = 0
+    for line in lines:
+        if line.lstrip().startswith('#'):
+            line = line.lstrip('#')
+        text = strip_inline(_LIST_MARKER.sub('', line)).replace('|', ' ').strip()
+        if not parts:
+            text = _ANSWER_PREFIX.sub('', text)
+        if not text or set(text) <= set('-: '):
+            continue
+        parts.append(text)
+        size += len(text) + 1
+        if size > ANSWER_CHARS:
+            break
+    summary = ' '.join(parts)
+    return summary if len(summary) <= ANSWER_CHARS else summary[:ANSWER_CHARS].rstrip() + '…'
+
+
+def _record(page, level, sub, url, key, question, group, anchor, body, raw, code):
+    return {
+        'id': content_hash(f'{page.path}#{key}')[:12],
+        'q': question,
+        'level': level,
+        'sub': sub,
+        'group': group,
+        'page': url,
+        'anchor': anchor,
+        'a': answer_summary(body),
+        'code': code,
+        'hash': content_hash(raw),
+        'also': [],
+    }
+
+
+def extract_questions(page, text):
+    """提取单个页面的题目记录（按在页面中出现的顺序）"""
+    lines = text.split('\n')
+    skip = set()
+    for fence in page.fences:
+        skip.update(range(fence.line, fence.end + 1))
+    headings = [h for h in page.headings if h.level >= 2]
+    heading_lines = {h.line for h in page.headings}
+    bold = {}
+    for n, line in enumerate(lines, 1):
+        match = None if n in skip else _BOLD_QUESTION.match(line.strip())
+        if match:
+            bold[n] = match.group(1)
+    level, sub = page_level(page.path)
+    url = page_url(page.path)
+
+    def code_blocks(start, end):
+        return sum(1 for fence in page.fences if start < fence.line < end)
+
+    def body_lines(start, end):
+        return [lines[n - 1] for n in range(start, end) if n not in skip]
+
+    records = []
+    stack = []
+    for i, h in enumerate(headings):
+        while stack and stack[-1].level >= h.level:
+            stack.pop()
+        parent = stack[-1] if stack else None
+        stack.append(h)
+        end = len(lines) + 1
+        has_child_question = False
+        for nxt in headings[i + 1:]:
+            if nxt.level <= h.level:
+                end = nxt.line
+                break
+            has_child_question = has_child_question or is_question(nxt.title)
+        has_child_question = has_child_question or any(h.line < n < end for n in bold)
+        if not is_question(h.title) or has_child_question:
+            continue
+        raw = '\n'.join(lines[h.line - 1:end - 1]).strip()
+        records.append((h.line, _record(page, level, sub, url, h.anchor, question_text(h.title),
+                                        question_text(parent.title) if parent else '', h.anchor,
+                                        body_lines(h.line + 1, end), raw, code_blocks(h.line, end))))
+
+    # 加粗问题：答案到下一个加粗问题或下一个标题为止
+    boundaries = sorted(set(bold) | heading_lines) + [len(lines) + 1]
+    for n, title in bold.items():
+        end = next(b for b in boundaries if b > n)
+        section = next((h for h in reversed(headings) if h.line < n), None)
+        anchor = section.anchor if section else ''
+        question = question_text(title)
+        raw = '\n'.join(lines[n - 1:end - 1]).strip()
+        records.append((n, _record(page, level, sub, url, f'{anchor}:{question}', question,
+                                   question_text(section.title) if section else '', anchor,
+                                   body_lines(n + 1, end), raw, code_blocks(n, end))))
+    return [record for _, record in sorted(records, key=lambda item: item[0])]
+
+
+def _normalized(question):
+    return _NORMALIZE.sub('', question).lower()
+
+
+def deduplicate(records):
+    """合并同一方向内不同页面的相近问题，返回保留的记录（顺序不变）"""
+    order = {level: i for i, level in enumerate(LEVELS + (GENERAL_LEVEL,))}
+    ranked = sorted(range(len(records)), key=lambda i: (order[records[i]['level']], i))
+    kept = []
+    keys = []
+    dropped = set()
+    for i in ranked:
+        record = records[i]
+        key = _normalized(record['q'])
+        for j, other_key in zip(kept, keys):
+            other = records[j]
+            if other['page'] == record['page']:
+                continue
+            matcher = SequenceMatcher(None, key, other_key, autojunk=False)
+            if key == other_key or (matcher.real_quick_ratio() >= DUP_THRESHOLD and
+                                    matcher.quick_ratio() >= DUP_THRESHOLD and matcher.ratio() >= DUP_THRESHOLD):
+                other['also'].append([record['level'], record['page'], record['anchor']])
+                dropped.add(i)
+                break
+        else:
+            kept.append(i)
+            keys.append(key)
+    return [r for i, r in enumerate(records) if i not in dropped]
+
+
+def topic_pages(corpus):
+    """{方向: [页面]}，方向为 interview/ 下的一级目录；各级 index.md 不参与"""
+    topics = {}
+    for page in corpus:
+        parts = page.path.split('/')
+        if page.path.startswith(INTERVIEW_PREFIX) and len(parts) > 2 and parts[-1] != 'index.md':
+            topics.setdefault(parts[1], []).append(page.path)
+    return topics
+
+
+def build_shard(corpus, topic, paths):
+    records = []
+    for path in paths:
+        records.extend(extract_questions(corpus.get(path), corpus.read_text(path)))
+    questions = deduplicate(records)
+    return {'v': BANK_VERSION, 'topic': topic, 'questions': questions}, len(records) - len(questions)
+
+
+def shard_signature(corpus, paths):
+    parts = [f'v{BANK_VERSION}/a{ANSWER_CHARS}/d{DUP_THRESHOLD}']
+    parts.extend(f'{p}:{corpus.get(p).hash}' for p in paths)
+    return content_hash('\n'.join(parts))
+
+
+def build_question_bank(root='.', out_dir=None, force=False):
+    """构建所有方向的题库分片，返回 {方向: (是否重建, 题目数, 合并的重复题数, 字节数)}"""
+    corpus = load_corpus(root)
+    out = corpus.root / (out_dir or QUIZ_DIR)
+    state_file = cache_path(corpus.root, STATE_FILE)
+    state = load_json(state_file, {})
+    manifest = {'v': BANK_VERSION, 'shards': {}}
+    report = {}
+
+    for topic, paths in sorted(topic_pages(corpus).items()):
+        signature = shard_signature(corpus, paths)
+        shard_file = out / f'{topic}.json'
+        cached = state.get(topic)
+        if not force and cached and cached['sig'] == signature and shard_file.exists():
+            report[topic] = (False, cached['questions'], cached['dupes'], cached['bytes'])
+        else:
+            shard, dupes = build_shard(corpus, topic, paths)
+            size = save_json(shard_file, shard)
+            levels = {}
+            for q in shard['questions']:
+                levels[q['level']] = levels.get(q['level'], 0) + 1
+            cached = {'sig': signature, 'questions': len(shard['questions']), 'dupes': dupes,
+                      'bytes': size, 'levels': levels}
+            state[topic] = cached
+            report[topic] = (True, cached['questions'], dupes, size)
+        manifest['shards'][topic] = {
+            'file': f'{topic}.json',
+            'hash': signature[:10],
+            'questions': cached['questions'],
+            'levels': cached['levels'],
+        }
+
+    for topic in list(state):
+        if topic not in manifest['shards']:
+            del state[topic]
+            stale = out / f'{topic}.json'
+            if stale.exists():
+                stale.unlink()
+
+    save_json(out / 'manifest.json', manifest)
+    save_json(state_file, state)
+    return report
+
+
+def cmd_question_bank(args):
+    """构建面试题库分片"""
+    print("=== 构建面试题库 ===\n")
+    report = build_question_bank(args.root, args.out, args.force)
+    total = dupes_total = size_total = 0
+    for topic, (rebuilt, questions, dupes, size) in report.items():
+        flag = '🔨 重建' if rebuilt else '✅ 未变化'
+        print(f"  {flag} [{topic}] {questions} 道题（合并重复 {dupes} 道）, {size / 1024:.1f} KB")
+        total += questions
+        dupes_total += dupes
+        size_total += size
+    print(f"\n共 {len(report)} 个方向, {total} 道题（合并重复 {dupes_total} 道）, {size_total / 1024:.1f} KB")
+    print(f"📁 {args.out or QUIZ_DIR}/")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('question-bank', help='从 docs/interview 提取结构化面试题，按方向输出 JSON 分片')
+    p.add_argument('--out', help=f'输出目录（默认 {QUIZ_DIR}）')
+    p.add_argument('--force', action='store_true', help='忽略缓存，重建所有分片')
+    p.set_defaults(func=cmd_question_bank)
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+相关页面 - 基于 TF-IDF 余弦相似度为每个页面预计算 top-k 相关页面，供主题展示"相关阅读"
+
+每个页面的正文（不含代码块与 front matter）按 text.tokenize 分词（CJK 二元组 + 拉丁词），
+标题词项加权，词频取 1 + ln(tf)，乘以平滑 IDF 后做 L2 归一化，得到稀疏向量。
+词表只保留出现在至少 2 个页面、且不超过一半页面中的词项，最多 MAX_FEATURES 个。
+
+相似度只对需要的行计算 X @ x：安装了 NumPy 时把所有向量拼成 CSR 稀疏矩阵（indptr / indices /
+data），每行用一次向量化的乘加和 bincount 完成，耗时与非零元素数成正比；否则退回基于倒排表的
+稀疏累加，两种方式的结果在浮点误差内一致。部署工作流不安装 NumPy，CI 中总是使用纯 Python 实现。
+
+增量更新：词表和 IDF 在全量构建时确定并缓存，之后只为变化的页面重新计算向量和整行相似度；
+相似度矩阵是对称的，这些行同时给出了其他页面与变化页面之间的新分数，未变化页面只需把它们
+合并进缓存的候选列表。候选不足时重新计算对应的行，变化页面超过 REBUILD_RATIO 时全量重建。
+
+输出 docs/.vitepress/data/related.json，每个页面一行：[链接, 标题, [相关页面下标...]]
+"""
+
+import json
+import math
+
+from .common import VITEPRESS_DIR, cache_path, load_json, page_url, save_json, write_text_atomic
+from .corpus import load_corpus
+from .text import strip_inline, tokenize
+
+try:
+    import numpy
+except ImportError:  # 没有 NumPy 时使用纯 Python 的稀疏实现
+    numpy = None
+
+RELATED_VERSION = 1
+RELATED_FILE = VITEPRESS_DIR + '/data/related.json'
+STATE_FILE = 'related-state.json'
+
+DEFAULT_TOP_K = 5
+TITLE_BOOST = 3
+MIN_DF = 2
+MAX_DF_RATIO = 0.5
+MAX_FEATURES = 20000
+MIN_SCORE = 0.05
+# 缓存的候选数量（top-k 的倍数），变化页面挤出 top-k 时用于补位
+CANDIDATE_FACTOR = 3
+# 变化页面超过该比例时全量重建（重新确定词表和 IDF）
+REBUILD_RATIO = 0.25
+
+
+def page_terms(page, text):
+    """统计页面词频：正文词项计 1，标题词项计 TITLE_BOOST"""
+    lines = text.split('\n')
+    skip = set()
+    for fence in page.fences:
+        skip.update(range(fence.line - 1, fence.end))
+    if page.frontmatter:
+        skip.update(range(page.frontmatter[0] - 1, page.frontmatter[1]))
+    counts = {}
+    for i, line in enumerate(lines):
+        if i not in skip and line.strip():
+            for term in tokenize(strip_inline(line)):
+                counts[term] = counts.get(term, 0) + 1
+    for h in page.headings:
+        for term in tokenize(strip_inline(h.title)):
+            counts[term] = counts.get(term, 0) + TITLE_BOOST
+    return counts
+
+
+def build_vocabulary(term_counts):
+    """根据所有页面的词频确定词表与 IDF，返回 (词项列表, IDF 列表)"""
+    n = len(term_counts)
+    df = {}
+    for counts in term_counts.values():
+        for term in counts:
+            df[term] = df.get(term, 0) + 1
+    limit = max(MIN_DF, int(n * MAX_DF_RATIO))
+    kept = [t for t, d in df.items() if MIN_DF <= d <= limit]
+    kept.sort(key=lambda t: (-df[t], t))
+    vocab = sorted(kept[:MAX_FEATURES])
+    idf = [math.log((1 + n) / (1 + df[t])) + 1 for t in vocab]
+    return vocab, idf
+
+
+def vectorize(counts, index, idf):
+    """词频 → L2 归一化的稀疏 TF-IDF 向量 ([词表下标], [权重])"""
+    pairs = []
+    for term, tf in counts.items():
+        i = index.get(term)
+        if i is not None:
+            pairs.append((i, (1 + math.log(tf)) * idf[i]))
+    pairs.sort()
+    norm = math.sqrt(sum(w * w for _, w in pairs)) or 1.0
+    return [i for i, _ in pairs], [round(w / norm, 6) for _, w in pairs]
+
+
+def similarity_rows(vectors, rows, size):
+    """计算 rows 中每个页面与所有页面的余弦相似度，返回与 rows 对应的分数列表
+
+    vectors 为按页面顺序排列的稀疏向量，size 为词表大小。
+    """
+    if not rows:
+        return []
+    if numpy is not None:
+        lengths = numpy.array([len(idx) for idx, _ in vectors], dtype=numpy.int64)
+        indices = numpy.fromiter((i for idx, _ in vectors for i in idx), dtype=numpy.int64, count=int(lengths.sum()))
+        data = numpy.fromiter((w for _, ws in vectors for w in ws), dtype=numpy.float64, count=len(indices))
+        owners = numpy.repeat(numpy.arange(len(vectors)), lengths)
+        query = numpy.zeros(size, dtype=numpy.float64)
+        result = []
+        for row in rows:
+            idx, weights = vectors[row]
+            query[idx] = weights
+            result.append(numpy.bincount(owners, weights=data * query[indices], minlength=len(vectors)).tolist())
+            query[idx] = 0.0
+        return result
+    postings = {}
+    for r, (idx, weights) in enumerate(vectors):
+        for i, w in zip(idx, weights):
+            postings.setdefault(i, []).append((r, w))
+    result = []
+    for row in rows:
+        scores = [0.0] * len(vectors)
+        for i, w in zip(*vectors[row]):
+            for r, v in postings[i]:
+                scores[r] += w * v
+        result.append(scores)
+    return result
+
+
+def top_candidates(paths, row, scores, limit):
+    """从一行分数中选出分数最高的候选 [[页面, 分数]]（不含自身，按分数降序、路径升序）"""
+    ranked = [(round(s, 6), paths[j]) for j, s in enumerate(scores) if j != row and s >= MIN_SCORE]
+    ranked.sort(key=lambda x: (-x[0], x[1]))
+    return [[p, s] for s, p in ranked[:limit]]
+
+
+def update_related(corpus, state, top_k=DEFAULT_TOP_K, full=False):
+    """增量更新 state 中的向量与候选列表，返回 (重新计算的行数, 是否全量)"""
+    signature = f'v{RELATED_VERSION}/k{top_k}/b{TITLE_BOOST}/f{MAX_FEATURES}'
+    paths = [page.path for page in corpus]
+    cached = state.get('pages', {}) if state.get('sig') == signature and not full else {}
+    changed = [p for p in paths if p not in cached or cached[p][0] != corpus.get(p).hash]
+    removed = set(cached) - set(paths)
+    full = not cached or len(changed) + len(removed) > len(paths) * REBUILD_RATIO
+    limit = top_k * CANDIDATE_FACTOR
+
+    if full:
+        term_counts = {p: page_terms(corpus.get(p), corpus.read_text(p)) for p in paths}
+        vocab, idf = build_vocabulary(term_counts)
+        changed = paths
+        old_candidates = {}
+    else:
+        vocab, idf = state['vocab'], state['idf']
+        term_counts = {p: page_terms(corpus.get(p), corpus.read_text(p)) for p in changed}
+        old_candidates = state['candidates']
+
+    index = {t: i for i, t in enumerate(vocab)}
+    pages = {}
+    for p in paths:
+        if p in term_counts:
+            pages[p] = [corpus.get(p).hash] + list(vectorize(term_counts[p], index, idf))
+        else:
+            pages[p] = cached[p]
+    vectors = [(pages[p][1], pages[p][2]) for p in paths]
+    position = {p: r for r, p in enumerate(paths)}
+
+    candidates = {}
+    stale = set(changed) | removed
+    rows = [position[p] for p in changed]
+    changed_scores = dict(zip(changed, similarity_rows(vectors, rows, len(vocab))))
+    for p in changed:
+        candidates[p] = top_candidates(paths, position[p], changed_scores[p], limit)
+
+    recompute = []
+    for p in paths:
+        if p in changed_scores:
+            continue
+        # 对称性：变化页面的整行分数即为它们与 p 的新分数
+        old = old_candidates.get(p, [])
+        merged = [c for c in old if c[0] not in stale]
+        r = position[p]
+        for q, scores in changed_scores.items():
+            s = round(scores[r], 6)
+            if s >= MIN_SCORE:
+                merged.append([q, s])
+        merged.sort(key=lambda c: (-c[1], c[0]))
+        if len(old) >= limit:
+            # 缓存的候选被截断过：低于其最低分的未变化页面不在缓存中，只有不低于该分数的排名可信
+            floor = old[-1][1]
+            merged = [c for c in merged if c[1] >= floor]
+            if len(merged) < top_k:
+                recompute.append(p)
+        candidates[p] = merged[:limit]
+    for p, scores in zip(recompute, similarity_rows(vectors, [position[p] for p in recompute], len(vocab))):
+        candidates[p] = top_candidates(paths, position[p], scores, limit)
+
+    state.clear()
+    state.update({'sig': signature, 'vocab': vocab, 'idf': idf, 'pages': pages, 'candidates': candidates})
+    return len(changed) + len(recompute), full
+
+
+def render_related(corpus, candidates, top_k=DEFAULT_TOP_K):
+    """紧凑 JSON，每个页面一行：[链接, 标题, [相关页面下标...]]"""
+    paths = [page.path for page in corpus]
+    position = {p: i for i, p in enumerate(paths)}
+
+    def dump(value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    rows = []
+    for p in paths:
+        related = [position[q] for q, _ in candidates.get(p, [])[:top_k] if q in position]
+        rows.append(dump([page_url(p), strip_inline(corpus.get(p).title), related]))
+    return f'{{"v":{RELATED_VERSION},"k":{top_k},"pages":[\n' + ',\n'.join(rows) + '\n]}\n'
+
+
+def build_related(root='.', top_k=DEFAULT_TOP_K, full=False, out=None, check=False):
+    """更新相关页面数据，返回 (状态, 页面数, 重新计算的行数, 是否全量)；状态为 written / unchanged / stale"""
+    corpus = load_corpus(root)
+    state_file = cache_path(root, STATE_FILE)
+    state = load_json(state_file, {})
+    computed, was_full = update_related(corpus, state, top_k, full)
+    save_json(state_file, state)
+
+    text = render_related(corpus, state['candidates'], top_k)
+    target = corpus.root / (out or RELATED_FILE)
+    try:
+        current = target.read_text(encoding='utf-8')
+    except OSError:
+        current = None
+    if current == text:
+        status = 'unchanged'
+    elif check:
+        status = 'stale'
+    else:
+        write_text_atomic(target, text)
+        status = 'written'
+    return status, len(corpus), computed, was_full
+
+
+def cmd_related_pages(args):
+    """预计算相关页面"""
+    print("=== 预计算相关页面 ===\n")
+    status, total, computed, full = build_related(args.root, args.top, args.full, args.out, args.check)
+    backend = 'NumPy' if numpy is not None else '纯 Python'
+    mode = '全量' if full else '增量'
+    print(f"{'✅' if status != 'stale' else '❌'} {total} 个页面，{mode}计算 {computed} 行（{backend}）")
+    if status == 'stale':
+        print("\n💡 相关页面数据已过期，请运行: bash .scripts/doc-tools.sh related-pages")
+        return 1
+    print(f"📄 {args.out or RELATED_FILE}（{'已更新' if status == 'written' else '无变化'}）")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('related-pages', help='基于 TF-IDF 预计算每个页面的相关页面（供主题使用）')
+    p.add_argument('--top', type=int, default=DEFAULT_TOP_K, help=f'每个页面的相关页面数（默认 {DEFAULT_TOP_K}）')
+    p.add_argument('--full', action='store_true', help='忽略缓存，重新确定词表并全量计算')
+    p.add_argument('--out', help=f'输出文件（默认 {RELATED_FILE}）')
+    p.add_argument('--check', action='store_true', help='只检查数据是否最新，不写入')
+    p.set_defaults(func=cmd_related_pages)
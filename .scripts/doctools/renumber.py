@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+章节重新编号 - 一次性同步更新文件名、侧边栏标题、章节范围与所有交叉链接
+
+两种模式：
+    renumber ai                  按侧边栏阅读顺序把章节重新编号为连续序号（删除章节后收拢跳号）
+    renumber ai --insert-at 6    为新章节腾出位置：第6章及之后的章节编号全部加 1
+
+会同步修改：
+    1. sidebar.ts 中的"第X章"标题、分组标题里的（第X-Y章）范围以及页面 front matter 的 title
+    2. 模块 index.md 中学习路径图的（第X-Y章）范围
+    3. chapter-NN.md 文件名（保持文件编号与章节编号的原有差值和位数）
+    4. sidebar.ts、nav.ts 以及所有 Markdown 页面中指向被重命名文件的链接
+    5. 正文链接文字中与目标章节一致的"第X章"
+
+所有修改通过 EditSet 计算后原子提交，每个受影响的文件只读写一次。
+"""
+
+import re
+
+from .common import DOCS_DIR, VITEPRESS_DIR, url_to_page
+from .corpus import load_corpus
+from .edits import EditConflict, EditSet
+from .sidebar import (JSValue, SidebarEditor, SidebarSyntaxError, iter_values, js_string, load_sidebar,
+                      parse_export)
+
+NAV_FILE = VITEPRESS_DIR + '/nav.ts'
+
+_CHAPTER_FILE = re.compile(r'^chapter-(\d+)(.*)\.md$')
+_RANGE = re.compile(r'第(\d+)-(\d+)章')
+_FRONTMATTER = re.compile(r'---\r?\n(.*?)^---', re.S | re.M)
+_FM_TITLE = re.compile(r'^title:[ \t]*(.+?)[ \t]*\r?$', re.M)
+
+
+class RenumberError(ValueError):
+    """无法安全地重新编号"""
+
+
+def chapter_scope(sidebar, prefix, group=None):
+    """返回重新编号的范围（条目列表）；group 为分组标题中包含的文字"""
+    if group is None:
+        return list(sidebar.walk(prefix))
+    for item in sidebar.walk(prefix):
+        if group in item.text and item.items:
+            return list(item.walk())
+    raise RenumberError(f"模块 {prefix} 中没有标题包含 '{group}' 的分组")
+
+
+def compute_mapping(items, insert_at=None):
+    """计算 {条目: 新编号}（只包含章节条目）"""
+    chapters = [item for item in items if item.chapter is not None]
+    if not chapters:
+        return {}
+    numbers = [item.chapter for item in chapters]
+    if insert_at is not None:
+        return {item: item.chapter + 1 if item.chapter >= insert_at else item.chapter
+                for item in chapters}
+    for prev, cur in zip(numbers, numbers[1:]):
+        if cur < prev:
+            raise RenumberError('范围内包含多套章节编号（编号出现回退），请用 --group 指定分组')
+    start = numbers[0]
+    return {item: start + i for i, item in enumerate(chapters)}
+
+
+def map_range(a, b, number_map):
+    """把旧范围 a-b 映射为新范围；范围内没有已知章节时保持不变"""
+    mapped = [number_map[n] for n in range(a, b + 1) if n in number_map]
+    if not mapped:
+        return a, b
+    return min(mapped), max(mapped)
+
+
+def renamed_page(page, old, new):
+    """按编号变化计算新的文件路径，不是 chapter-NN.md 形式时返回 None"""
+    directory, _, name = page.rpartition('/')
+    m = _CHAPTER_FILE.match(name)
+    if not m or new == old:
+        return None
+    digits = m.group(1)
+    number = int(digits) + (new - old)
+    if number < 0:
+        raise RenumberError(f'{page} 重命名后编号为负数')
+    name = f'chapter-{number:0{len(digits)}d}{m.group(2)}.md'
+    return f'{directory}/{name}' if directory else name
+
+
+def _replace_literal(edits, file, node, value):
+    edits.replace(file, node.start, node.end, js_string(value, node.quote or '"'))
+
+
+def _rewrite_link(link, old, new):
+    """把链接中的旧文件名替换为新文件名，保持原有写法（绝对/相对、.md 后缀、锚点）"""
+    path, sep, rest = link.partition('#')
+    old_stem = old.rpartition('/')[2][:-3]
+    new_stem = new.rpartition('/')[2][:-3]
+    pattern = re.compile(r'(^|/)' + re.escape(old_stem) + r'(\.md|\.html)?$')
+    return pattern.sub(lambda m: m.group(1) + new_stem + (m.group(2) or ''), path) + sep + rest
+
+
+def plan_renumber(root, module, insert_at=None, group=None, rename_files=True):
+    """计算重新编号所需的全部修改，返回 (EditSet, 编号变化列表, 文件重命名映射, 警告列表)"""
+    sidebar = load_sidebar(root)
+    prefix = sidebar.module_for(module)
+    if prefix is None:
+        raise RenumberError(f'sidebar.ts 中没有模块 /{module}/')
+
+    items = chapter_scope(sidebar, prefix, group)
+    mapping = compute_mapping(items, insert_at)
+    changes = [(item, item.chapter, new) for item, new in mapping.items() if item.chapter != new]
+    number_map = {}
+    for item, new in mapping.items():
+        number_map.setdefault(item.chapter, new)
+
+    corpus = load_corpus(root)
+    edits = EditSet(root)
+    warnings = []
+    editor = SidebarEditor(sidebar)
+
+    # 1. 侧边栏章节标题与分组范围
+    for item, old, new in changes:
+        editor.set(item, 'text', item.text.replace(f'第{old}章', f'第{new}章', 1))
+    for item in items:
+        node = item.node.get('text')
+        if not isinstance(node, JSValue) or not _RANGE.search(node.value or ''):
+            continue
+        descendants = [mapping[d] for d in item.walk() if d in mapping]
+
+        def fix(m):
+            if descendants:
+                a, b = min(descendants), max(descendants)
+            else:
+                a, b = map_range(int(m.group(1)), int(m.group(2)), number_map)
+            return f'第{a}-{b}章'
+
+        value = _RANGE.sub(fix, node.value)
+        if value != node.value:
+            editor.set(item, 'text', value)
+
+    # 2. 模块首页学习路径图（只有单套编号时才能无歧义地映射）
+    index_file = f'{DOCS_DIR}/{module}/index.md'
+    if group is not None:
+        warnings.append(f'只处理了分组，docs/{module}/index.md 中的章节范围需要手动检查')
+    elif f'{module}/index.md' in corpus and number_map:
+        text = edits.text(index_file)
+        for m in _RANGE.finditer(text):
+            old_range = int(m.group(1)), int(m.group(2))
+            a, b = map_range(old_range[0], old_range[1], number_map)
+            if (a, b) != old_range:
+                edits.replace(index_file, m.start(), m.end(), f'第{a}-{b}章')
+
+    # 3. 文件重命名
+    page_renames = {}
+    if rename_files:
+        for item, old, new in changes:
+            page = item.page
+            if page is None or item.anchor or page not in corpus:
+                continue
+            target = renamed_page(page, old, new)
+            if target:
+                page_renames[page] = target
+        # 文件编号与章节编号不对应时（目标文件已被其他页面占用）只改标题不改文件名
+        while True:
+            blocked = [page for page, target in page_renames.items()
+                       if target in corpus and target not in page_renames]
+            if not blocked:
+                break
+            for page in blocked:
+                warnings.append(f'docs/{page_renames.pop(page)} 已存在，保留文件名 docs/{page}')
+        for page, target in page_renames.items():
+            edits.rename(f'{DOCS_DIR}/{page}', f'{DOCS_DIR}/{target}')
+
+    # 4. 页面 front matter 中的 title
+    for item, old, new in changes:
+        if item.page is None or item.anchor or item.page not in corpus:
+            continue
+        file = f'{DOCS_DIR}/{item.page}'
+        text = edits.text(file)
+        m = _FRONTMATTER.match(text)
+        if not m:
+            continue
+        title = _FM_TITLE.search(text, m.start(1), m.end(1))
+        if title and f'第{old}章' in title.group(1):
+            edits.replace(file, title.start(1), title.end(1),
+                          title.group(1).replace(f'第{old}章', f'第{new}章', 1))
+
+    # 5. 侧边栏与导航栏中的链接
+    if page_renames:
+        for item in sidebar.walk():
+            if item.page in page_renames:
+                editor.relink(item, _rewrite_link(item.link, item.page, page_renames[item.page]))
+        try:
+            nav_source = edits.text(NAV_FILE)
+            nav = parse_export(nav_source, 'nav')
+        except (OSError, SidebarSyntaxError):
+            nav = None
+        if nav is not None:
+            for _, node in iter_values(nav, 'link'):
+                page = url_to_page(node.value) if isinstance(node.value, str) else None
+                if page in page_renames:
+                    _replace_literal(edits, NAV_FILE, node,
+                                     _rewrite_link(node.value, page, page_renames[page]))
+
+    # 6. 正文链接：更新文件名，并同步链接文字中与目标章节一致的"第X章"
+    renumbered = {item.page: (old, new) for item, old, new in changes
+                  if item.page is not None and not item.anchor}
+    backlinks = corpus.backlinks()
+    for page, (old, new) in renumbered.items():
+        label = re.compile(r'第(\s*)(?<!\d)' + str(old) + r'(?!\d)(\s*)章')
+        for source, link, _ in backlinks.get(page, ()):
+            new_target = link.target
+            if page in page_renames:
+                new_target = _rewrite_link(link.target, page, page_renames[page])
+            new_text = label.sub(lambda m: f'第{m.group(1)}{new}{m.group(2)}章', link.text)
+            if new_target == link.target and new_text == link.text:
+                continue
+            file = f'{DOCS_DIR}/{source}'
+            start, end = edits.line_span(file, link.line)
+            line_text = edits.text(file)[start:end]
+            pattern = re.compile(r'\[' + re.escape(link.text) + r'\]\(\s*<?'
+                                 + re.escape(link.target) + r'(?=[\s>)])')
+            for m in pattern.finditer(line_text):
+                text_start = start + m.start() + 1
+                target_start = start + m.end() - len(link.target)
+                if new_text != link.text:
+                    edits.replace(file, text_start, text_start + len(link.text), new_text)
+                if new_target != link.target:
+                    edits.replace(file, target_start, target_start + len(link.target), new_target)
+
+    editor.emit(edits)
+    return edits, changes, page_renames, warnings
+
+
+def cmd_renumber(args):
+    """重新编号章节"""
+    print(f"=== 章节重新编号 [{args.module}] ===\n")
+    try:
+        edits, changes, renames, warnings = plan_renumber(
+            args.root, args.module, args.insert_at, args.group, not args.keep_files)
+        plan = edits.apply(dry_run=True)
+    except (RenumberError, EditConflict, SidebarSyntaxError) as e:
+        print(f"❌ 错误: {e}")
+        return 1
+
+    if not edits:
+        print("✅ 章节编号已经连续，无需修改")
+        return 0
+
+    print("[步骤 1/2] 计算修改...\n")
+    for item, old, new in changes:
+        print(f"  第{old}章 → 第{new}章  {item.text}")
+    if renames:
+        print()
+        for old, new in sorted(renames.items()):
+            print(f"  📄 {old} → {new}")
+    print()
+    for target, (source, new_text) in sorted(plan.items()):
+        if new_text is not None:
+            count = len(edits.edits.get(source, ())) + len(edits.line_edits.get(source, ()))
+            print(f"  ✏️  {target}（{count} 处修改）")
+
+    for warning in warnings:
+        print(f"  ⚠️  {warning}")
+
+    if args.dry_run:
+        print("\n💡 预览模式，未写入任何文件（去掉 --dry-run 以应用修改）")
+        return 0
+
+    print("\n[步骤 2/2] 原子提交修改...\n")
+    edits.apply()
+    print(f"✅ 已更新 {len(plan)} 个文件，重命名 {len(renames)} 个文件")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('renumber', help='重新编号模块章节，同步文件名、侧边栏、范围与链接')
+    p.add_argument('module', help='模块名，如 ai、java、db')
+    p.add_argument('--insert-at', type=int, metavar='N', help='在第 N 章处插入新章节（N 及之后编号加 1）')
+    p.add_argument('--group', help='只处理标题包含该文字的侧边栏分组（模块内有多套编号时使用）')
+    p.add_argument('--keep-files', action='store_true', help='不重命名 chapter-NN.md 文件')
+    p.add_argument('--dry-run', action='store_true', help='只显示将要进行的修改')
+    p.set_defaults(func=cmd_renumber)
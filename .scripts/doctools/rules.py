@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown 规则引擎 - 每个文件只扫描一次，所有规则订阅同一个事件流
+
+规则通过定义 on_<事件类型> 方法订阅事件（见 markdown.py 中的事件列表），例如：
+
+    @register_rule
+    class MyRule(Rule):
+        name = 'my-rule'
+        description = '示例规则'
+
+        def on_heading(self, tok, ctx):
+            if tok.level == 1 and '...' in tok.text:
+                ctx.report(self, tok.line, '标题中不要使用省略号')
+
+另有生命周期钩子：begin(engine) / begin_file(ctx) / end_file(ctx) / finish(engine)，
+跨文件的检查（如侧边栏锚点）在 finish 中完成。新增规则不会增加额外的文件读取或扫描。
+"""
+
+import json
+import re
+
+from .common import DOCS_DIR, SIDEBAR_FILE
+from .corpus import open_corpus
+from .gitref import GitError
+from .markdown import tokenize
+from .sidebar import SidebarSyntaxError, parse_sidebar
+
+RULES = {}
+
+
+def register_rule(cls):
+    """注册内置规则"""
+    RULES[cls.name] = cls
+    return cls
+
+
+class Finding(object):
+    __slots__ = ('rule', 'file', 'line', 'message', 'severity')
+
+    def __init__(self, rule, file, line, message, severity='error'):
+        self.rule = rule
+        self.file = file
+        self.line = line
+        self.message = message
+        self.severity = severity
+
+    def to_json(self):
+        return {'rule': self.rule, 'file': self.file, 'line': self.line,
+                'message': self.message, 'severity': self.severity}
+
+
+class FileContext(object):
+    """单个文件的扫描上下文"""
+
+    __slots__ = ('engine', 'path', 'file', 'lines')
+
+    def __init__(self, engine, path, lines):
+        self.engine = engine
+        self.path = path
+        self.file = f'{DOCS_DIR}/{path}'
+        self.lines = lines
+
+    def report(self, rule, line, message, severity='error'):
+        self.engine.report(rule, self.file, line, message, severity)
+
+
+class Rule(object):
+    """规则基类"""
+
+    name = ''
+    description = ''
+
+    def begin(self, engine):
+        pass
+
+    def begin_file(self, ctx):
+        pass
+
+    def end_file(self, ctx):
+        pass
+
+    def finish(self, engine):
+        pass
+
+
+class RuleEngine(object):
+    """按事件类型把扫描结果分发给订阅的规则"""
+
+    def __init__(self, rules, sidebar=None):
+        self.rules = rules
+        self.sidebar = sidebar
+        self.corpus = None
+        self.findings = []
+        self.files = []
+        self.dispatch = {}
+        for rule in rules:
+            for attr in dir(rule):
+                if attr.startswith('on_'):
+                    self.dispatch.setdefault(attr[3:], []).append(getattr(rule, attr))
+
+    def report(self, rule, file, line, message, severity='error'):
+        name = rule.name if isinstance(rule, Rule) else rule
+        self.findings.append(Finding(name, file, line, message, severity))
+
+    def run(self, files):
+        """files 为 (docs 相对路径, 文本) 序列"""
+        for rule in self.rules:
+            rule.begin(self)
+        dispatch = self.dispatch
+        for path, text in files:
+            self.files.append(path)
+            lines = text.split('\n')
+            ctx = FileContext(self, path, lines)
+            for rule in self.rules:
+                rule.begin_file(ctx)
+            for tok in tokenize(lines):
+                handlers = dispatch.get(tok.kind)
+                if handlers:
+                    for handler in handlers:
+                        handler(tok, ctx)
+            for rule in self.rules:
+                rule.end_file(ctx)
+        for rule in self.rules:
+            rule.finish(self)
+        return self.findings
+
+
+# ========== 内置规则 ==========
+
+@register_rule
+class HeadingNumberingRule(Rule):
+    """对应 check-naming-rules.sh：标题中不应包含手写编号"""
+
+    name = 'heading-numbering'
+    description = '标题不使用手写编号（1.1 / 1.1.1 / 第X章）'
+
+    PATTERNS = {
+        1: re.compile(r'^\d+\.\d+\s+'),
+        2: re.compile(r'^\d+\.\d+\s+'),
+        3: re.compile(r'^\d+\.\d+\.\d+\s+'),
+        4: re.compile(r'^\d+\.\d+\.\d+\.\d+\s+'),
+    }
+    CHAPTER = re.compile(r'^第\d+\s*章')
+
+    def on_heading(self, tok, ctx):
+        pattern = self.PATTERNS.get(tok.level)
+        if pattern is None:
+            return
+        if pattern.match(tok.text):
+            ctx.report(self, tok.line, f'H{tok.level} 标题包含数字编号: {tok.text}')
+        elif self.CHAPTER.match(tok.text):
+            ctx.report(self, tok.line, f'H{tok.level} 标题包含章节编号: {tok.text}')
+
+
+@register_rule
+class SidebarAnchorRule(Rule):
+    """对应 check-anchors.py：sidebar.ts 中带锚点的链接必须指向存在的页面和标题"""
+
+    name = 'sidebar-anchors'
+    description = '侧边栏锚点链接指向存在的页面和标题'
+
+    def begin(self, engine):
+        self.anchors = {}
+
+    def begin_file(self, ctx):
+        self.current = self.anchors.setdefault(ctx.path, set())
+
+    def on_heading(self, tok, ctx):
+        self.current.add(tok.target)
+
+    def finish(self, engine):
+        if engine.sidebar is None:
+            return
+        for item in engine.sidebar.walk():
+            anchor = item.anchor
+            page = item.page
+            if anchor is None or page is None:
+                continue
+            line = engine.sidebar.line_of(item.node.start)
+            if page not in self.anchors:
+                engine.report(self, SIDEBAR_FILE, line, f'{item.link}: 文件不存在 docs/{page}')
+            elif anchor not in self.anchors[page]:
+                engine.report(self, SIDEBAR_FILE, line,
+                              f"{item.link}: 锚点 '{anchor}' 在 docs/{page} 中未定义")
+
+
+@register_rule
+class ChapterContinuityRule(Rule):
+    """对应 check-chapter-continuity.sh：按模块检查侧边栏中的第X章编号是否连续"""
+
+    name = 'chapter-continuity'
+    description = '侧边栏章节编号（第X章）连续无跳号'
+
+    def finish(self, engine):
+        sidebar = engine.sidebar
+        if sidebar is None:
+            return
+        for module in sidebar.modules:
+            chapters = sidebar.chapters(module)
+            for prev, current in zip(chapters, chapters[1:]):
+                if current != prev + 1:
+                    missing = '、'.join(f'第{n}章' for n in range(prev + 1, current))
+                    line = self._line_of(sidebar, module, current)
+                    engine.report(self, SIDEBAR_FILE, line,
+                                  f'[{module}] 编号不连续: 第{prev}章 → 第{current}章（缺少{missing}）')
+
+    @staticmethod
+    def _line_of(sidebar, module, chapter):
+        for item in sidebar.walk(module):
+            if item.chapter == chapter:
+                return sidebar.line_of(item.node.start)
+        return 1
+
+
+@register_rule
+class LearningPathRule(Rule):
+    """对应 fix-learning-path.py：模块 index.md 中的（第X-Y章）范围需覆盖侧边栏中的所有章节"""
+
+    name = 'learning-path'
+    description = '模块首页学习路径图的章节范围覆盖侧边栏章节'
+
+    RANGE = re.compile(r'[（(]第(\d+)-(\d+)章[）)]')
+
+    def begin(self, engine):
+        self.ranges = {}
+        self.active = None
+
+    def begin_file(self, ctx):
+        parts = ctx.path.split('/')
+        self.active = parts[0] if len(parts) == 2 and parts[1] == 'index.md' else None
+
+    def on_text(self, tok, ctx):
+        if self.active is not None and '第' in tok.text:
+            self._collect(tok.text)
+
+    def on_fence_close(self, tok, ctx):
+        # 学习路径图通常画在代码块里
+        if self.active is not None:
+            self._collect('\n'.join(ctx.lines[tok.end:tok.line - 1]))
+
+    def _collect(self, text):
+        for start, end in self.RANGE.findall(text):
+            self.ranges.setdefault(self.active, set()).update(range(int(start), int(end) + 1))
+
+    def finish(self, engine):
+        sidebar = engine.sidebar
+        if sidebar is None:
+            return
+        for module in sorted(m for m in {p.split('/')[0] for p in engine.files
+                                          if p.endswith('/index.md') and p.count('/') == 1}):
+            prefix = sidebar.module_for(module)
+            chapters = sidebar.chapters(prefix) if prefix else []
+            if not chapters:
+                continue
+            file = f'{DOCS_DIR}/{module}/index.md'
+            covered = self.ranges.get(module)
+            if not covered:
+                engine.report(self, file, 1, '未找到学习路径图（第X-Y章）')
+                continue
+            missing = [c for c in chapters if c not in covered]
+            if missing:
+                engine.report(self, file, 1,
+                              f'学习路径图未覆盖: {", ".join(f"第{c}章" for c in missing)}'
+                              f'（期望 第{chapters[0]}-{chapters[-1]}章）')
+
+
+# ========== 命令 ==========
+
+def corpus_files(corpus):
+    """从语料索引按顺序读取页面"""
+    for page in corpus:
+        yield page.path, corpus.read_text(page.path)
+
+
+def make_engine(names=None, corpus=None):
+    """创建引擎；names 为空时启用所有规则，侧边栏从 corpus 对应的工作区或 ref 读取"""
+    names = names or list(RULES)
+    unknown = [n for n in names if n not in RULES]
+    if unknown:
+        raise KeyError(', '.join(unknown))
+    engine = RuleEngine([RULES[n]() for n in names])
+    if corpus is None:
+        return engine
+    engine.corpus = corpus
+    try:
+        engine.sidebar = parse_sidebar(corpus.read_file(SIDEBAR_FILE), SIDEBAR_FILE)
+    except (OSError, GitError, SidebarSyntaxError) as e:
+        engine.report('sidebar', SIDEBAR_FILE, getattr(e, 'line', 1), f'无法解析 sidebar.ts: {e}')
+    return engine
+
+
+def print_findings(findings, total_files, rule_names):
+    """按规则分组输出检查结果，返回是否全部通过"""
+    by_rule = {}
+    for f in findings:
+        by_rule.setdefault(f.rule, []).append(f)
+
+    for name in rule_names + [r for r in by_rule if r not in rule_names]:
+        items = by_rule.get(name, [])
+        if not items:
+            print(f"✅ [{name}] 通过")
+            continue
+        print(f"❌ [{name}] {len(items)} 个问题")
+        for f in items:
+            print(f"   {f.file}:{f.line}  {f.message}")
+        print()
+
+    errors = sum(1 for f in findings if f.severity == 'error')
+    print("\n" + "=" * 40)
+    print("          检查报告")
+    print("=" * 40 + "\n")
+    print(f"共扫描 {total_files} 个文件，启用 {len(rule_names)} 条规则")
+    if errors:
+        print(f"⚠️  发现 {errors} 个错误，{len(findings) - errors} 个警告")
+    else:
+        print("✅ 所有规则检查通过！")
+    return errors == 0
+
+
+def cmd_lint(args):
+    """运行规则引擎"""
+    if args.list_rules:
+        for name, cls in RULES.items():
+            print(f"  {name:<22} {cls.description}")
+        return 0
+    unknown = [n for n in args.rule or () if n not in RULES]
+    if unknown:
+        print(f"❌ 错误: 未知规则 {', '.join(unknown)}")
+        return 2
+
+    if not args.json:
+        print(f"=== 文档规则检查{f' [{args.ref}]' if args.ref else ''} ===\n")
+    try:
+        with open_corpus(args.root, args.ref) as corpus:
+            engine = make_engine(args.rule, corpus)
+            findings = engine.run(corpus_files(corpus))
+    except GitError as e:
+        print(f"❌ 错误: 无法读取 {args.ref}: {e}")
+        return 2
+
+    if args.json:
+        print(json.dumps([f.to_json() for f in findings], ensure_ascii=False, indent=2))
+        return 1 if any(f.severity == 'error' for f in findings) else 0
+    ok = print_findings(findings, len(engine.files), [r.name for r in engine.rules])
+    return 0 if ok else 1
+
+
+def register(subparsers):
+    p = subparsers.add_parser('lint', help='单次扫描运行所有文档规则')
+    p.add_argument('--rule', nargs='+', help='只运行指定规则')
+    p.add_argument('--list-rules', action='store_true', help='列出所有内置规则')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出检查结果')
+    p.add_argument('--ref', help='检查指定 git ref（如 dev、origin/dev）而不是工作区，无需 checkout')
+    p.set_defaults(func=cmd_lint)
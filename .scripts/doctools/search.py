@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+预构建全文检索索引 - 按模块分片的倒排索引
+
+每个模块（ai、java、guide ...）生成一个分片 docs/public/search/<模块>.json，
+站点只需按当前路由前缀懒加载对应分片，而不是下载整站索引（加载与查询见
+docs/.vitepress/theme/searchShards.ts，导航栏搜索框为 components/ShardSearch.vue）。
+部署时在 docs:build 之前生成，分片随 public/ 复制到构建产物中。
+
+分片格式：
+    {
+      "v": 1,
+      "module": "ai",
+      "docs": [["/ai/chapter-01#什么是大语言模型-llm", "标题", "上级标题"], ...],
+      "index": {"词项": [文档号增量, 词频, 文档号增量, 词频, ...], ...}
+    }
+
+文档以标题为粒度切分（与 VitePress 本地搜索一致），代码块不参与索引。
+分词规则：CJK 二元切分 + 拉丁词（见 text.tokenize），标题中的词项按 TITLE_BOOST 加权。
+分片只在其包含的页面变化（或分词规则版本变化）时重建。
+"""
+
+import json
+
+from .common import PUBLIC_DIR, cache_path, content_hash, load_json, save_json, page_url
+from .corpus import load_corpus
+from .text import strip_inline, tokenize
+
+SHARD_VERSION = 1
+TITLE_BOOST = 3
+SEARCH_DIR = PUBLIC_DIR + '/search'
+STATE_FILE = 'search-state.json'
+
+
+def iter_sections(page, text):
+    """按标题切分页面，返回 (锚点, 标题, 上级标题, 正文) 序列；代码块与 front matter 不计入正文"""
+    lines = text.split('\n')
+    skip = set()
+    for fence in page.fences:
+        skip.update(range(fence.line, fence.end + 1))
+    if page.frontmatter:
+        skip.update(range(page.frontmatter[0], page.frontmatter[1] + 1))
+
+    bounds = [(h.line, h) for h in page.headings]
+    sections = []
+    stack = []
+    # 第一个标题之前的内容归入页面本身
+    first = bounds[0][0] if bounds else len(lines) + 1
+    sections.append(('', page.title, '', _body(lines, 1, first, skip)))
+    for i, (line, heading) in enumerate(bounds):
+        end = bounds[i + 1][0] if i + 1 < len(bounds) else len(lines) + 1
+        while stack and stack[-1].level >= heading.level:
+            stack.pop()
+        parents = ' > '.join(strip_inline(h.title) for h in stack)
+        stack.append(heading)
+        sections.append((heading.anchor, strip_inline(heading.title), parents,
+                         _body(lines, line + 1, end, skip)))
+    return sections
+
+
+def _body(lines, start, end, skip):
+    """取 [start, end) 行（行号从 1 开始）的正文"""
+    return '\n'.join(lines[n - 1] for n in range(start, end) if n not in skip)
+
+
+def build_shard(corpus, module, paths):
+    """为一个模块构建倒排索引分片"""
+    docs = []
+    postings = {}
+    for path in paths:
+        page = corpus.get(path)
+        url = page_url(path)
+        for anchor, title, parents, body in iter_sections(page, corpus.read_text(path)):
+            counts = {}
+            for term in tokenize(strip_inline(body)):
+                counts[term] = counts.get(term, 0) + 1
+            for term in tokenize(title):
+                counts[term] = counts.get(term, 0) + TITLE_BOOST
+            if not counts:
+                continue
+            doc_id = len(docs)
+            docs.append([url + ('#' + anchor if anchor else ''), title, parents])
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+    index = {}
+    for term in sorted(postings):
+        flat = []
+        prev = 0
+        for doc_id, tf in postings[term]:
+            flat.append(doc_id - prev)
+            flat.append(tf)
+            prev = doc_id
+        index[term] = flat
+    return {'v': SHARD_VERSION, 'module': module, 'docs': docs, 'index': index}
+
+
+def shard_signature(corpus, paths):
+    """分片签名：页面路径与内容哈希 + 分片格式版本"""
+    parts = [f'v{SHARD_VERSION}/b{TITLE_BOOST}']
+    parts.extend(f'{p}:{corpus.get(p).hash}' for p in paths)
+    return content_hash('\n'.join(parts))
+
+
+def build_search_index(root='.', out_dir=None, force=False, corpus=None):
+    """构建所有模块分片，返回 {模块: (是否重建, 文档数, 字节数)}"""
+    corpus = corpus or load_corpus(root)
+    out = corpus.root / (out_dir or SEARCH_DIR)
+    state_file = cache_path(corpus.root, STATE_FILE)
+    state = load_json(state_file, {})
+    manifest = {'v': SHARD_VERSION, 'shards': {}}
+    report = {}
+
+    for module, paths in corpus.modules().items():
+        signature = shard_signature(corpus, paths)
+        shard_file = out / f'{module}.json'
+        prefix = '/' if module == 'root' else f'/{module}/'
+        cached = state.get(module)
+        if not force and cached and cached['sig'] == signature and shard_file.exists():
+            report[module] = (False, cached['docs'], cached['bytes'])
+        else:
+            shard = build_shard(corpus, module, paths)
+            size = save_json(shard_file, shard)
+            cached = {'sig': signature, 'docs': len(shard['docs']), 'bytes': size}
+            state[module] = cached
+            report[module] = (True, cached['docs'], size)
+        manifest['shards'][module] = {
+            'prefix': prefix,
+            'file': f'{module}.json',
+            'hash': signature[:10],
+            'docs': cached['docs'],
+        }
+
+    for module in list(state):
+        if module not in manifest['shards']:
+            del state[module]
+            stale = out / f'{module}.json'
+            if stale.exists():
+                stale.unlink()
+
+    save_json(out / 'manifest.json', manifest)
+    save_json(state_file, state)
+    return report
+
+
+def query_shard(shard, query, limit=10):
+    """在分片中检索（供调试使用），按词频累加打分"""
+    scores = {}
+    for term in set(tokenize(query)):
+        flat = shard['index'].get(term)
+        if not flat:
+            continue
+        doc_id = 0
+        for i in range(0, len(flat), 2):
+            doc_id += flat[i]
+            scores[doc_id] = scores.get(doc_id, 0) + flat[i + 1]
+    ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:limit]
+    return [(shard['docs'][d], s) for d, s in ranked]
+
+
+def cmd_search_index(args):
+    """构建检索分片"""
+    print("=== 构建分片检索索引 ===\n")
+    report = build_search_index(args.root, args.out, args.force)
+    total = 0
+    for module, (rebuilt, docs, size) in sorted(report.items()):
+        flag = '🔨 重建' if rebuilt else '✅ 未变化'
+        print(f"  {flag} [{module}] {docs} 个文档, {size / 1024:.1f} KB")
+        total += size
+    print(f"\n共 {len(report)} 个分片, {total / 1024:.1f} KB")
+
+    if args.query:
+        out = args.out or SEARCH_DIR
+        print(f"\n🔍 检索 '{args.query}':")
+        for module in sorted(report):
+            with open(f'{args.root}/{out}/{module}.json', 'r', encoding='utf-8') as f:
+                shard = json.load(f)
+            for (url, title, parents), score in query_shard(shard, args.query, 3):
+                print(f"  [{score}] {url}  {title}")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('search-index', help='构建按模块分片的全文检索索引')
+    p.add_argument('--out', help=f'输出目录（默认 {SEARCH_DIR}）')
+    p.add_argument('--force', action='store_true', help='忽略缓存，重建所有分片')
+    p.add_argument('--query', help='构建后用该关键词试检索')
+    p.set_defaults(func=cmd_search_index)
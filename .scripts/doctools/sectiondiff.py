@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+章节级差异 - 对比两个 git ref 的文档，按页面和小节报告新增、删除、移动与修改
+
+同步 dev → main 前，原始的逐行 diff 动辄几 MB，难以看出哪些章节真正发生了变化。这里：
+
+    1. 并行遍历两个提交的 docs/ 树，id 相同的子树直接跳过（GitTree.diff），只得到变化的文件
+    2. 只解析变化的 blob：每个 blob 切分为小节树（标题层级、锚点、标题路径、字节数、正文哈希），
+       结果按 blob id 缓存到 .cache/doctools/sections.json，同一版本不会重复解析
+    3. 在所有变化页面之间依次按 (页面, 锚点)、(页面, 标题路径)、正文哈希、(锚点, 标题) 匹配小节
+
+匹配上的小节：所在页面或父级标题（按匹配关系判断）改变为移动，标题或正文改变为修改；
+没有匹配上的为新增或删除。被删除页面至少一半的小节匹配到同一个新增页面时视为页面重命名，
+其中的小节不再逐个报告为移动。开销只与变化的 blob 数量有关，与语料总大小无关。
+"""
+
+import json
+from collections import namedtuple
+
+from .common import DOCS_DIR, cache_path, content_hash, load_json, save_json
+from .corpus import Corpus, is_page_file
+from .gitref import GitError, GitObjectReader, GitTree
+
+SECTIONS_VERSION = 1
+CACHE_FILE = 'sections.json'
+# 缓存的 blob 数量上限，超出时丢弃最久未使用的
+MAX_CACHED_BLOBS = 4096
+
+# level 为 0 的是第一个标题之前的内容（含 front matter）；parent 为父级小节的下标，-1 表示没有
+Section = namedtuple('Section', 'level anchor title path line size hash parent')
+SectionChange = namedtuple('SectionChange', 'kind modified old_page old new_page new')
+
+KIND_LABELS = {'added': '+', 'removed': '-', 'modified': '~', 'moved': '↪'}
+PAGE_LABELS = {'added': '新增', 'removed': '删除', 'modified': '修改', 'renamed': '重命名'}
+
+
+def split_sections(path, data):
+    """把页面内容（bytes）切分为小节列表"""
+    page = Corpus.parse_page(path, data)
+    lines = data.split(b'\n')
+    headings = page.headings
+    bounds = [h.line for h in headings] + [len(lines) + 1]
+
+    def measure(start, end, skip_heading):
+        chunk = lines[start - 1:end - 1]
+        size = sum(len(l) + 1 for l in chunk)
+        body = b'\n'.join(chunk[1:] if skip_heading else chunk).strip()
+        return size, body
+
+    sections = []
+    size, body = measure(1, bounds[0], False)
+    if body:
+        sections.append(Section(0, '', '', [], 1, size, content_hash(body), -1))
+    stack = []
+    for i, h in enumerate(headings):
+        while stack and sections[stack[-1]].level >= h.level:
+            stack.pop()
+        size, body = measure(h.line, bounds[i + 1], True)
+        parent = stack[-1] if stack else -1
+        path_titles = (sections[parent].path if parent >= 0 else []) + [h.title]
+        sections.append(Section(h.level, h.anchor, h.title, path_titles, h.line, size,
+                                content_hash(body) if body else '', parent))
+        stack.append(len(sections) - 1)
+    return sections
+
+
+class SectionCache(object):
+    """按 blob id 缓存的小节切分结果"""
+
+    def __init__(self, root):
+        self.file = cache_path(root, CACHE_FILE)
+        data = load_json(self.file, {})
+        self.blobs = data.get('blobs', {}) if data.get('v') == SECTIONS_VERSION else {}
+        self.parsed = 0
+        self.hits = 0
+
+    def sections(self, git, oid, path):
+        record = self.blobs.pop(oid, None)
+        if record is None:
+            _, kind, data = git.read(oid)
+            if kind != 'blob':
+                raise GitError(f'{path} 不是文件')
+            record = [list(s) for s in split_sections(path, data)]
+            self.parsed += 1
+        else:
+            self.hits += 1
+        # 重新插入到末尾，dict 的顺序即为最近使用顺序
+        self.blobs[oid] = record
+        return [Section(*s) for s in record]
+
+    def save(self):
+        excess = len(self.blobs) - MAX_CACHED_BLOBS
+        if excess > 0:
+            for oid in list(self.blobs)[:excess]:
+                del self.blobs[oid]
+        save_json(self.file, {'v': SECTIONS_VERSION, 'blobs': self.blobs})
+
+
+def match_sections(old, new):
+    """匹配变化页面的小节，old / new 为 {页面: [Section]}，返回 ([SectionChange], {旧页面: 新页面})
+
+    重命名的页面视为同一页面：其中的小节只有父级改变时才算移动。
+    """
+    old_items = [(p, i) for p in sorted(old) for i in range(len(old[p]))]
+    new_items = [(p, j) for p in sorted(new) for j in range(len(new[p]))]
+    matched = {}
+    used = set()
+
+    def match_by(key_old, key_new):
+        index = {}
+        for item in new_items:
+            if item not in used:
+                key = key_new(item)
+                if key is not None:
+                    index.setdefault(key, []).append(item)
+        for item in old_items:
+            if item in matched:
+                continue
+            key = key_old(item)
+            candidates = index.get(key) if key is not None else None
+            if candidates:
+                target = candidates.pop(0)
+                matched[item] = target
+                used.add(target)
+
+    def sec(side, item):
+        return side[item[0]][item[1]]
+
+    match_by(lambda x: (x[0], sec(old, x).anchor), lambda x: (x[0], sec(new, x).anchor))
+    match_by(lambda x: (x[0], tuple(sec(old, x).path)), lambda x: (x[0], tuple(sec(new, x).path)))
+    match_by(lambda x: sec(old, x).hash or None, lambda x: sec(new, x).hash or None)
+    match_by(lambda x: (sec(old, x).anchor, sec(old, x).title) if sec(old, x).level else None,
+             lambda x: (sec(new, x).anchor, sec(new, x).title) if sec(new, x).level else None)
+
+    renames = detect_renames(old, new, matched)
+    changes = []
+    for item in old_items:
+        o = sec(old, item)
+        target = matched.get(item)
+        if target is None:
+            changes.append(SectionChange('removed', False, item[0], o, None, None))
+            continue
+        n = sec(new, target)
+        parent = matched.get((item[0], o.parent)) if o.parent >= 0 else None
+        expected = (target[0], n.parent) if n.parent >= 0 else None
+        moved = renames.get(item[0], item[0]) != target[0] or parent != expected
+        modified = o.level != n.level or o.title != n.title or o.hash != n.hash
+        if moved:
+            changes.append(SectionChange('moved', modified, item[0], o, target[0], n))
+        elif modified:
+            changes.append(SectionChange('modified', True, item[0], o, target[0], n))
+    for item in new_items:
+        if item not in used:
+            changes.append(SectionChange('added', False, None, None, item[0], sec(new, item)))
+    return changes, renames
+
+
+def detect_renames(old, new, matched):
+    """识别页面重命名：只存在于 old 的页面至少一半的小节匹配到同一个只存在于 new 的页面，返回 {旧页面: 新页面}"""
+    counts = {}
+    for (page, _), (target, _) in matched.items():
+        if page not in new and target not in old:
+            counts.setdefault(page, {}).setdefault(target, 0)
+            counts[page][target] += 1
+    renames = {}
+    taken = set()
+    for page in sorted(counts):
+        target, n = max(counts[page].items(), key=lambda x: (x[1], x[0]))
+        if n * 2 >= len(old[page]) and target not in taken:
+            renames[page] = target
+            taken.add(target)
+    return renames
+
+
+class SectionDiff(object):
+    """两个 ref 之间的章节差异"""
+
+    def __init__(self, base, head, commits, pages, changes, renames, files, parsed, hits):
+        self.base = base
+        self.head = head
+        self.commits = commits
+        self.pages = pages
+        self.changes = changes
+        self.renames = renames
+        self.files = files
+        self.parsed = parsed
+        self.hits = hits
+
+    def by_page(self):
+        """按页面分组（删除的小节归入原页面），组内按行号排序"""
+        groups = {new: [] for new in self.renames.values()}
+        for c in self.changes:
+            page = c.new_page if c.new is not None else self.renames.get(c.old_page, c.old_page)
+            groups.setdefault(page, []).append(c)
+        for changes in groups.values():
+            changes.sort(key=lambda c: (c.new or c.old).line)
+        return {p: groups[p] for p in sorted(groups)}
+
+    def to_json(self):
+        def section(page, s):
+            if s is None:
+                return None
+            return {'page': page, 'anchor': s.anchor, 'title': s.title, 'level': s.level,
+                    'path': s.path, 'line': s.line, 'size': s.size}
+        return {
+            'base': self.base, 'head': self.head, 'commits': list(self.commits),
+            'pages': self.pages, 'renames': self.renames,
+            'sections': [{'kind': c.kind, 'modified': c.modified,
+                          'old': section(c.old_page, c.old), 'new': section(c.new_page, c.new)}
+                         for page in self.by_page().values() for c in page],
+        }
+
+
+def diff_sections(root, base, head):
+    """计算 base → head 的章节差异，返回 SectionDiff"""
+    prefix = DOCS_DIR + '/'
+    cache = SectionCache(root)
+    with GitObjectReader(root) as git:
+        old_tree = GitTree(git, base)
+        new_tree = GitTree(git, head)
+        changed = old_tree.diff(new_tree, DOCS_DIR)
+        old = {}
+        new = {}
+        pages = {}
+        for path in sorted(changed):
+            rel = path[len(prefix):]
+            if not is_page_file(rel):
+                continue
+            a, b = changed[path]
+            if a is not None:
+                old[rel] = cache.sections(git, a, rel)
+            if b is not None:
+                new[rel] = cache.sections(git, b, rel)
+            pages[rel] = 'modified' if a and b else ('added' if b else 'removed')
+    cache.save()
+    changes, renames = match_sections(old, new)
+    for page, target in renames.items():
+        del pages[page]
+        pages[target] = 'renamed'
+    return SectionDiff(base, head, (old_tree.commit, new_tree.commit), pages,
+                       changes, renames, len(changed), cache.parsed, cache.hits)
+
+
+def _heading(s):
+    if s.level == 0:
+        return '（页首）'
+    return f"{'#' * s.level} {s.title} #{s.anchor}"
+
+
+def _signed(n):
+    return f'+{n:,}' if n > 0 else f'{n:,}'
+
+
+def cmd_diff_sections(args):
+    """章节级差异"""
+    try:
+        result = diff_sections(args.root, args.base, args.head)
+    except GitError as e:
+        print(f"❌ 错误: {e}")
+        return 2
+
+    if args.json:
+        print(json.dumps(result.to_json(), ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"=== 章节差异: {args.base} → {args.head} ===\n")
+    a, b = result.commits
+    print(f"🔍 {a[:7]} → {b[:7]}：{result.files} 个文件变化，解析 {result.parsed} 个 blob"
+          f"（缓存命中 {result.hits} 个）\n")
+
+    counts = dict.fromkeys(KIND_LABELS, 0)
+    delta = 0
+    for page, changes in result.by_page().items():
+        status = result.pages.get(page, 'modified')
+        origin = {new: old for old, new in result.renames.items()}.get(page)
+        label = f"{PAGE_LABELS[status]}自 {origin}" if origin else PAGE_LABELS[status]
+        print(f"📄 {DOCS_DIR}/{page}（{label}）")
+        for c in changes:
+            counts[c.kind] += 1
+            old_size = c.old.size if c.old else 0
+            new_size = c.new.size if c.new else 0
+            delta += new_size - old_size
+            if c.kind == 'added':
+                line, size = _heading(c.new), f'{_signed(new_size)} B'
+            elif c.kind == 'removed':
+                line, size = _heading(c.old), f'{_signed(-old_size)} B'
+            else:
+                line = _heading(c.new)
+                if c.kind == 'moved':
+                    line += f'  ← {c.old_page}#{c.old.anchor}' if c.old.level else f'  ← {c.old_page}'
+                    if c.modified:
+                        line += '（已修改）'
+                size = f'{old_size:,} → {new_size:,} B'
+                if new_size != old_size:
+                    size += f'（{_signed(new_size - old_size)}）'
+            print(f"   {KIND_LABELS[c.kind]} {line}    {size}")
+        print()
+
+    if not result.pages:
+        print("✅ 两个 ref 之间没有页面内容变化")
+        return 0
+    pages = {}
+    for status in result.pages.values():
+        pages[status] = pages.get(status, 0) + 1
+    print("=" * 40)
+    print(f"页面：新增 {pages.get('added', 0)}，删除 {pages.get('removed', 0)}，"
+          f"修改 {pages.get('modified', 0)}，重命名 {pages.get('renamed', 0)}")
+    print(f"小节：新增 {counts['added']}，删除 {counts['removed']}，"
+          f"修改 {counts['modified']}，移动 {counts['moved']}；共 {_signed(delta)} 字节")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('diff-sections', help='对比两个 git ref，按页面和小节报告新增 / 删除 / 移动 / 修改')
+    p.add_argument('base', help='对比的基准 ref（如 origin/main）')
+    p.add_argument('head', nargs='?', default='HEAD', help='对比的目标 ref（默认 HEAD）')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出')
+    p.set_defaults(func=cmd_diff_sections)
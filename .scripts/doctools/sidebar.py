@@ -0,0 +1,727 @@
+# -*- coding: utf-8 -*-
+"""
+侧边栏模型 - 解析 sidebar.ts 中的对象字面量，保留每个节点在源码中的位置
+
+只支持 sidebar.ts 实际用到的 JavaScript 字面量子集：对象、数组、字符串（单/双引号）、
+数字、true/false/null、标识符键、尾随逗号以及 // 和 /* */ 注释。
+与逐行正则匹配不同，解析结果不依赖引号风格和换行方式（prettier 格式化后同样有效）。
+"""
+
+import re
+from pathlib import Path
+
+from .common import SIDEBAR_FILE, url_to_page
+from .edits import EditConflict
+
+_CHAPTER = re.compile(r'第(\d+)章')
+_IDENT = re.compile(r'[A-Za-z_$][\w$]*')
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+
+
+class SidebarSyntaxError(ValueError):
+    """sidebar.ts 语法错误"""
+
+    def __init__(self, message, source, pos):
+        line = source.count('\n', 0, pos) + 1
+        super().__init__(f'{message}（第 {line} 行）')
+        self.pos = pos
+        self.line = line
+
+
+class JSNode(object):
+    """字面量节点，start/end 为源码中的字符偏移（end 不含）"""
+
+    __slots__ = ('start', 'end')
+
+
+class JSObject(JSNode):
+    """对象：entries 为 [(键, 值节点, 键起始偏移)]"""
+
+    __slots__ = ('entries',)
+
+    def __init__(self):
+        self.entries = []
+
+    def get(self, key, default=None):
+        for k, v, _ in self.entries:
+            if k == key:
+                return v
+        return default
+
+
+class JSArray(JSNode):
+    __slots__ = ('items',)
+
+    def __init__(self):
+        self.items = []
+
+
+class JSValue(JSNode):
+    """标量：字符串、数字、布尔值或 null；quote 为字符串引号字符"""
+
+    __slots__ = ('value', 'quote')
+
+    def __init__(self, value, quote=None):
+        self.value = value
+        self.quote = quote
+
+
+class _Parser(object):
+    def __init__(self, source):
+        self.s = source
+        self.i = 0
+        self.n = len(source)
+
+    def error(self, message):
+        raise SidebarSyntaxError(message, self.s, self.i)
+
+    def skip(self):
+        s, n = self.s, self.n
+        while self.i < n:
+            c = s[self.i]
+            if c in ' \t\r\n':
+                self.i += 1
+            elif s.startswith('//', self.i):
+                j = s.find('\n', self.i)
+                self.i = n if j == -1 else j + 1
+            elif s.startswith('/*', self.i):
+                j = s.find('*/', self.i + 2)
+                if j == -1:
+                    self.error('注释未闭合')
+                self.i = j + 2
+            else:
+                break
+
+    def value(self):
+        self.skip()
+        if self.i >= self.n:
+            self.error('意外的文件结尾')
+        c = self.s[self.i]
+        start = self.i
+        if c == '{':
+            node = self.obj()
+        elif c == '[':
+            node = self.arr()
+        elif c in '\'"':
+            node = JSValue(self.string(), c)
+        else:
+            m = _NUMBER.match(self.s, self.i)
+            if m:
+                text = m.group(0)
+                node = JSValue(float(text) if '.' in text else int(text))
+                self.i = m.end()
+            else:
+                m = _IDENT.match(self.s, self.i)
+                if not m or m.group(0) not in ('true', 'false', 'null'):
+                    self.error('无法识别的值')
+                node = JSValue({'true': True, 'false': False, 'null': None}[m.group(0)])
+                self.i = m.end()
+        node.start = start
+        node.end = self.i
+        return node
+
+    def string(self):
+        quote = self.s[self.i]
+        self.i += 1
+        out = []
+        while True:
+            if self.i >= self.n or self.s[self.i] == '\n':
+                self.error('字符串未闭合')
+            c = self.s[self.i]
+            if c == quote:
+                self.i += 1
+                return ''.join(out)
+            if c == '\\':
+                nxt = self.s[self.i + 1]
+                if nxt == 'u':
+                    out.append(chr(int(self.s[self.i + 2:self.i + 6], 16)))
+                    self.i += 6
+                    continue
+                out.append(_ESCAPES.get(nxt, nxt))
+                self.i += 2
+                continue
+            out.append(c)
+            self.i += 1
+
+    def obj(self):
+        node = JSObject()
+        self.i += 1
+        while True:
+            self.skip()
+            if self.i < self.n and self.s[self.i] == '}':
+                self.i += 1
+                return node
+            key_start = self.i
+            if self.s[self.i] in '\'"':
+                key = self.string()
+            else:
+                m = _IDENT.match(self.s, self.i)
+                if not m:
+                    self.error('缺少对象键')
+                key = m.group(0)
+                self.i = m.end()
+            self.skip()
+            if self.i >= self.n or self.s[self.i] != ':':
+                self.error("缺少 ':'")
+            self.i += 1
+            node.entries.append((key, self.value(), key_start))
+            self.separator('}')
+
+    def arr(self):
+        node = JSArray()
+        self.i += 1
+        while True:
+            self.skip()
+            if self.i < self.n and self.s[self.i] == ']':
+                self.i += 1
+                return node
+            node.items.append(self.value())
+            self.separator(']')
+
+    def separator(self, close):
+        self.skip()
+        if self.i < self.n and self.s[self.i] == ',':
+            self.i += 1
+        elif self.i >= self.n or self.s[self.i] != close:
+            self.error(f"缺少 ',' 或 '{close}'")
+
+
+def parse_literal(source, start=0):
+    """从 start 处解析一个字面量，返回节点"""
+    parser = _Parser(source)
+    parser.i = start
+    return parser.value()
+
+
+class SidebarItem(object):
+    """侧边栏条目"""
+
+    __slots__ = ('node', 'module', 'parent', 'depth', 'items')
+
+    def __init__(self, node, module, parent, depth):
+        self.node = node
+        self.module = module
+        self.parent = parent
+        self.depth = depth
+        self.items = []
+
+    def _get(self, key):
+        v = self.node.get(key)
+        return v.value if isinstance(v, JSValue) else None
+
+    @property
+    def text(self):
+        return self._get('text') or ''
+
+    @property
+    def link(self):
+        return self._get('link')
+
+    @property
+    def collapsible(self):
+        return self._get('collapsible')
+
+    @property
+    def collapsed(self):
+        return self._get('collapsed')
+
+    @property
+    def chapter(self):
+        """条目文本中的章节编号（第X章），没有则为 None"""
+        m = _CHAPTER.search(self.text)
+        return int(m.group(1)) if m else None
+
+    @property
+    def page(self):
+        """链接对应的 docs/ 相对路径"""
+        link = self.link
+        if not link or '://' in link:
+            return None
+        return url_to_page(link)
+
+    @property
+    def anchor(self):
+        link = self.link
+        if link and '#' in link:
+            return link.split('#', 1)[1]
+        return None
+
+    def walk(self):
+        yield self
+        for child in self.items:
+            yield from child.walk()
+
+
+class Sidebar(object):
+    """侧边栏模型：modules 为 {模块前缀: [顶层条目]}，保持源码顺序"""
+
+    def __init__(self, source, root_node, path=None):
+        self.source = source
+        self.root_node = root_node
+        self.path = path
+        self.modules = {}
+        for prefix, value, _ in root_node.entries:
+            if isinstance(value, JSArray):
+                self.modules[prefix] = [self._build(v, prefix, None, 0)
+                                        for v in value.items if isinstance(v, JSObject)]
+
+    def _build(self, node, module, parent, depth):
+        item = SidebarItem(node, module, parent, depth)
+        children = node.get('items')
+        if isinstance(children, JSArray):
+            item.items = [self._build(v, module, item, depth + 1)
+                          for v in children.items if isinstance(v, JSObject)]
+        return item
+
+    def line_of(self, pos):
+        """字符偏移对应的行号（从 1 开始）"""
+        return self.source.count('\n', 0, pos) + 1
+
+    def walk(self, module=None):
+        """按阅读顺序遍历条目"""
+        for prefix, items in self.modules.items():
+            if module is not None and prefix != module:
+                continue
+            for item in items:
+                yield from item.walk()
+
+    def links(self, module=None):
+        """按阅读顺序返回所有带链接的条目"""
+        return [item for item in self.walk(module) if item.link]
+
+    def module_for(self, name):
+        """按模块名（如 ai）查找模块前缀（如 /ai/）"""
+        prefix = f'/{name}/'
+        return prefix if prefix in self.modules else None
+
+    def chapters(self, module):
+        """模块内所有章节编号（已排序去重）"""
+        return sorted({item.chapter for item in self.walk(module) if item.chapter is not None})
+
+
+def js_string(value, quote='"'):
+    """生成 JavaScript 字符串字面量"""
+    escaped = value.replace('\\', '\\\\').replace(quote, '\\' + quote).replace('\n', '\\n')
+    return f'{quote}{escaped}{quote}'
+
+
+def iter_values(node, key=None):
+    """深度优先遍历字面量树，返回 (键, 标量节点)；key 不为空时只返回该键的值"""
+    if isinstance(node, JSObject):
+        for k, v, _ in node.entries:
+            if isinstance(v, JSValue):
+                if key is None or k == key:
+                    yield k, v
+            else:
+                yield from iter_values(v, key)
+    elif isinstance(node, JSArray):
+        for v in node.items:
+            yield from iter_values(v, key)
+
+
+def to_python(node):
+    """字面量树 → Python 值（对象为 dict，保持键的顺序）"""
+    if isinstance(node, JSObject):
+        return {k: to_python(v) for k, v, _ in node.entries}
+    if isinstance(node, JSArray):
+        return [to_python(v) for v in node.items]
+    return node.value
+
+
+def parse_export(source, name):
+    """解析 export const <name> = <字面量>"""
+    m = re.search(r'export\s+const\s+' + name + r'\s*(?::[^=]+)?=\s*', source)
+    if not m:
+        raise SidebarSyntaxError(f'未找到 export const {name}', source, 0)
+    return parse_literal(source, m.end())
+
+
+def parse_sidebar(source, path=None):
+    """解析 sidebar.ts 源码"""
+    node = parse_export(source, 'sidebar')
+    if not isinstance(node, JSObject):
+        raise SidebarSyntaxError('sidebar 不是对象', source, node.start)
+    return Sidebar(source, node, path)
+
+
+def load_sidebar(root='.'):
+    """读取并解析项目的 sidebar.ts"""
+    path = Path(root) / SIDEBAR_FILE
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_sidebar(f.read(), path)
+
+
+# ========== 结构化编辑 ==========
+
+# 与 prettier 默认配置一致：行宽 80、缩进 2 个空格、多行数组和对象使用尾随逗号
+PRINT_WIDTH = 80
+
+
+def js_value(value, quote='"'):
+    """生成标量的 JavaScript 字面量"""
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if value is None:
+        return 'null'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return js_string(value, quote)
+
+
+def _js_key(key, quote):
+    return key if _IDENT.fullmatch(key) else js_string(key, quote)
+
+
+def format_node(fields, indent, quote='"', unit='  ', inline=None):
+    """把 {键: 值} 格式化为侧边栏条目字面量（值可以是标量或条目列表）
+
+    与 prettier 的输出保持一致：放得下一行且没有子条目时写成一行，否则每个键一行。
+    inline 为 True / False 时强制单行或多行。
+    """
+    parts = []
+    nested = False
+    for key, value in fields.items():
+        if isinstance(value, list):
+            nested = nested or bool(value)
+            continue
+        parts.append(f'{_js_key(key, quote)}: {js_value(value, quote)}')
+    if inline is None:
+        flat = '{ ' + ', '.join(parts) + ' }'
+        inline = not nested and len(indent) + len(flat) + 1 <= PRINT_WIDTH
+    if inline:
+        entries = [f'{_js_key(k, quote)}: ' + (format_array(v, indent, quote, unit, True)
+                                                if isinstance(v, list) else js_value(v, quote))
+                   for k, v in fields.items()]
+        return '{ ' + ', '.join(entries) + ' }'
+    inner = indent + unit
+    lines = []
+    for key, value in fields.items():
+        if isinstance(value, list):
+            text = format_array(value, inner, quote, unit)
+        else:
+            text = js_value(value, quote)
+        lines.append(f'{inner}{_js_key(key, quote)}: {text},')
+    return '{\n' + '\n'.join(lines) + '\n' + indent + '}'
+
+
+def format_array(items, indent, quote='"', unit='  ', inline=False):
+    """把条目列表格式化为数组字面量"""
+    if not items:
+        return '[]'
+    if inline:
+        return '[' + ', '.join(format_node(f, indent, quote, unit, True) for f in items) + ']'
+    inner = indent + unit
+    rows = [inner + format_node(f, inner, quote, unit) + ',' for f in items]
+    return '[\n' + '\n'.join(rows) + '\n' + indent + ']'
+
+
+class SidebarEditor(object):
+    """在解析后的侧边栏模型上做结构化编辑，只重写受影响的源码片段
+
+        editor = SidebarEditor(load_sidebar())
+        editor.relink(item, '/ai/chapter-05#rag')              # 修改链接
+        editor.unset(item, 'collapsible')                      # 删除字段
+        editor.remove(item)                                    # 删除条目
+        editor.insert(group, 0, {'text': '新章节', 'link': '/ai/chapter-09'})
+        editor.move(item, '/ai/', 2)                           # 移动到模块顶层第 3 项之前
+        editor.emit(edits)                                     # 登记到 EditSet，或 render() 取得新源码
+
+    修改标量只替换字面量本身；删除、插入、移动会重新拼接所在数组的内部：保留的条目原样复制
+    （包括缩进、注释和其中嵌套的修改），新条目按兄弟条目的缩进、引号和单行/多行风格生成。
+    所有修改在最后一次性拼接，不论有多少处修改都只遍历一次源码。
+    """
+
+    def __init__(self, sidebar, file=SIDEBAR_FILE):
+        self.sidebar = sidebar
+        self.source = sidebar.source
+        self.file = file
+        self.quote = '"'
+        for _, node in iter_values(sidebar.root_node):
+            if node.quote:
+                self.quote = node.quote
+                break
+        m = re.search(r'^([ \t]+)\S', self.source, re.M)
+        self.unit = m.group(1) if m else '  '
+        self._values = {}
+        self._arrays = {}
+        self._appends = {}
+
+    def __bool__(self):
+        return bool(self._values or self._arrays or self._appends)
+
+    # ---------- 源码位置 ----------
+
+    def _line_start(self, pos):
+        return self.source.rfind('\n', 0, pos) + 1
+
+    def _line_indent(self, pos):
+        start = self._line_start(pos)
+        end = start
+        while end < len(self.source) and self.source[end] in ' \t':
+            end += 1
+        return self.source[start:end]
+
+    def _own_line(self, node):
+        """节点是否位于行首（前面只有缩进）"""
+        return self._own_line_at(node.start)
+
+    def _own_line_at(self, pos):
+        return self.source[self._line_start(pos):pos].strip() == ''
+
+    def _comma_after(self, pos):
+        """pos 之后（跳过空格）紧跟逗号时返回逗号之后的偏移"""
+        i = pos
+        while i < len(self.source) and self.source[i] in ' \t':
+            i += 1
+        return i + 1 if i < len(self.source) and self.source[i] == ',' else None
+
+    # ---------- 编辑操作 ----------
+
+    def set(self, item, key, value):
+        """修改条目的标量字段；字段不存在时追加到对象末尾"""
+        node = item.node.get(key)
+        if isinstance(node, JSValue):
+            self._values[(node.start, node.end)] = js_value(value, node.quote or self.quote)
+        elif node is not None:
+            raise ValueError(f'{key} 不是标量字段')
+        else:
+            self._append(item.node)[1].append((key, value))
+
+    def relink(self, item, link):
+        self.set(item, 'link', link)
+
+    def unset(self, item, key):
+        """删除条目的标量字段（连同逗号；字段独占一行时删除整行），字段不存在时忽略"""
+        for k, node, key_start in item.node.entries:
+            if k == key:
+                break
+        else:
+            return
+        if not isinstance(node, JSValue):
+            raise ValueError(f'{key} 不是标量字段')
+        comma = self._comma_after(node.end)
+        end = comma if comma is not None else node.end
+        line_end = self.source.find('\n', end)
+        line_end = len(self.source) if line_end < 0 else line_end
+        if self._own_line_at(key_start) and self.source[end:line_end].strip() == '':
+            start, end = self._line_start(key_start), min(line_end + 1, len(self.source))
+        elif comma is not None:
+            start = key_start
+            while end < len(self.source) and self.source[end] in ' \t':
+                end += 1
+        else:
+            # 最后一个字段：连同前面的逗号一起删除
+            start = key_start
+            before = self.source[:key_start].rstrip()
+            if before.endswith(','):
+                start = len(before) - 1
+        self._values[(start, end)] = ''
+
+    def remove(self, item):
+        """删除条目（连同子条目）"""
+        order, index = self._locate(item)
+        del order[index]
+
+    def insert(self, parent, index, fields):
+        """在 parent（条目或模块前缀，如 '/ai/'）的第 index 个子条目之前插入；index 为 None 时追加"""
+        order = self._order(parent)
+        order.insert(len(order) if index is None else index, ('new', fields))
+
+    def move(self, item, parent, index=None):
+        """把条目（连同子条目和其中的修改）移动到 parent 的第 index 个子条目之前"""
+        order, position = self._locate(item)
+        del order[position]
+        target = self._order(parent)
+        target.insert(len(target) if index is None else index, ('node', item.node))
+
+    def _append(self, obj):
+        if not obj.entries:
+            raise ValueError('不支持向空对象追加字段')
+        if id(obj) not in self._appends:
+            self._appends[id(obj)] = (obj, [], [])
+        return self._appends[id(obj)]
+
+    def _order(self, parent):
+        """parent 子条目的编辑后顺序：[('node', 原节点) 或 ('new', 字段)]"""
+        if isinstance(parent, str):
+            arr = self.sidebar.root_node.get(parent)
+            if not isinstance(arr, JSArray):
+                raise ValueError(f'sidebar.ts 中没有模块 {parent}')
+        else:
+            arr = parent.node.get('items')
+            if not isinstance(arr, JSArray):
+                # 条目原本没有 items，追加一个新的子条目数组
+                return self._append(parent.node)[2]
+        if id(arr) not in self._arrays:
+            self._arrays[id(arr)] = (arr, [('node', n) for n in arr.items])
+        return self._arrays[id(arr)][1]
+
+    def _locate(self, item):
+        self._order(item.parent if item.parent is not None else item.module)
+        orders = [o for _, o in self._arrays.values()] + [o for _, _, o in self._appends.values()]
+        for order in orders:
+            for i, (kind, value) in enumerate(order):
+                if kind == 'node' and value is item.node:
+                    return order, i
+        raise ValueError(f'条目已被删除: {item.text}')
+
+    # ---------- 生成 ----------
+
+    def _spans(self, start, end):
+        """[start, end) 内最外层的修改 [(起始, 结束, 生成函数)]；嵌套的修改在生成外层片段时递归应用"""
+        spans = []
+        for (s, e), text in self._values.items():
+            if start <= s and e <= end:
+                spans.append((s, e, lambda text=text: text))
+        for arr, order in self._arrays.values():
+            if start <= arr.start and arr.end <= end:
+                spans.append((arr.start, arr.end, lambda arr=arr, order=order: self._render_array(arr, order)))
+        for obj, fields, order in self._appends.values():
+            if start <= obj.start and obj.end <= end and (fields or order):
+                fn = lambda obj=obj, f=fields, o=order: self._render_append(obj, f, o)
+                if self._multiline_object(obj):
+                    pos = self._comma_after(obj.entries[-1][1].end) or obj.entries[-1][1].end
+                    spans.append((pos, pos, fn))
+                else:
+                    # 单行对象追加字段后可能超出行宽，整体重新生成
+                    spans.append((obj.start, obj.end, fn))
+        spans.sort(key=lambda s: (s[0], -s[1]))
+        result = []
+        pos = start
+        for s, e, fn in spans:
+            if s >= pos:
+                result.append((s, e, fn))
+                pos = e
+            elif e > pos:
+                raise EditConflict(f'{self.file}: 修改区间重叠（偏移 {s}）')
+        return result
+
+    def render_range(self, start, end):
+        """生成 [start, end) 这段源码修改后的内容"""
+        out = []
+        pos = start
+        for s, e, fn in self._spans(start, end):
+            out.append(self.source[pos:s])
+            out.append(fn())
+            pos = e
+        out.append(self.source[pos:end])
+        return ''.join(out)
+
+    def render(self):
+        """修改后的完整源码"""
+        return self.render_range(0, len(self.source))
+
+    def spans(self):
+        """最外层的修改片段 [(起始, 结束, 新文本)]"""
+        return [(s, e, fn()) for s, e, fn in self._spans(0, len(self.source))]
+
+    def emit(self, edits):
+        """把修改登记到 EditSet，与其他文件的修改一起原子提交"""
+        edits.preload(self.file, self.source)
+        for start, end, text in self.spans():
+            edits.replace(self.file, start, end, text)
+
+    def _multiline_object(self, obj):
+        return self._line_start(obj.entries[0][2]) != self._line_start(obj.start)
+
+    def _render_append(self, obj, fields, order):
+        """追加字段（包括新建的 items 数组）：多行对象返回插入的文本，单行对象返回整个对象"""
+        texts = [f'{_js_key(k, self.quote)}: {js_value(v, self.quote)}' for k, v in fields]
+        if self._multiline_object(obj):
+            indent = self._line_indent(obj.entries[-1][2])
+            if order:
+                items = self._render_entries(order, indent, indent + self.unit, False,
+                                             col=len(indent) + len('items: '))
+                texts.append(f'items: {items}')
+            lead = '' if self._comma_after(obj.entries[-1][1].end) else ','
+            return lead + ''.join(f'\n{indent}{t},' for t in texts)
+
+        entries = [self.source[k:v.start] + self.render_range(v.start, v.end) for _, v, k in obj.entries]
+        flat = '{ ' + ', '.join(entries + texts) + ' }'
+        if not order and '\n' not in flat and self._column(obj.start) + len(flat) + 1 <= PRINT_WIDTH:
+            return flat
+        indent = self._line_indent(obj.start)
+        inner = indent + self.unit
+        if order:
+            items = self._render_entries(order, inner, inner + self.unit, False, col=len(inner) + len('items: '))
+            texts.append(f'items: {items}')
+        return '{\n' + ''.join(f'{inner}{t},\n' for t in entries + texts) + indent + '}'
+
+    def _column(self, pos):
+        return pos - self._line_start(pos)
+
+    def _render_array(self, arr, order):
+        outer = self._line_indent(arr.start)
+        if arr.items:
+            multiline = all(self._own_line(n) for n in arr.items)
+        else:
+            multiline = '\n' in self.source[arr.start:arr.end]
+        indent = self._line_indent(arr.items[0].start) if multiline and arr.items else outer + self.unit
+        return self._render_entries(order, outer, indent, multiline, arr, self._column(arr.start))
+
+    def _render_entries(self, order, outer, indent, multiline, arr=None, col=0):
+        """拼接数组：原有条目原样复制，移动来的条目调整缩进，新条目按风格生成"""
+        if not order:
+            return '[]'
+        if not multiline:
+            parts = [format_node(v, indent, self.quote, self.unit, True) if kind == 'new'
+                     else self.render_range(v.start, v.end) for kind, v in order]
+            flat = '[' + ', '.join(parts) + ']'
+            # prettier 只把单个对象的数组保持在一行；原本就写成一行的数组保持原样
+            keep_inline = len(parts) == 1 or (arr is not None and len(arr.items) > 1)
+            if keep_inline and '\n' not in flat and col + len(flat) + 1 <= PRINT_WIDTH:
+                return flat
+
+        segments = {}
+        if arr is not None and arr.items and all(self._own_line(n) for n in arr.items):
+            segments = self._segments(arr)
+        rows = []
+        for kind, value in order:
+            if kind == 'new':
+                rows.append(f'{indent}{format_node(value, indent, self.quote, self.unit)},\n')
+                continue
+            body = self.render_range(value.start, value.end)
+            seg = segments.get(id(value))
+            if seg is None:
+                # 移动来的条目或由单行改为多行的条目
+                rows.append(indent + _reindent(body, self._line_indent(value.start), indent) + ',\n')
+                continue
+            start, comma, end = seg
+            after = self.source[value.end:end]
+            rows.append(self.source[start:value.start] + body + (after if comma else ',' + after))
+        if segments:
+            head = self.source[arr.start + 1:segments[id(arr.items[0])][0]]
+            tail = self.source[segments[id(arr.items[-1])][2]:arr.end - 1]
+        else:
+            head, tail = '\n', outer
+        return '[' + head + ''.join(rows) + tail + ']'
+
+    def _segments(self, arr):
+        """多行数组中每个条目占据的源码：{id(节点): (起始, 逗号之后或 None, 结束)}
+
+        起始为上一个条目所在行之后（包含条目前的注释行），结束为条目最后一行的换行符之后。
+        """
+        result = {}
+        prev_end = None
+        for node in arr.items:
+            start = prev_end if prev_end is not None else self._line_start(node.start)
+            comma = self._comma_after(node.end)
+            eol = self.source.find('\n', comma or node.end)
+            end = min(len(self.source) if eol == -1 else eol + 1, arr.end - 1)
+            result[id(node)] = (start, comma, end)
+            prev_end = end
+        return result
+
+
+def _reindent(text, old, new):
+    """调整多行文本除首行外的缩进"""
+    if old == new or '\n' not in text:
+        return text
+    lines = text.split('\n')
+    for i in range(1, len(lines)):
+        if lines[i].startswith(old):
+            lines[i] = new + lines[i][len(old):]
+    return '\n'.join(lines)
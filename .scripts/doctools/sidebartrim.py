@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+侧边栏精简 - 删除 sidebar.ts 中不起作用的字段
+
+VitePress 1.x 只根据 collapsed 判断分组能否折叠，collapsible 不起作用，却会随 themeConfig
+写入每个页面的站点数据（__VP_SITE_DATA__）。这里通过 SidebarEditor 直接从 sidebar.ts 中删除
+这些字段，只改动字段所在的行，其余格式与注释保持不变；config.ts 仍直接导入 sidebar.ts。
+
+加 --check 时只检查不写入，发现残留字段时返回 1。
+"""
+
+import json
+
+from .common import SIDEBAR_FILE
+from .edits import EditConflict, EditSet
+from .sidebar import SidebarEditor, SidebarSyntaxError, load_sidebar, parse_sidebar, to_python
+
+# VitePress 1.x 不使用的字段
+IGNORED_KEYS = ('collapsible',)
+
+
+def _site_data_bytes(sidebar):
+    """侧边栏序列化为 JSON 后的大小（即随每个页面下发的部分）"""
+    data = {prefix: to_python(sidebar.root_node.get(prefix)) for prefix in sidebar.modules}
+    return len(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def _without_ignored(value):
+    if isinstance(value, list):
+        return [_without_ignored(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _without_ignored(v) for k, v in value.items() if k not in IGNORED_KEYS}
+    return value
+
+
+def plan_trim(sidebar):
+    """删除不起作用的字段：返回 (SidebarEditor, [(条目, 字段)])"""
+    editor = SidebarEditor(sidebar)
+    found = []
+    for item in sidebar.walk():
+        for key in IGNORED_KEYS:
+            if item.node.get(key) is not None:
+                editor.unset(item, key)
+                found.append((item, key))
+    return editor, found
+
+
+def cmd_sidebar_trim(args):
+    """删除 sidebar.ts 中不起作用的字段"""
+    print("=== 精简侧边栏 ===\n")
+    try:
+        sidebar = load_sidebar(args.root)
+    except (OSError, SidebarSyntaxError) as e:
+        print(f"❌ 错误: 无法解析 sidebar.ts: {e}")
+        return 2
+    editor, found = plan_trim(sidebar)
+    if not found:
+        print(f"✅ {SIDEBAR_FILE} 中没有不起作用的字段")
+        return 0
+
+    counts = {}
+    for _, key in found:
+        counts[key] = counts.get(key, 0) + 1
+    for key, count in counts.items():
+        print(f"  🗑️  {key}: {count} 处")
+
+    # 修改后的源码必须能解析，且除删除的字段外与原模型一致
+    trimmed = parse_sidebar(editor.render(), SIDEBAR_FILE)
+    if _without_ignored(to_python(sidebar.root_node)) != to_python(trimmed.root_node):
+        print("\n❌ 错误: 删除字段后侧边栏结构发生了变化，未写入")
+        return 2
+    before, after = _site_data_bytes(sidebar), _site_data_bytes(trimmed)
+    print(f"\n站点数据中的侧边栏: {before:,} → {after:,} 字节（每个页面节省 {before - after:,} 字节）")
+
+    if args.check:
+        print("\n⚠️  运行 bash .scripts/doc-tools.sh sidebar-trim 删除这些字段")
+        return 1
+    edits = EditSet(args.root)
+    editor.emit(edits)
+    try:
+        edits.apply()
+    except EditConflict as e:
+        print(f"\n❌ 错误: {e}")
+        return 1
+    print(f"\n✅ 已删除 {len(found)} 个字段")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('sidebar-trim', help='删除 sidebar.ts 中不起作用的字段（如 collapsible），减小每个页面的站点数据')
+    p.add_argument('--check', action='store_true', help='只检查，不写入')
+    p.set_defaults(func=cmd_sidebar_trim)
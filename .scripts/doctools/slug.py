@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+标题锚点生成 - 与 VitePress（markdown-it-anchor + @mdit-vue/shared）的 slugify 保持一致
+"""
+
+import re
+import unicodedata
+
+from .text import strip_inline
+
+_CONTROL = re.compile(r'[\u0000-\u001f]')
+_SPECIAL = re.compile(r'[\s~`!@#$%^&*()\-_+=\[\]{}|\\;:"\'“”‘’<>,.?/]+')
+_COMBINING = re.compile(r'[\u0300-\u036f]')
+_EXPLICIT = re.compile(r'\s*\{#([^}]+)\}\s*$')
+
+
+def slugify(text):
+    """按 VitePress 规则生成锚点"""
+    s = unicodedata.normalize('NFKD', text)
+    s = _COMBINING.sub('', s)
+    s = _CONTROL.sub('', s)
+    s = _SPECIAL.sub('-', s)
+    s = re.sub(r'-{2,}', '-', s)
+    s = s.strip('-')
+    s = re.sub(r'^(\d)', r'_\1', s)
+    return s.lower()
+
+
+def split_heading(raw_title):
+    """拆分标题文本与显式锚点，返回 (标题文本, 显式锚点或 None)"""
+    match = _EXPLICIT.search(raw_title)
+    if match:
+        return raw_title[:match.start()].rstrip(), match.group(1)
+    return raw_title.strip(), None
+
+
+class AnchorAllocator(object):
+    """为同一页面内的标题分配锚点，重复锚点按 markdown-it-anchor 规则追加 -1、-2 后缀"""
+
+    def __init__(self):
+        self.used = set()
+
+    def allocate(self, title, explicit=None):
+        if explicit:
+            self.used.add(explicit)
+            return explicit
+        base = slugify(strip_inline(title))
+        slug = base
+        i = 1
+        while slug in self.used:
+            slug = f'{base}-{i}'
+            i += 1
+        self.used.add(slug)
+        return slug
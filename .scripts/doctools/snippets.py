@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+代码块外置 - 把超过阈值的大代码块按内容去重写入 docs/snippets/，页面中改为 VitePress 代码片段引用
+
+    ```python                        <<< @/snippets/3f2a9c1d0b7e4a65.py{python}
+    ...（4 KB 代码）          →
+    ```
+
+同一段代码在多个页面（如 guide/appendix-projects.md 与各章节的实战项目）重复出现时只保存一份，
+文件名为内容哈希的前 16 位；已存在的同内容片段文件直接复用，重复运行不会产生新文件。
+渲染结果不变：片段文件内容即原代码块正文，语言通过 {lang} 显式指定。
+
+只处理能被 <<< 等价替换的代码块：
+    - 顶层代码块（列表 / 容器内缩进的代码块不处理）
+    - info 只有语言名（带 {1,3}、[标题]、:line-numbers 等参数的不处理）
+    - mermaid 等由插件按围栏渲染的语言不处理
+
+所有修改（页面改写与新建片段文件）通过 EditSet 一次性原子提交，每个页面只写一次。
+"""
+
+import re
+
+from .common import DOCS_DIR, content_hash
+from .corpus import load_corpus
+from .edits import EditConflict, EditSet
+
+SNIPPETS_DIR = DOCS_DIR + '/snippets'
+DEFAULT_MIN_BYTES = 4096
+NAME_LENGTH = 16
+
+# 由插件把围栏渲染为图表等内容的语言，改为片段引用后不再生效
+EXCLUDED_LANGS = {'mermaid'}
+
+EXTENSIONS = {
+    'bash': 'sh', 'shell': 'sh', 'sh': 'sh', 'zsh': 'sh',
+    'python': 'py', 'python3': 'py', 'py': 'py',
+    'typescript': 'ts', 'ts': 'ts', 'tsx': 'tsx',
+    'javascript': 'js', 'js': 'js', 'jsx': 'jsx', 'mjs': 'js',
+    'yaml': 'yml', 'yml': 'yml',
+    'java': 'java', 'groovy': 'groovy', 'go': 'go', 'lua': 'lua',
+    'vue': 'vue', 'html': 'html', 'css': 'css', 'scss': 'scss', 'less': 'less',
+    'sql': 'sql', 'json': 'json', 'xml': 'xml', 'toml': 'toml', 'ini': 'ini',
+    'properties': 'properties', 'dockerfile': 'dockerfile', 'nginx': 'conf', 'conf': 'conf',
+    'hcl': 'tf', 'prisma': 'prisma', 'powershell': 'ps1',
+}
+
+_SIMPLE_INFO = re.compile(r'^[a-z0-9_+#-]*$')
+
+
+class ExternalSnippet(object):
+    """一个外置的代码块"""
+
+    __slots__ = ('page', 'line', 'lang', 'name', 'removed')
+
+    def __init__(self, page, line, lang, name, removed):
+        self.page = page
+        self.line = line
+        self.lang = lang
+        self.name = name
+        self.removed = removed
+
+
+def snippet_extension(lang):
+    # 扩展名仅便于阅读，高亮语言由引用中的 {lang} 决定；.md 会被 VitePress 当作页面构建
+    return EXTENSIONS.get(lang, 'txt')
+
+
+def include_line(name, lang):
+    """VitePress 代码片段引用"""
+    return f'<<< @/snippets/{name}' + (f'{{{lang}}}' if lang else '')
+
+
+def plan_externalize(root='.', min_bytes=DEFAULT_MIN_BYTES, langs=None, pages=None):
+    """计算外置方案，返回 (EditSet, [ExternalSnippet], 新建的片段文件数)"""
+    corpus = load_corpus(root)
+    edits = EditSet(root)
+    snippets_dir = corpus.root / SNIPPETS_DIR
+    result = []
+    names = {}
+    created = 0
+    for page in corpus:
+        if pages and page.path not in pages:
+            continue
+        file = f'{DOCS_DIR}/{page.path}'
+        text = None
+        for fence in page.fences:
+            if fence.indent or fence.lang in EXCLUDED_LANGS or not _SIMPLE_INFO.match(fence.lang):
+                continue
+            if langs and fence.lang not in langs:
+                continue
+            if text is None:
+                text = edits.text(file)
+                lines = text.split('\n')
+            close = lines[fence.end - 1].strip()
+            if fence.end == fence.line or not close or close != close[0] * len(close) or close[0] not in '`~':
+                # 未闭合的代码块
+                continue
+            body = '\n'.join(l[:-1] if l.endswith('\r') else l for l in lines[fence.line:fence.end - 1])
+            data = body.encode('utf-8')
+            if len(data) < min_bytes:
+                continue
+
+            digest = content_hash(data)
+            name = names.get(digest)
+            if name is None:
+                name = f'{digest[:NAME_LENGTH]}.{snippet_extension(fence.lang)}'
+                target = snippets_dir / name
+                content = body + '\n'
+                if target.exists():
+                    if target.read_text(encoding='utf-8') != content:
+                        raise EditConflict(f'{SNIPPETS_DIR}/{name} 已存在且内容不同')
+                else:
+                    edits.create(f'{SNIPPETS_DIR}/{name}', content)
+                    created += 1
+                names[digest] = name
+
+            start, _ = edits.line_span(file, fence.line)
+            _, end = edits.line_span(file, fence.end)
+            if text[end - 1:end] == '\r':
+                end -= 1
+            include = include_line(name, fence.lang)
+            edits.replace(file, start, end, include)
+            removed = len(text[start:end].encode('utf-8')) - len(include.encode('utf-8'))
+            result.append(ExternalSnippet(page.path, fence.line, fence.lang, name, removed))
+    return edits, result, created
+
+
+def cmd_externalize_snippets(args):
+    """外置大代码块"""
+    print(f"=== 外置大代码块（≥ {args.min_bytes:,} 字节）===\n")
+    try:
+        edits, snippets, created = plan_externalize(
+            args.root, args.min_bytes, set(args.lang) if args.lang else None,
+            set(p[len(DOCS_DIR) + 1:] if p.startswith(DOCS_DIR + '/') else p for p in args.pages))
+        plan = edits.apply(dry_run=True)
+    except (OSError, EditConflict) as e:
+        print(f"❌ 错误: {e}")
+        return 1
+
+    if not snippets:
+        print("✅ 没有需要外置的代码块")
+        return 0
+
+    print("[步骤 1/2] 计算修改...\n")
+    pages = {}
+    for s in snippets:
+        pages.setdefault(s.page, []).append(s)
+    for page, items in pages.items():
+        print(f"  ✏️  {DOCS_DIR}/{page}（{len(items)} 个代码块，-{sum(s.removed for s in items):,} 字节）")
+        for s in items:
+            print(f"       :{s.line} [{s.lang or 'text'}] → {s.name}")
+
+    removed = sum(s.removed for s in snippets)
+    written = sum(len(text.encode('utf-8')) for source, text in plan.values() if source is None)
+    print(f"\n📦 {len(snippets)} 个代码块 → {len(set(s.name for s in snippets))} 个片段文件"
+          f"（新建 {created} 个，{written:,} 字节）")
+    print(f"📉 页面源码共减少 {removed:,} 字节")
+
+    if args.dry_run:
+        print("\n💡 预览模式，未写入任何文件（去掉 --dry-run 以应用修改）")
+        return 0
+
+    print("\n[步骤 2/2] 原子提交修改...\n")
+    try:
+        edits.apply()
+    except (OSError, EditConflict) as e:
+        print(f"❌ 错误: {e}")
+        return 1
+    print(f"✅ 已更新 {len(pages)} 个页面，新建 {created} 个片段文件（{SNIPPETS_DIR}/）")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('externalize-snippets',
+                              help='把大代码块按内容去重写入 docs/snippets/，页面改为 <<< 片段引用')
+    p.add_argument('pages', nargs='*', help='只处理指定页面（默认所有页面）')
+    p.add_argument('--min-bytes', type=int, default=DEFAULT_MIN_BYTES,
+                   help=f'代码块正文达到该字节数才外置（默认 {DEFAULT_MIN_BYTES}）')
+    p.add_argument('--lang', nargs='+', help='只处理指定语言，如 yaml typescript')
+    p.add_argument('--dry-run', action='store_true', help='只显示将要进行的修改')
+    p.set_defaults(func=cmd_externalize_snippets)
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+术语一致性检查 - naming-rules.md 中的术语表编译为 Aho-Corasick 自动机，单次线性扫描所有正文
+
+术语表位于 naming-rules.md 的"术语规范"一节，每行一个推荐写法和若干禁用写法：
+
+    | 推荐写法 | 禁用写法 | 说明 |
+    |------|------|------|
+    | `JavaScript` | `Javascript`、`javascript` | |
+
+匹配规则：
+    - 区分大小写
+    - 含字母数字的写法只在完整单词处匹配（`Javascript` 不会匹配 `JavascriptCore`）
+    - 纯标点写法只在两侧都是中文时匹配（`中文,中文` → `中文，中文`）
+    - 代码块、front matter、行内代码、链接地址、网址和 HTML 标签不检查
+
+无论术语表有多少条，每行文本只扫描一遍。检查作为 lint 的 terminology 规则运行，
+terms 命令输出结果，加 --fix 时通过 EditSet 一次性原子修复。标题中的写法只报告不修复：
+标题文本决定锚点，改写后所有指向旧锚点的链接都会失效，需要手动修改后运行 anchor-renames --fix。
+"""
+
+import json
+import re
+
+from .edits import EditConflict, EditSet
+from .markdown import blank_inline_code
+from .rules import Rule, corpus_files, make_engine, register_rule
+from .corpus import open_corpus
+from .gitref import GitError
+from .text import is_cjk
+
+TERMS_FILE = 'naming-rules.md'
+TERMS_SECTION = '术语规范'
+
+_BACKTICKED = re.compile(r'`([^`]+)`')
+_SEPARATOR_ROW = re.compile(r'^\|?\s*:?-+')
+# 需要屏蔽的非正文片段：链接地址、网址、HTML 标签、{#锚点}
+_MASKS = re.compile(r'\]\([^)]*\)|<[A-Za-z/!][^>]*>|https?://[^\s)>\]]+|\{#[^}]*\}')
+
+
+class AhoCorasick(object):
+    """Aho-Corasick 多模式匹配自动机
+
+    节点用并行列表保存：goto 为 {字符: 子节点}，fail 为失败指针，out 为在该节点结束的模式编号
+    （构建时沿失败指针合并）。匹配时间与文本长度和匹配数成线性关系，与模式数量无关。
+    """
+
+    __slots__ = ('goto', 'fail', 'out', 'patterns')
+
+    def __init__(self, patterns=()):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        self.patterns = []
+        for pattern in patterns:
+            self.add(pattern)
+        self.build()
+
+    def add(self, pattern):
+        """加入模式，返回模式编号"""
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            node = nxt
+        index = len(self.patterns)
+        self.patterns.append(pattern)
+        self.out[node] = self.out[node] + (index,)
+        return index
+
+    def build(self):
+        """按层（BFS）计算失败指针，并合并输出"""
+        queue = list(self.goto[0].values())
+        for node in queue:
+            self.fail[node] = 0
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                if self.out[self.fail[child]]:
+                    self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def finditer(self, text):
+        """产生 (起始偏移, 结束偏移, 模式编号)，包含重叠匹配"""
+        goto, fail, out, patterns = self.goto, self.fail, self.out, self.patterns
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for index in out[node]:
+                    yield i + 1 - len(patterns[index]), i + 1, index
+
+
+class Term(object):
+    __slots__ = ('preferred', 'banned', 'note', 'line')
+
+    def __init__(self, preferred, banned, note='', line=0):
+        self.preferred = preferred
+        self.banned = banned
+        self.note = note
+        self.line = line
+
+
+def parse_terms(text):
+    """从 naming-rules.md 文本中解析术语表，返回 [Term]"""
+    terms = []
+    in_section = False
+    in_fence = False
+    for number, line in enumerate(text.split('\n'), 1):
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        if line.startswith('#'):
+            in_section = TERMS_SECTION in line
+            continue
+        if not in_section or not line.lstrip().startswith('|') or _SEPARATOR_ROW.match(line.strip()):
+            continue
+        cells = [c.strip() for c in line.strip().strip('|').split('|')]
+        if len(cells) < 2:
+            continue
+        preferred = _BACKTICKED.findall(cells[0])
+        banned = _BACKTICKED.findall(cells[1])
+        if len(preferred) == 1 and banned:
+            note = cells[2] if len(cells) > 2 else ''
+            terms.append(Term(preferred[0], [b for b in banned if b != preferred[0]], note, number))
+    return terms
+
+
+class TermMatcher(object):
+    """术语表编译后的匹配器"""
+
+    def __init__(self, terms):
+        self.terms = terms
+        self.replacements = []
+        patterns = []
+        for term in terms:
+            for banned in term.banned:
+                patterns.append(banned)
+                self.replacements.append(term.preferred)
+        self.automaton = AhoCorasick(patterns)
+        self.wordlike = [any(c.isalnum() for c in p) for p in patterns]
+
+    def _accept(self, text, start, end, index):
+        pattern = self.automaton.patterns[index]
+        before = text[start - 1] if start > 0 else ''
+        after = text[end] if end < len(text) else ''
+        if self.wordlike[index]:
+            if pattern[0].isascii() and pattern[0].isalnum() and before.isascii() and before.isalnum():
+                return False
+            if pattern[-1].isascii() and pattern[-1].isalnum() and after.isascii() and after.isalnum():
+                return False
+            return True
+        return bool(before) and bool(after) and is_cjk(before) and is_cjk(after)
+
+    def scan(self, text):
+        """扫描一行（已屏蔽非正文片段），返回不重叠的 [(列, 禁用写法, 推荐写法)]，长匹配优先"""
+        found = [(start, end, index) for start, end, index in self.automaton.finditer(text)
+                 if self._accept(text, start, end, index)]
+        found.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        result = []
+        pos = 0
+        for start, end, index in found:
+            if start >= pos:
+                result.append((start, self.automaton.patterns[index], self.replacements[index]))
+                pos = end
+        return result
+
+
+def mask_line(line):
+    """用等长空白屏蔽行内代码、链接地址、网址与 HTML 标签，保持列位置不变"""
+    line = blank_inline_code(line)
+    if '](' in line or '<' in line or '://' in line or '{#' in line:
+        line = _MASKS.sub(lambda m: ' ' * len(m.group(0)), line)
+    return line
+
+
+@register_rule
+class TerminologyRule(Rule):
+    """术语表见 naming-rules.md"术语规范"一节"""
+
+    name = 'terminology'
+    description = '正文术语使用 naming-rules.md 术语表中的推荐写法'
+
+    def begin(self, engine):
+        self.matcher = None
+        self.matches = []
+        self.heading_lines = set()
+        corpus = getattr(engine, 'corpus', None)
+        if corpus is None:
+            return
+        try:
+            terms = parse_terms(corpus.read_file(TERMS_FILE))
+        except (OSError, GitError):
+            engine.report(self, TERMS_FILE, 1, '无法读取术语表', 'warning')
+            return
+        if terms:
+            self.matcher = TermMatcher(terms)
+
+    def on_text(self, tok, ctx):
+        if self.matcher is None or not tok.text:
+            return
+        for col, banned, preferred in self.matcher.scan(mask_line(tok.text)):
+            self.matches.append((ctx.file, tok.line, col, banned, preferred))
+            ctx.report(self, tok.line, f"'{banned}' 应写作 '{preferred}'", 'warning')
+
+    def on_heading(self, tok, ctx):
+        self.heading_lines.add((ctx.file, tok.line))
+
+
+def collect_matches(root='.', ref=None):
+    """运行术语规则，返回 (匹配列表, 扫描的文件数, 术语匹配器, 标题所在的 (文件, 行号))"""
+    with open_corpus(root, ref) as corpus:
+        engine = make_engine(['terminology'], corpus)
+        engine.run(corpus_files(corpus))
+    rule = engine.rules[0]
+    return rule.matches, len(engine.files), rule.matcher, rule.heading_lines
+
+
+def cmd_terms(args):
+    """检查或修复术语写法"""
+    try:
+        matches, total, matcher, heading_lines = collect_matches(args.root, args.ref)
+    except GitError as e:
+        print(f"❌ 错误: 无法读取 {args.ref}: {e}")
+        return 2
+    if matcher is None:
+        print(f"❌ 错误: {TERMS_FILE} 中没有找到术语表（{TERMS_SECTION}）")
+        return 2
+
+    if args.json:
+        print(json.dumps([{'file': f, 'line': l, 'col': c + 1, 'found': b, 'preferred': p}
+                          for f, l, c, b, p in matches], ensure_ascii=False, indent=2))
+        return 1 if matches else 0
+
+    print("=== 术语一致性检查 ===\n")
+    counts = {}
+    for _, _, _, banned, preferred in matches:
+        counts[(banned, preferred)] = counts.get((banned, preferred), 0) + 1
+    if not args.fix:
+        for f, l, c, banned, preferred in matches[:args.limit]:
+            print(f"  {f}:{l}:{c + 1}  '{banned}' → '{preferred}'")
+        if len(matches) > args.limit:
+            print(f"  ...（另有 {len(matches) - args.limit} 处，使用 --json 查看全部）")
+        print()
+
+    print("=" * 40)
+    print("          检查报告")
+    print("=" * 40 + "\n")
+    print(f"共扫描 {total} 个文件，术语表 {len(matcher.terms)} 条（{len(matcher.automaton.patterns)} 个禁用写法）")
+    for (banned, preferred), count in sorted(counts.items(), key=lambda kv: -kv[1])[:20]:
+        print(f"  {count:>5}  '{banned}' → '{preferred}'")
+    if not matches:
+        print("✅ 所有术语写法一致！")
+        return 0
+    if not args.fix:
+        print(f"\n⚠️  发现 {len(matches)} 处不一致（运行 terms --fix 自动修复）")
+        return 1
+
+    if args.ref:
+        print("\n❌ 错误: --fix 只能用于工作区")
+        return 2
+    # 标题文本决定锚点，自动改写会让指向旧锚点的链接失效
+    in_headings = [m for m in matches if (m[0], m[1]) in heading_lines]
+    fixable = [m for m in matches if (m[0], m[1]) not in heading_lines]
+    plan = {}
+    if fixable:
+        edits = EditSet(args.root)
+        for f, l, c, banned, preferred in fixable:
+            edits.replace_in_line(f, l, banned, preferred, c)
+        try:
+            plan = edits.apply()
+        except EditConflict as e:
+            print(f"\n❌ 错误: {e}")
+            return 1
+    print(f"\n✅ 已修复 {len(fixable)} 处，涉及 {len(plan)} 个文件")
+    if in_headings:
+        print(f"\n⚠️  {len(in_headings)} 处位于标题中，修改会改变锚点，未自动修复：")
+        for f, l, c, banned, preferred in in_headings[:args.limit]:
+            print(f"  {f}:{l}:{c + 1}  '{banned}' → '{preferred}'")
+        if len(in_headings) > args.limit:
+            print(f"  ...（另有 {len(in_headings) - args.limit} 处）")
+        print("💡 手动修改标题后运行 anchor-renames --fix 同步更新链接与侧边栏")
+        return 1
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser('terms', help='按 naming-rules.md 术语表检查并修复术语写法')
+    p.add_argument('--fix', action='store_true', help='自动修复为推荐写法')
+    p.add_argument('--limit', type=int, default=50, help='最多列出的问题数（默认 50）')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出所有问题')
+    p.add_argument('--ref', help='检查指定 git ref 而不是工作区')
+    p.set_defaults(func=cmd_terms)
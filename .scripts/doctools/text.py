@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+文本处理：行内 Markdown 清理、中日韩（CJK）二元切分 + 拉丁词分词、阅读量统计
+"""
+
+import re
+
+# CJK 统一表意文字、扩展 A、兼容表意文字、日文假名、韩文音节
+CJK_RANGES = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af'
+
+_CJK_RUN = re.compile(f'[{CJK_RANGES}]+')
+_CJK_CHAR = re.compile(f'[{CJK_RANGES}]')
+_LATIN_WORD = re.compile(r'[A-Za-z0-9]+(?:[\'’.\-][A-Za-z0-9]+)*')
+_TOKEN = re.compile(f'([{CJK_RANGES}]+)|([A-Za-z0-9][A-Za-z0-9_+#.\\-]*)')
+
+_INLINE_CODE = re.compile(r'`+([^`]*)`+')
+_IMAGE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+_LINK = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_EMPHASIS = re.compile(r'(\*{1,3}|_{1,3}|~~)(\S(?:.*?\S)?)\1')
+_HTML_TAG = re.compile(r'</?[A-Za-z][^>]*>')
+
+
+def strip_inline(text):
+    """去除行内 Markdown 标记，保留可见文本（用于锚点与检索）"""
+    text = _INLINE_CODE.sub(r'\1', text)
+    text = _IMAGE.sub(r'\1', text)
+    text = _LINK.sub(r'\1', text)
+    text = _HTML_TAG.sub('', text)
+    text = _EMPHASIS.sub(r'\2', text)
+    return text.strip()
+
+
+def is_cjk(char):
+    """判断单个字符是否属于 CJK 文字"""
+    return bool(_CJK_RUN.match(char))
+
+
+def tokenize(text):
+    """分词：CJK 连续片段切为二元组（单字片段保留单字），拉丁词转小写
+
+    例如 "Vue3响应式原理" -> ['vue3', '响应', '应式', '式原', '原理']
+    """
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        run, word = match.group(1), match.group(2)
+        if run:
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            word = word.rstrip('.-').lower()
+            if word:
+                tokens.append(word)
+    return tokens
+
+
+def count_reading_units(text):
+    """统计阅读量，返回 (CJK 字数, 拉丁词数)
+
+    中文按字计、英文按词计，二者阅读速度不同，不能简单按字符数估算。
+    """
+    cjk = len(_CJK_CHAR.findall(text))
+    words = len(_LATIN_WORD.findall(_CJK_RUN.sub(' ', text)))
+    return cjk, words
+
+
+def estimate_tokens(text):
+    """粗略估算 LLM token 数：CJK 每字约 1 个 token，其余字符（含空白）约 4 个字符 1 个 token
+
+    不依赖具体模型的分词器，结果在任何环境下都一致，可用于切分预算和缓存比较。
+    """
+    cjk = len(_CJK_CHAR.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
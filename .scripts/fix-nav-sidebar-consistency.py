@@ -3,13 +3,22 @@
 """
 自动修复顶部导航栏与侧边栏的不一致
 在 sidebar.ts 中自动添加缺失的父级分组
+
+侧边栏通过 doctools 解析为结构化模型，新分组由 SidebarEditor 插入，
+只改动插入位置，其余内容保持原有格式。
 """
 
+import os
 import re
 import sys
 import io
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from doctools.edits import EditSet
+from doctools.sidebar import SidebarEditor, SidebarSyntaxError, load_sidebar
+
 # 设置标准输出为 UTF-8 编码（Windows 兼容）
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -74,38 +83,11 @@ def extract_nav_groups(nav_file):
     return groups
 
 
-def extract_sidebar_groups(sidebar_file):
-    """从 sidebar.ts 中提取父级分组"""
-    with open(sidebar_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # 按模块分组
+def extract_sidebar_groups(sidebar):
+    """从侧边栏模型中提取每个模块的父级分组（顶层 collapsible 条目）"""
     modules = {}
-    module_pattern = r"link:\s*'/([^/]+)/'"
-
-    # 找到所有模块
-    module_links = list(re.finditer(module_pattern, content))
-
-    for i, match in enumerate(module_links):
-        module_name = match.group(1)
-
-        # 确定模块的结束位置
-        if i + 1 < len(module_links):
-            module_end = module_links[i + 1].start()
-        else:
-            module_end = len(content)
-
-        module_content = content[match.start():module_end]
-
-        # 提取父级分组（不包含 items 的 text 字段）
-        # 匹配类似：text: '基础入门', collapsible: true
-        parent_groups = re.findall(
-            r'text:\s*["\']([^"\']+)["\'],\s*collapsible:\s*true',
-            module_content
-        )
-
-        modules[module_name] = parent_groups
-
+    for prefix, items in sidebar.modules.items():
+        modules[prefix.strip('/')] = [item.text for item in items if item.collapsible]
     return modules
 
 
@@ -128,7 +110,12 @@ def add_missing_groups():
     nav_groups = extract_nav_groups(nav_file)
 
     # 提取侧边栏分组
-    sidebar_groups = extract_sidebar_groups(sidebar_file)
+    try:
+        sidebar = load_sidebar()
+    except SidebarSyntaxError as e:
+        print(f"❌ 错误: 无法解析 sidebar.ts: {e}")
+        return False
+    sidebar_groups = extract_sidebar_groups(sidebar)
 
     # 允许的不一致映射（导航栏项目 -> 侧边栏分组）
     # 这些是已知的有意设计的不一致，不需要修复
@@ -214,44 +201,25 @@ def add_missing_groups():
 
     print("[步骤 2/3] 在 sidebar.ts 中添加缺失的分组...\n")
 
-    # 读取 sidebar.ts 内容
-    with open(sidebar_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
     # 备份原文件
     backup_file = sidebar_file.with_suffix('.ts.backup.' + str(int(Path().stat().st_mtime)) + '.bak')
     import shutil
     shutil.copy2(sidebar_file, backup_file)
     print(f"✅ 已备份原文件到: {backup_file.name}\n")
 
-    # 对每个模块添加缺失的分组
+    # 所有模块的插入先在模型上完成，最后一次性写回
+    editor = SidebarEditor(sidebar)
     modified = False
     for module, groups_to_add in to_add.items():
         print(f"处理 {module} 模块...")
 
-        # 找到该模块的位置
-        module_pattern = f"link: '/{module}/'"
-        module_match = re.search(module_pattern, content)
-
-        if not module_match:
+        prefix = sidebar.module_for(module)
+        if prefix is None:
             print(f"  ⚠️  找不到模块 '{module}'")
             continue
 
-        # 确定模块区域的结束位置（下一个 link: 或文件结尾）
-        next_module_match = re.search(r"link:\s*'/[^/]+'", content[module_match.end():])
-
-        if next_module_match:
-            module_end = module_match.end() + next_module_match.start()
-        else:
-            module_end = len(content)
-
-        module_content = content[module_match.start():module_end]
-
         # 检查该模块中已有的父级分组
-        existing_groups = re.findall(
-            r'text:\s*["\']([^"\']+)["\'],\s*collapsible:\s*true',
-            module_content
-        )
+        existing_groups = sidebar_groups.get(module, [])
 
         # 只添加不存在的分组
         new_groups = []
@@ -270,42 +238,11 @@ def add_missing_groups():
             print(f"  ✅ 所有分组都已存在")
             continue
 
-        # 找到插入位置：在第一个 collapsible: true 之前或模块的 items 之前
-        insert_pos = module_match.end()
-
-        # 尝试找到第一个 collapsible 的位置
-        collapsible_match = re.search(
-            r'text:\s*["\'][^"\']+["\'],\s*collapsible:\s*true',
-            content[insert_pos:module_end]
-        )
-
-        if collapsible_match:
-            insert_pos += collapsible_match.start()
-        else:
-            # 如果没有 collapsible 分组，尝试找到 items 的位置
-            items_match = re.search(
-                r'items:\s*\[',
-                content[insert_pos:module_end]
-            )
-            if items_match:
-                insert_pos += items_match.start()
-            else:
-                print(f"  ⚠️  无法确定插入位置")
-                continue
-
-        # 生成要插入的内容
-        indent = "    "  # 4 个空格缩进
-
-        new_content = ""
-        for group in new_groups:
-            new_content += f'{indent}{{\n'
-            new_content += f'{indent}  text: "{group}",\n'
-            new_content += f'{indent}  collapsible: true,\n'
-            new_content += f'{indent}  items: []\n'
-            new_content += f'{indent}}},\n'
-
-        # 插入新内容
-        content = content[:insert_pos] + new_content + content[insert_pos:]
+        # 插入位置：第一个 collapsible 分组之前，没有分组时插在模块开头
+        items = sidebar.modules[prefix]
+        insert_at = next((i for i, item in enumerate(items) if item.collapsible), 0)
+        for offset, group in enumerate(new_groups):
+            editor.insert(prefix, insert_at + offset, {'text': group, 'collapsible': True, 'items': []})
 
         print(f"  ✅ 已添加 {len(new_groups)} 个分组")
         modified = True
@@ -317,8 +254,9 @@ def add_missing_groups():
     print("\n[步骤 3/3] 写入修复后的文件...\n")
 
     # 写入修复后的内容
-    with open(sidebar_file, 'w', encoding='utf-8') as f:
-        f.write(content)
+    edits = EditSet()
+    editor.emit(edits)
+    edits.apply()
 
     print("✅ 修复完成！\n")
     print("💡 后续步骤：")
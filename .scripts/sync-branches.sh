@@ -3,10 +3,11 @@
 # 分支同步脚本（完全自动化版）
 # 1. 自动提交更改到 dev 分支
 # 2. 推送到远端 dev
-# 3. 切换到 main 分支
-# 4. 合并 dev 到 main
-# 5. 推送 main 到远端
-# 6. 切回 dev 分支
+# 3. 校验 origin/dev 的文档（lint + 代码块，无需 checkout）
+# 4. 切换到 main 分支
+# 5. 合并 dev 到 main
+# 6. 推送 main 到远端
+# 7. 切回 dev 分支
 
 set -e
 
@@ -127,6 +128,35 @@ echo ""
 git log origin/main..origin/dev --oneline --reverse
 echo ""
 
+# 按页面和小节列出文档变化（只解析变化的文件）
+bash "$SCRIPT_DIR/doc-tools.sh" diff-sections origin/main origin/dev || true
+echo ""
+
+# 合并前校验 origin/dev（直接读取 git 对象，不切换分支、不改动工作区）
+echo "🔍 正在校验 origin/dev 的文档..."
+echo ""
+VALIDATION_OK=true
+bash "$SCRIPT_DIR/doc-tools.sh" lint --ref origin/dev || VALIDATION_OK=false
+echo ""
+bash "$SCRIPT_DIR/doc-tools.sh" check-fences --ref origin/dev || VALIDATION_OK=false
+echo ""
+bash "$SCRIPT_DIR/doc-tools.sh" chapter-manifest --ref origin/dev || VALIDATION_OK=false
+echo ""
+
+if [ "$VALIDATION_OK" != true ]; then
+  echo "⚠️  origin/dev 未通过文档校验"
+  read -p "仍要继续同步到 main 吗？(y/n) " -n 1 -r
+  echo ""
+  if [[ ! $REPLY =~ ^[Yy]$ ]]; then
+    echo "❌ 取消同步"
+    exit 1
+  fi
+  echo ""
+else
+  echo "✅ origin/dev 文档校验通过"
+  echo ""
+fi
+
 # 确认同步
 read -p "确认要将 dev 同步到 main 吗？(y/n) " -n 1 -r
 echo ""
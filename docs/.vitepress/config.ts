@@ -1,7 +1,70 @@
+import { readdirSync, readFileSync } from "node:fs";
 import { defineConfig } from "vitepress";
 import { nav } from "./nav";
 import { sidebar } from "./sidebar";
 
+// 页面最后更新时间（秒），由 .scripts/doc-tools.sh last-updated 一次 git log 遍历生成；
+// 文件不存在时不显示最后更新时间，不再逐页执行 git log
+function loadLastUpdated(): Record<string, number> {
+  try {
+    const file = new URL("../../.cache/doctools/last-updated.json", import.meta.url);
+    return JSON.parse(readFileSync(file, "utf-8")).pages ?? {};
+  } catch {
+    return {};
+  }
+}
+
+const lastUpdatedMap = loadLastUpdated();
+
+// 章节清单（阅读顺序、上一章/下一章、预计阅读时间），由 .scripts/doc-tools.sh chapter-manifest 生成，
+// 按页面链接索引；页脚的上一章/下一章与 ChapterGuide 的预计时间都从这里读取
+type ChapterRef = { title: string; link: string };
+type ChapterEntry = { link: string; estimatedTime: string; prev: ChapterRef | null; next: ChapterRef | null };
+
+function loadChapters(): Map<string, ChapterEntry> {
+  const chapters = new Map<string, ChapterEntry>();
+  const dir = new URL("./data/chapters/", import.meta.url);
+  try {
+    for (const name of readdirSync(dir)) {
+      if (!name.endsWith(".json")) continue;
+      const manifest = JSON.parse(readFileSync(new URL(name, dir), "utf-8"));
+      for (const entry of manifest.chapters as ChapterEntry[]) {
+        chapters.set(entry.link, entry);
+      }
+    }
+  } catch {
+    // 清单不存在时使用 VitePress 根据侧边栏计算的上一页/下一页
+  }
+  return chapters;
+}
+
+const chapterMap = loadChapters();
+
+function footerLink(ref: ChapterRef | null) {
+  return ref ? { text: ref.title, link: ref.link } : false;
+}
+
+// 相关阅读，由 .scripts/doc-tools.sh related-pages 生成：每行为 [链接, 标题, [相关页面下标...]]，
+// 构建时展开为每个页面自己的列表，只随该页面的数据下发
+function loadRelated(): Map<string, { title: string; link: string }[]> {
+  const related = new Map<string, { title: string; link: string }[]>();
+  try {
+    const file = new URL("./data/related.json", import.meta.url);
+    const rows: [string, string, number[]][] = JSON.parse(readFileSync(file, "utf-8")).pages;
+    for (const [link, , targets] of rows) {
+      related.set(
+        link,
+        targets.map((i) => ({ title: rows[i][1], link: rows[i][0] })),
+      );
+    }
+  } catch {
+    // 数据不存在时不显示相关阅读
+  }
+  return related;
+}
+
+const relatedMap = loadRelated();
+
 export default defineConfig({
   // 站点配置
   title: "小徐的技术充电站",
@@ -28,10 +91,8 @@ export default defineConfig({
 
   // 主题配置
   themeConfig: {
-    // 搜索配置
-    search: {
-      provider: "local",
-    },
+    // 搜索：不使用本地搜索（构建时生成并在首次搜索时下载整站索引），改由主题中的 ShardSearch
+    // 按模块懒加载 .scripts/doc-tools.sh search-index 生成的分片（docs/public/search/）
 
     // 导航
     nav,
@@ -109,4 +170,24 @@ export default defineConfig({
 
   // 开发服务器优化
   srcExclude: ['**/README.md'],
+
+  // 使用预先计算的最后更新时间与章节清单（页面 front matter 中显式设置的值优先）
+  transformPageData(pageData) {
+    const timestamp = lastUpdatedMap[pageData.relativePath];
+    if (timestamp) {
+      pageData.lastUpdated = timestamp * 1000;
+    }
+    const link = "/" + pageData.relativePath.replace(/(^|\/)index\.md$/, "$1").replace(/\.md$/, "");
+    const related = relatedMap.get(link);
+    if (related?.length) {
+      pageData.frontmatter.related ??= related;
+    }
+    const chapter = chapterMap.get(link);
+    if (chapter) {
+      const frontmatter = pageData.frontmatter;
+      frontmatter.prev ??= footerLink(chapter.prev);
+      frontmatter.next ??= footerLink(chapter.next);
+      frontmatter.estimatedTime ??= chapter.estimatedTime;
+    }
+  },
 });
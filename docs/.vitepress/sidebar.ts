@@ -2,24 +2,20 @@ export const sidebar = {
   "/interview/": [
     {
       text: "学习路线",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "学习路线", link: "/interview/" }],
     },
     {
       text: "前端开发面试题",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "学习路线", link: "/interview/frontend/" },
         {
           text: "📘 Vue3 技术栈专项",
-          collapsible: true,
           collapsed: false,
           items: [
             {
               text: "📗 中级面试题",
-              collapsible: true,
               collapsed: false,
               items: [
                 {
@@ -38,7 +34,6 @@ export const sidebar = {
             },
             {
               text: "📕 高级面试题",
-              collapsible: true,
               collapsed: false,
               items: [
                 {
@@ -51,12 +46,10 @@ export const sidebar = {
         },
         {
           text: "⚛️ React 技术栈专项",
-          collapsible: true,
           collapsed: false,
           items: [
             {
               text: "📗 中级面试题",
-              collapsible: true,
               collapsed: false,
               items: [
                 {
@@ -67,7 +60,6 @@ export const sidebar = {
             },
             {
               text: "📕 高级面试题",
-              collapsible: true,
               collapsed: false,
               items: [
                 {
@@ -80,12 +72,10 @@ export const sidebar = {
         },
         {
           text: "▲ Next.js 技术栈专项",
-          collapsible: true,
           collapsed: false,
           items: [
             {
               text: "📗 中级面试题",
-              collapsible: true,
               collapsed: false,
               items: [
                 {
@@ -96,7 +86,6 @@ export const sidebar = {
             },
             {
               text: "📕 高级面试题",
-              collapsible: true,
               collapsed: false,
               items: [
                 {
@@ -109,12 +98,10 @@ export const sidebar = {
         },
         {
           text: "🌟 Nuxt 技术栈专项",
-          collapsible: true,
           collapsed: false,
           items: [
             {
               text: "📗 中级面试题",
-              collapsible: true,
               collapsed: false,
               items: [
                 {
@@ -125,7 +112,6 @@ export const sidebar = {
             },
             {
               text: "📕 高级面试题",
-              collapsible: true,
               collapsed: false,
               items: [
                 {
@@ -140,13 +126,11 @@ export const sidebar = {
     },
     {
       text: "Java面试题",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "学习路线", link: "/interview/java/" },
         {
           text: "📗 中级面试题",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -169,7 +153,6 @@ export const sidebar = {
         },
         {
           text: "📕 高级面试题",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -188,7 +171,6 @@ export const sidebar = {
         },
         {
           text: "🚀 实战项目面试题",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -201,7 +183,6 @@ export const sidebar = {
     },
     {
       text: "数据库面试题",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "学习路线", link: "/interview/database/" },
@@ -263,7 +244,6 @@ export const sidebar = {
     },
     {
       text: "AI面试题",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "学习路线", link: "/interview/ai/" },
@@ -309,7 +289,6 @@ export const sidebar = {
     },
     {
       text: "Git面试题",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "学习路线", link: "/interview/git/" },
@@ -351,7 +330,6 @@ export const sidebar = {
     },
     {
       text: "DevOps面试题",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "学习路线", link: "/interview/devops/" },
@@ -399,13 +377,11 @@ export const sidebar = {
   "/git/": [
     {
       text: "学习路线",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "学习路线", link: "/git/" }],
     },
     {
       text: "基础入门",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第1章：Git基础入门", link: "/git/chapter-01" },
@@ -415,7 +391,6 @@ export const sidebar = {
     },
     {
       text: "进阶",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第4章：Git工作流程", link: "/git/workflow" },
@@ -424,7 +399,6 @@ export const sidebar = {
     },
     {
       text: "附录",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "附录：Git命令速查手册", link: "/git/appendix" }],
     },
@@ -432,13 +406,11 @@ export const sidebar = {
   "/ai/": [
     {
       text: "学习路线",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "学习路线", link: "/ai/" }],
     },
     {
       text: "基础入门",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第1章：AI辅助开发", link: "/ai/chapter-00" },
@@ -449,7 +421,6 @@ export const sidebar = {
     },
     {
       text: "进阶",
-      collapsible: true,
       collapsed: false,
       items: [
         {
@@ -467,7 +438,6 @@ export const sidebar = {
     },
     {
       text: "🤖 Agent Skills",
-      collapsible: true,
       collapsed: false,
       items: [
         {
@@ -478,7 +448,6 @@ export const sidebar = {
     },
     {
       text: "🚀 企业级实战项目",
-      collapsible: true,
       collapsed: false,
       items: [
         {
@@ -497,7 +466,6 @@ export const sidebar = {
     },
     {
       text: "拓展",
-      collapsible: true,
       collapsed: false,
       items: [
         {
@@ -527,7 +495,6 @@ export const sidebar = {
     },
     {
       text: "附录",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "附录：AI工具速查手册", link: "/ai/appendix-tools" }],
     },
@@ -535,18 +502,15 @@ export const sidebar = {
   "/guide/": [
     {
       text: "学习路线",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "学习路线", link: "/guide/" }],
     },
     {
       text: "📘 Vue3 技术栈",
-      collapsible: true,
       collapsed: false,
       items: [
         {
           text: "基础入门",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -635,7 +599,6 @@ export const sidebar = {
         },
         {
           text: "组件开发",
-          collapsible: true,
           collapsed: false,
           items: [
             { text: "第10章：计算属性与侦听器", link: "/guide/chapter-09" },
@@ -702,7 +665,6 @@ export const sidebar = {
         },
         {
           text: "企业级开发",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -760,7 +722,6 @@ export const sidebar = {
         },
         {
           text: "进阶部分",
-          collapsible: true,
           collapsed: false,
           items: [
             { text: "第26章：全局异常捕获", link: "/guide/chapter-25" },
@@ -785,7 +746,6 @@ export const sidebar = {
         },
         {
           text: "高级拓展",
-          collapsible: true,
           collapsed: false,
           items: [
             { text: "第41章：Vue3.4+最新特性详解", link: "/guide/chapter-40" },
@@ -823,7 +783,6 @@ export const sidebar = {
         },
         {
           text: "🚀 企业级实战项目",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -850,7 +809,6 @@ export const sidebar = {
         },
         {
           text: "附录",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -863,18 +821,15 @@ export const sidebar = {
     },
     {
       text: "⚛️ React 18+ 技术栈",
-      collapsible: true,
       collapsed: false,
       items: [
         {
           text: "📚 学习路线",
-          collapsible: true,
           collapsed: false,
           items: [{ text: "学习路线", link: "/guide/react/" }],
         },
         {
           text: "基础入门",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -902,7 +857,6 @@ export const sidebar = {
         },
         {
           text: "React Hooks 完全指南",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -930,7 +884,6 @@ export const sidebar = {
         },
         {
           text: "React生态与进阶",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -957,7 +910,6 @@ export const sidebar = {
         },
         {
           text: "React 18+ 并发特性",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -984,7 +936,6 @@ export const sidebar = {
         },
         {
           text: "React 19 新特性",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1007,7 +958,6 @@ export const sidebar = {
         },
         {
           text: "高级主题",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1030,7 +980,6 @@ export const sidebar = {
         },
         {
           text: "🚀 企业级实战项目",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1049,7 +998,6 @@ export const sidebar = {
         },
         {
           text: "附录",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1062,18 +1010,15 @@ export const sidebar = {
     },
     {
       text: "▲ Next.js 14+ 技术栈",
-      collapsible: true,
       collapsed: false,
       items: [
         {
           text: "📚 学习路线",
-          collapsible: true,
           collapsed: false,
           items: [{ text: "学习路线", link: "/guide/nextjs/" }],
         },
         {
           text: "基础入门",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1098,7 +1043,6 @@ export const sidebar = {
         },
         {
           text: "服务端组件与渲染",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1125,7 +1069,6 @@ export const sidebar = {
         },
         {
           text: "数据获取与Server Actions",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1152,7 +1095,6 @@ export const sidebar = {
         },
         {
           text: "路由高级特性",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1179,7 +1121,6 @@ export const sidebar = {
         },
         {
           text: "样式与优化",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1206,7 +1147,6 @@ export const sidebar = {
         },
         {
           text: "Next.js 15+ 高级主题",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1223,7 +1163,6 @@ export const sidebar = {
         },
         {
           text: "🚀 企业级实战项目",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1242,7 +1181,6 @@ export const sidebar = {
         },
         {
           text: "附录",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1255,18 +1193,15 @@ export const sidebar = {
     },
     {
       text: "🌟 Nuxt 3+ 技术栈",
-      collapsible: true,
       collapsed: false,
       items: [
         {
           text: "📚 学习路线",
-          collapsible: true,
           collapsed: false,
           items: [{ text: "学习路线", link: "/guide/nuxt/" }],
         },
         {
           text: "基础入门",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1291,7 +1226,6 @@ export const sidebar = {
         },
         {
           text: "组合式函数与状态管理",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1318,7 +1252,6 @@ export const sidebar = {
         },
         {
           text: "服务端渲染与路由",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1345,7 +1278,6 @@ export const sidebar = {
         },
         {
           text: "服务端API与数据库",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1366,7 +1298,6 @@ export const sidebar = {
         },
         {
           text: "模块系统与插件",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1386,7 +1317,6 @@ export const sidebar = {
         },
         {
           text: "Nuxt 4+ 高级主题",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1409,7 +1339,6 @@ export const sidebar = {
         },
         {
           text: "🚀 企业级实战项目",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1428,7 +1357,6 @@ export const sidebar = {
         },
         {
           text: "附录",
-          collapsible: true,
           collapsed: false,
           items: [
             {
@@ -1441,7 +1369,6 @@ export const sidebar = {
     },
     {
       text: "附录",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "附录A：学习资源推荐", link: "/guide/appendix-resources" },
@@ -1455,13 +1382,11 @@ export const sidebar = {
   "/java/": [
     {
       text: "学习路线",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "学习路线", link: "/java/" }],
     },
     {
       text: "基础入门",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第1章：Java简介与环境搭建", link: "/java/chapter-114" },
@@ -1478,7 +1403,6 @@ export const sidebar = {
     },
     {
       text: "Web开发",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第11章：Spring Boot 3.x快速入门", link: "/java/chapter-124" },
@@ -1501,7 +1425,6 @@ export const sidebar = {
     },
     {
       text: "微服务全家桶",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第21章：Nacos注册中心与配置中心", link: "/java/chapter-132" },
@@ -1527,7 +1450,6 @@ export const sidebar = {
     },
     {
       text: "高级进阶",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第31章：虚拟线程实战（Java 21）", link: "/java/chapter-142" },
@@ -1541,7 +1463,6 @@ export const sidebar = {
     },
     {
       text: "附录",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "📖 附录：Java开发工具速查手册", link: "/java/appendix-tools" },
@@ -1551,13 +1472,11 @@ export const sidebar = {
   "/devops/": [
     {
       text: "学习路线",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "学习路线", link: "/devops/" }],
     },
     {
       text: "基础入门",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第1章：DevOps概述", link: "/devops/chapter-01" },
@@ -1568,7 +1487,6 @@ export const sidebar = {
     },
     {
       text: "容器化与编排",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第5章：Docker容器化", link: "/devops/chapter-05" },
@@ -1578,7 +1496,6 @@ export const sidebar = {
     },
     {
       text: "CI/CD与自动化",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第8章：CI/CD基础概念", link: "/devops/chapter-08" },
@@ -1591,7 +1508,6 @@ export const sidebar = {
     },
     {
       text: "监控与运维",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第11章：系统监控与日志", link: "/devops/chapter-11" },
@@ -1600,7 +1516,6 @@ export const sidebar = {
     },
     {
       text: "基础设施即代码",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第13章：Terraform基础设施即代码", link: "/devops/chapter-13" },
@@ -1608,13 +1523,11 @@ export const sidebar = {
     },
     {
       text: "GitOps实践",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "第14章：Argo CD与GitOps", link: "/devops/chapter-14" }],
     },
     {
       text: "安全实践",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第15章：DevSecOps安全实践", link: "/devops/chapter-15" },
@@ -1622,7 +1535,6 @@ export const sidebar = {
     },
     {
       text: "🚀 企业级实战项目",
-      collapsible: true,
       collapsed: false,
       items: [
         {
@@ -1641,7 +1553,6 @@ export const sidebar = {
     },
     {
       text: "附录",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "附录：DevOps工具速查手册", link: "/devops/appendix-tools" },
@@ -1651,13 +1562,11 @@ export const sidebar = {
   "/db/": [
     {
       text: "学习路线",
-      collapsible: true,
       collapsed: false,
       items: [{ text: "学习路线", link: "/db/" }],
     },
     {
       text: "基础入门（第1-7章）",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第1章：数据库简介与环境搭建", link: "/db/chapter-01" },
@@ -1674,7 +1583,6 @@ export const sidebar = {
     },
     {
       text: "关系型数据库进阶（第8-14章）",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第8章：MySQL 8.0+ 新特性深度解析", link: "/db/chapter-08" },
@@ -1688,7 +1596,6 @@ export const sidebar = {
     },
     {
       text: "国产分布式数据库（第15-21章）",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第15章：OceanBase 架构与实践", link: "/db/chapter-15" },
@@ -1702,7 +1609,6 @@ export const sidebar = {
     },
     {
       text: "NoSQL 与 NewSQL（第22-26章）",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第22章：MongoDB 文档数据库", link: "/db/chapter-22" },
@@ -1714,7 +1620,6 @@ export const sidebar = {
     },
     {
       text: "时序与向量数据库（第27-30章）",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "第27章：InfluxDB 时序数据库", link: "/db/chapter-27" },
@@ -1725,7 +1630,6 @@ export const sidebar = {
     },
     {
       text: "🔄 实战案例",
-      collapsible: true,
       collapsed: false,
       items: [
         { text: "数据库迁移与备份实战案例", link: "/db/chapter-migration" },
@@ -1,12 +1,25 @@
 // .vitepress/theme/index.ts
+import { h } from 'vue'
 import DefaultTheme from 'vitepress/theme'
 import type { Theme } from 'vitepress'
+import ChapterGuide from '../components/ChapterGuide.vue'
+import InterviewQuiz from '../components/InterviewQuiz.vue'
+import RelatedPages from '../components/RelatedPages.vue'
+import ShardSearch from '../components/ShardSearch.vue'
 import './custom.css'
 
 const theme: Theme = {
   extends: DefaultTheme,
+  // 导航栏中的搜索按钮：按模块懒加载 search-index 生成的分片，替代本地搜索的整站索引；
+  // 文末上一章/下一章之前显示 related-pages 预计算的相关阅读
+  Layout: () => h(DefaultTheme.Layout, null, {
+    'nav-bar-content-before': () => h(ShardSearch),
+    'doc-footer-before': () => h(RelatedPages)
+  }),
   enhanceApp({ app, router }) {
     // 可以在这里注册全局组件
+    app.component('ChapterGuide', ChapterGuide)
+    app.component('InterviewQuiz', InterviewQuiz)
     // 如果需要添加自定义组件，可以在这里导入
   }
 }
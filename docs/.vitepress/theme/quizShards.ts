@@ -0,0 +1,65 @@
+// .vitepress/theme/quizShards.ts
+// 面试题库分片：由 .scripts/doc-tools.sh question-bank 生成到 docs/public/quiz/，
+// 刷题组件挂载后才下载 manifest.json，选中方向后再下载对应分片
+import { withBase } from 'vitepress'
+
+export interface QuizQuestion {
+  id: string
+  q: string
+  level: string
+  sub: string
+  group: string
+  page: string
+  anchor: string
+  a: string
+  code: number
+  hash: string
+  also: [string, string, string][]
+}
+
+export interface QuizTopic {
+  file: string
+  hash: string
+  questions: number
+  levels: Record<string, number>
+}
+
+let manifest: Promise<Record<string, QuizTopic>> | null = null
+const shards = new Map<string, Promise<QuizQuestion[]>>()
+
+export function loadTopics(): Promise<Record<string, QuizTopic>> {
+  if (!manifest) {
+    manifest = fetch(withBase('/quiz/manifest.json'))
+      .then((res) => {
+        if (!res.ok) throw new Error(`quiz manifest: HTTP ${res.status}`)
+        return res.json()
+      })
+      .then((data) => data.shards as Record<string, QuizTopic>)
+    // 失败后允许下次重试
+    manifest.catch(() => (manifest = null))
+  }
+  return manifest
+}
+
+export async function loadQuestions(topic: string): Promise<QuizQuestion[]> {
+  let shard = shards.get(topic)
+  if (!shard) {
+    const info = (await loadTopics())[topic]
+    if (!info) throw new Error(`quiz topic ${topic} 不存在`)
+    shard = fetch(withBase(`/quiz/${info.file}?v=${info.hash}`))
+      .then((res) => {
+        if (!res.ok) throw new Error(`quiz shard ${topic}: HTTP ${res.status}`)
+        return res.json()
+      })
+      .then((data) => data.questions as QuizQuestion[])
+    shard.catch(() => shards.delete(topic))
+    shards.set(topic, shard)
+  }
+  return shard
+}
+
+/** 题目所在页面与锚点的站点链接 */
+export function questionLink(page: string, anchor: string): string {
+  const path = page.endsWith('/') ? page : `${page}.html`
+  return withBase(path) + (anchor ? `#${encodeURIComponent(anchor)}` : '')
+}
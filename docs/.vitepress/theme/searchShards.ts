@@ -0,0 +1,137 @@
+// .vitepress/theme/searchShards.ts
+// 按模块分片的全文检索：分片由 .scripts/doc-tools.sh search-index 生成到 docs/public/search/，
+// 只在第一次搜索时下载 manifest.json 与当前模块的分片，其他模块的分片按需加载
+import { withBase } from 'vitepress'
+
+export interface SearchHit {
+  url: string
+  title: string
+  parents: string
+  module: string
+  score: number
+  matched: number
+}
+
+interface ShardInfo {
+  prefix: string
+  file: string
+  hash: string
+  docs: number
+}
+
+interface Shard {
+  module: string
+  docs: [string, string, string][]
+  index: Record<string, number[]>
+}
+
+// 与 text.tokenize 一致：CJK 连续片段切为二元组（单字保留），拉丁词转小写
+const CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af'
+const TOKEN = new RegExp(`([${CJK}]+)|([A-Za-z0-9][A-Za-z0-9_+#.\\-]*)`, 'g')
+
+export function tokenize(text: string): string[] {
+  const tokens: string[] = []
+  for (const match of text.matchAll(TOKEN)) {
+    const [, run, word] = match
+    if (run) {
+      if (run.length === 1) tokens.push(run)
+      for (let i = 0; i < run.length - 1; i++) tokens.push(run.slice(i, i + 2))
+    } else {
+      const w = word.replace(/[.-]+$/, '').toLowerCase()
+      if (w) tokens.push(w)
+    }
+  }
+  return tokens
+}
+
+let manifest: Promise<Record<string, ShardInfo>> | null = null
+const shards = new Map<string, Promise<Shard>>()
+
+function loadManifest(): Promise<Record<string, ShardInfo>> {
+  if (!manifest) {
+    manifest = fetch(withBase('/search/manifest.json'))
+      .then((res) => {
+        if (!res.ok) throw new Error(`search manifest: HTTP ${res.status}`)
+        return res.json()
+      })
+      .then((data) => data.shards as Record<string, ShardInfo>)
+    // 失败后允许下次重试
+    manifest.catch(() => (manifest = null))
+  }
+  return manifest
+}
+
+function loadShard(module: string, info: ShardInfo): Promise<Shard> {
+  let shard = shards.get(module)
+  if (!shard) {
+    shard = fetch(withBase(`/search/${info.file}?v=${info.hash}`)).then((res) => {
+      if (!res.ok) throw new Error(`search shard ${module}: HTTP ${res.status}`)
+      return res.json()
+    })
+    shard.catch(() => shards.delete(module))
+    shards.set(module, shard)
+  }
+  return shard
+}
+
+/** 当前路由所属模块（按分片前缀匹配），没有对应分片时为 root */
+export async function moduleForPath(path: string): Promise<string> {
+  const infos = await loadManifest()
+  const relative = path.startsWith(withBase('/')) ? '/' + path.slice(withBase('/').length) : path
+  let best = 'root'
+  let length = 0
+  for (const [module, info] of Object.entries(infos)) {
+    if (info.prefix !== '/' && relative.startsWith(info.prefix) && info.prefix.length > length) {
+      best = module
+      length = info.prefix.length
+    }
+  }
+  return best
+}
+
+/** 已生成分片的模块列表 */
+export async function listModules(): Promise<string[]> {
+  return Object.keys(await loadManifest())
+}
+
+function searchShard(shard: Shard, terms: string[]): SearchHit[] {
+  const scores = new Map<number, [number, number]>()
+  const total = shard.docs.length
+  for (const term of terms) {
+    const postings = shard.index[term]
+    if (!postings) continue
+    const idf = Math.log(1 + total / (postings.length / 2))
+    let doc = 0
+    for (let i = 0; i < postings.length; i += 2) {
+      doc += postings[i]
+      const entry = scores.get(doc) ?? [0, 0]
+      entry[0] += (1 + Math.log(postings[i + 1])) * idf
+      entry[1] += 1
+      scores.set(doc, entry)
+    }
+  }
+  return [...scores].map(([doc, [score, matched]]) => {
+    const [url, title, parents] = shard.docs[doc]
+    return { url, title, parents, module: shard.module, score, matched }
+  })
+}
+
+/** 在指定模块的分片中搜索，按命中的词项数、再按分数排序 */
+export async function search(query: string, modules: string[], limit = 20): Promise<SearchHit[]> {
+  const terms = [...new Set(tokenize(query))]
+  if (!terms.length) return []
+  const infos = await loadManifest()
+  const loaded = await Promise.all(
+    modules.filter((m) => infos[m]).map((m) => loadShard(m, infos[m]))
+  )
+  const hits = loaded.flatMap((shard) => searchShard(shard, terms))
+  hits.sort((a, b) => b.matched - a.matched || b.score - a.score)
+  return hits.slice(0, limit)
+}
+
+/** 分片中的链接（/ai/chapter-01#锚点）转换为站点链接 */
+export function hitLink(url: string): string {
+  const [path, hash] = url.split('#')
+  const page = path.endsWith('/') ? path : `${path}.html`
+  return withBase(page) + (hash ? `#${hash}` : '')
+}